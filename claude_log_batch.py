@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Claude Log Batch Conversion
+Converts whole directories or globs of Claude JSONL logs on a process pool.
+"""
+
+import contextlib
+import glob
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from claude_log_cache import cached_convert
+
+
+def is_batch_request(inputs):
+    """Check if command line inputs need batch mode rather than a single conversion."""
+    if len(inputs) != 1:
+        return True
+    return not Path(inputs[0]).is_file()
+
+
+def collect_input_files(inputs, pattern='*.jsonl'):
+    """Expand files, directories and glob patterns into (input_path, root) pairs.
+
+    Directories are searched recursively for `pattern`. The root is the directory
+    that relative output paths are computed from.
+    """
+    found = {}
+
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for match in sorted(path.rglob(pattern)):
+                if match.is_file():
+                    found.setdefault(match.resolve(), (match, path))
+        elif path.is_file():
+            found.setdefault(path.resolve(), (path, path.parent))
+        else:
+            for match in sorted(glob.glob(item, recursive=True)):
+                match = Path(match)
+                if match.is_file():
+                    found.setdefault(match.resolve(), (match, match.parent))
+
+    return list(found.values())
+
+
+def plan_batch(inputs, suffix, output_dir=None, pattern='*.jsonl'):
+    """Build (input_path, output_path, size) jobs, largest files first."""
+    jobs = []
+
+    for input_path, root in collect_input_files(inputs, pattern):
+        if output_dir:
+            output_path = Path(output_dir) / input_path.relative_to(root).with_suffix(suffix)
+        else:
+            output_path = input_path.with_suffix(suffix)
+        jobs.append((input_path, output_path, input_path.stat().st_size))
+
+    # Schedule the largest files first so a few huge logs do not straggle at the end
+    jobs.sort(key=lambda job: job[2], reverse=True)
+    return jobs
+
+
+def convert_one(convert_func, input_path, output_path, options, cache=None):
+    """Run a single conversion in a worker process, capturing its console output."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    captured = io.StringIO()
+    start = time.perf_counter()
+
+    try:
+        with contextlib.redirect_stdout(captured):
+            if cache:
+                success = cached_convert(convert_func, str(input_path), str(output_path), options, cache)
+            else:
+                success = convert_func(str(input_path), str(output_path), **options)
+    except Exception as e:
+        success = False
+        captured.write(f"Error processing file: {e}\n")
+
+    return success, time.perf_counter() - start, captured.getvalue()
+
+
+def format_size(size):
+    """Format a byte count as a short human readable string."""
+    for unit in ['B', 'KB', 'MB']:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def run_batch(convert_func, jobs, workers=None, cache=None, **options):
+    """Convert all jobs on a process pool and print an aggregated progress report."""
+    if not jobs:
+        print("No input files found")
+        return False
+
+    workers = workers or os.cpu_count() or 1
+    total_bytes = sum(size for _, _, size in jobs)
+    done_bytes = 0
+    failures = []
+    start = time.perf_counter()
+
+    print(f"Converting {len(jobs)} files ({format_size(total_bytes)}) with {workers} workers")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(convert_one, convert_func, input_path, output_path, options, cache): (input_path, size)
+            for input_path, output_path, size in jobs
+        }
+
+        for completed, future in enumerate(as_completed(futures), 1):
+            input_path, size = futures[future]
+            try:
+                success, elapsed, output = future.result()
+            except Exception as e:
+                success, elapsed, output = False, 0.0, f"Error processing file: {e}\n"
+
+            done_bytes += size
+            wall = time.perf_counter() - start
+            rate = done_bytes / wall if wall > 0 else 0
+            status = '✓' if success else '✗'
+            print(f"[{completed}/{len(jobs)}] {status} {input_path} "
+                  f"({format_size(size)}, {elapsed:.2f}s) - {format_size(rate)}/s overall")
+
+            if not success:
+                failures.append((input_path, output.strip().splitlines()[-1:] or ['Unknown error']))
+
+    wall = time.perf_counter() - start
+    print(f"\nConverted {len(jobs) - len(failures)}/{len(jobs)} files in {wall:.2f}s")
+    if wall > 0:
+        print(f"- {format_size(total_bytes / wall)}/s, {len(jobs) / wall:.1f} files/s")
+    for input_path, message in failures:
+        print(f"- Failed: {input_path}: {message[0]}")
+
+    return not failures
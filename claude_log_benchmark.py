@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Claude Log Benchmarks
+Measures converter throughput and peak memory on synthetic or real logs, and compares runs against a baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from claude_log_batch import convert_one, format_size
+from claude_log_cache import default_cache_dir
+from claude_log_parser import CONVERTER_VERSION, select_decoder
+from claude_log_profile import peak_rss_bytes
+from claude_log_synth import DEFAULT_MIX, add_mix_arguments, generate_session, mix_from_args, parse_count, write_secrets_file
+
+RESULTS_FORMAT = 'claude-log-benchmark'
+DEFAULT_SIZES = '1k,10k,100k'
+# A case slower or hungrier than its baseline by more than this many percent is a regression
+DEFAULT_THRESHOLD = 10.0
+
+# Case name: (converter, output suffix, options); 'redactor' is replaced by the loaded secrets,
+# with secret detection added if it is 'detect'
+CASES = {
+    'markdown': ('markdown', '.md', {}),
+    'markdown-stream': ('markdown', '.md', {'streaming': True}),
+    'json': ('json', '.json', {}),
+    'json-no-content': ('json', '.json', {'include_content': False}),
+    'markdown-secrets': ('markdown', '.md', {'redactor': True}),
+    'json-secrets': ('json', '.json', {'redactor': True}),
+    'json-detect-secrets': ('json', '.json', {'redactor': 'detect'}),
+    # Markdown, presentation Markdown, JSON and stats from one decode; compare with the separate cases
+    'all-formats': ('formats', '', {}),
+}
+
+
+def converter(name):
+    if name == 'markdown':
+        from claude_log_converter import convert_log_to_markdown
+        return convert_log_to_markdown
+    if name == 'formats':
+        from claude_log_formats import convert_log_to_formats
+        return convert_log_to_formats
+    from claude_log_to_json import convert_log_to_json
+    return convert_log_to_json
+
+
+def run_case(case, input_path, output_dir, secrets_file=None):
+    """Run one case in this process and return its measurements.
+
+    Called in a fresh interpreter per run, so that the peak RSS belongs to
+    this conversion alone.
+    """
+    kind, suffix, options = CASES[case]
+    options = dict(options)
+    if options.get('redactor'):
+        from claude_log_detect import SecretDetector
+        from claude_log_secrets import SecretRedactor, load_secret_replacements
+        detector = SecretDetector() if options['redactor'] == 'detect' else None
+        options['redactor'] = SecretRedactor(load_secret_replacements(secrets_file), detector)
+
+    output_path = Path(output_dir) / (Path(input_path).stem + suffix)
+    baseline_rss = peak_rss_bytes()
+    success, elapsed, output = convert_one(converter(kind), Path(input_path), output_path, options)
+    return {
+        'success': success,
+        'seconds': elapsed,
+        'peak_rss_bytes': peak_rss_bytes(),
+        'startup_rss_bytes': baseline_rss,
+        # Every run has its own output directory, which may hold several outputs
+        'output_bytes': sum(path.stat().st_size for path in Path(output_dir).iterdir()),
+        'error': None if success else (output.strip().splitlines()[-1:] or ['Unknown error'])[0]
+    }
+
+
+def spawn_case(case, input_path, secrets_file=None):
+    """Run one case in a child interpreter and return its measurements."""
+    with tempfile.TemporaryDirectory(prefix='claude-log-bench-') as output_dir:
+        command = [sys.executable, str(Path(__file__).resolve()), '--run-case', case,
+                   str(input_path), output_dir]
+        if secrets_file:
+            command += ['--secrets', str(secrets_file)]
+        completed = subprocess.run(command, capture_output=True, text=True)
+
+    if completed.returncode != 0:
+        message = (completed.stderr.strip().splitlines() or ['Unknown error'])[-1]
+        return {'success': False, 'error': message}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def count_lines(path):
+    lines = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+    return lines
+
+
+def prepare_inputs(sizes, data_dir, mix, seed):
+    """Generate (or reuse) a synthetic log for each size and return their paths."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    # The file name records everything the content depends on, so logs are only generated once
+    tag = '-'.join(f'{mix[name]:g}' for name in DEFAULT_MIX)
+    paths = []
+    for lines in sizes:
+        path = data_dir / f'synthetic-{lines}-s{seed}-{tag}.jsonl'
+        if not path.exists():
+            print(f"Generating {path.name}...")
+            partial = path.with_name(path.name + '.partial')
+            generate_session(partial, lines, mix, seed)
+            os.replace(partial, path)
+        paths.append(path)
+    return paths
+
+
+def run_benchmarks(inputs, cases, repeat=1, secrets_file=None):
+    """Run every case on every input, keeping the fastest of `repeat` runs."""
+    results = []
+    for input_path in inputs:
+        input_path = Path(input_path)
+        size = input_path.stat().st_size
+        lines = count_lines(input_path)
+        print(f"\n{input_path.name}: {lines:,} lines, {format_size(size)}")
+
+        for case in cases:
+            runs = [spawn_case(case, input_path, secrets_file) for _ in range(repeat)]
+            failed = [run for run in runs if not run['success']]
+            if failed:
+                print(f"  {case:<18} failed: {failed[0]['error']}")
+                results.append({'case': case, 'input': input_path.name, 'lines': lines, 'bytes': size,
+                                'success': False, 'error': failed[0]['error']})
+                continue
+
+            seconds = min(run['seconds'] for run in runs)
+            peak = max(run['peak_rss_bytes'] for run in runs)
+            result = {
+                'case': case,
+                'input': input_path.name,
+                'lines': lines,
+                'bytes': size,
+                'success': True,
+                'runs': repeat,
+                'seconds': round(seconds, 4),
+                'lines_per_second': round(lines / seconds) if seconds else None,
+                'mb_per_second': round(size / 1024 / 1024 / seconds, 2) if seconds else None,
+                'peak_rss_mb': round(peak / 1024 / 1024, 1),
+                'startup_rss_mb': round(runs[0]['startup_rss_bytes'] / 1024 / 1024, 1),
+                'output_bytes': runs[0]['output_bytes']
+            }
+            results.append(result)
+            print(f"  {case:<18} {seconds:8.3f}s  {result['lines_per_second']:>10,} lines/s  "
+                  f"{result['mb_per_second']:8.2f} MB/s  {result['peak_rss_mb']:8.1f} MB peak")
+    return results
+
+
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Print each case's change against a baseline run and return the regressions.
+
+    Throughput is compared as time per run and memory as peak RSS; cases are
+    matched by name and input file, so both runs must use the same inputs.
+    """
+    previous = {(item['case'], item['input']): item for item in baseline['results'] if item.get('success')}
+    regressions = []
+    print(f"\nCompared with baseline from {baseline.get('created', 'unknown date')} "
+          f"(threshold {threshold:g}%):")
+
+    for result in results:
+        before = previous.get((result['case'], result['input']))
+        if not result.get('success') or before is None:
+            continue
+        time_change = (result['seconds'] / before['seconds'] - 1) * 100 if before['seconds'] else 0.0
+        rss_change = (result['peak_rss_mb'] / before['peak_rss_mb'] - 1) * 100 if before['peak_rss_mb'] else 0.0
+        flags = []
+        if time_change > threshold:
+            flags.append('slower')
+        if rss_change > threshold:
+            flags.append('more memory')
+        if flags:
+            regressions.append((result['case'], result['input'], flags))
+        print(f"  {result['case']:<18} {result['input']:<40} time {time_change:+6.1f}%  "
+              f"peak RSS {rss_change:+6.1f}%{'  ← ' + ', '.join(flags) if flags else ''}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Claude log converters on synthetic or real logs')
+    parser.add_argument('input_file', nargs='*', help='Logs to benchmark (default: synthetic logs of --sizes lines)')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'Comma-separated line counts of synthetic logs, e.g. 1k,100k,1M (default: {DEFAULT_SIZES})')
+    parser.add_argument('--cases', default=','.join(CASES),
+                        help='Comma-separated cases to run (default: all): ' + ', '.join(CASES))
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per case; the fastest is kept (default: 1)')
+    parser.add_argument('--data-dir', help='Where synthetic logs are kept between runs (default: in the cache directory)')
+    parser.add_argument('-o', '--output', default='benchmark-results.json', help='Results JSON file (default: benchmark-results.json)')
+    parser.add_argument('--baseline', help='Compare with a stored results file; exits with status 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Percent slowdown or memory growth counted as a regression (default: {DEFAULT_THRESHOLD:g})')
+    add_mix_arguments(parser)
+    parser.add_argument('--secrets', help=argparse.SUPPRESS)
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.run_case:
+        # Child mode: input_file holds the log and the output directory
+        print(json.dumps(run_case(args.run_case, args.input_file[0], args.input_file[1], args.secrets)))
+        return
+
+    cases = [case.strip() for case in args.cases.split(',') if case.strip()]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        print(f"Error: Unknown cases: {', '.join(unknown)} (choose from {', '.join(CASES)})")
+        sys.exit(1)
+
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except Exception as e:
+            print(f"Error reading baseline {args.baseline}: {e}")
+            sys.exit(1)
+        if baseline.get('format') != RESULTS_FORMAT:
+            print(f"Error: {args.baseline} is not a benchmark results file")
+            sys.exit(1)
+
+    data_dir = Path(args.data_dir) if args.data_dir else default_cache_dir() / 'benchmarks'
+    mix = mix_from_args(args)
+    if args.input_file:
+        inputs = [Path(path) for path in args.input_file]
+        missing = [str(path) for path in inputs if not path.is_file()]
+        if missing:
+            print(f"Error: File not found: {', '.join(missing)}")
+            sys.exit(1)
+    else:
+        inputs = prepare_inputs([parse_count(size) for size in args.sizes.split(',')], data_dir, mix, args.seed)
+
+    # The redaction cases use the secrets planted in synthetic logs
+    data_dir.mkdir(parents=True, exist_ok=True)
+    secrets_file = data_dir / 'synthetic.secrets.md'
+    write_secrets_file(secrets_file)
+
+    results = run_benchmarks(inputs, cases, max(1, args.repeat), secrets_file)
+
+    report = {
+        'format': RESULTS_FORMAT,
+        'version': 1,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'converter_version': CONVERTER_VERSION,
+        'decoder': select_decoder()[0],
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'mix': None if args.input_file else mix,
+        'seed': None if args.input_file else args.seed,
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {args.output}")
+
+    failed = [result for result in results if not result['success']]
+    if baseline is not None:
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions above {args.threshold:g}%")
+            sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
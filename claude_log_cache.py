@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Claude Log Conversion Cache
+Skips or restores conversions of session logs that have not changed.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from claude_log_output import is_gzip_path
+from claude_log_parser import CONVERTER_VERSION
+
+DEFAULT_CACHE_MAX_MB = 1024
+
+
+def default_cache_dir():
+    """Return the default cache directory, honouring XDG_CACHE_HOME."""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'claude-log-converter'
+
+
+def make_cache_config(cache_dir=None, max_mb=DEFAULT_CACHE_MAX_MB, force=False):
+    """Build the picklable cache settings passed to conversions and batch workers."""
+    return {
+        'dir': str(cache_dir or default_cache_dir()),
+        'max_bytes': int(max_mb * 1024 * 1024),
+        'force': force
+    }
+
+
+def add_cache_arguments(parser):
+    """Add the conversion cache options to a converter's argument parser."""
+    parser.add_argument('--cache', action='store_true', help='Skip or restore conversions of unchanged logs from a local cache')
+    parser.add_argument('--cache-dir', help='Cache directory (default: ~/.cache/claude-log-converter, implies --cache)')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_CACHE_MAX_MB, help=f'Evict least recently used cache entries above this size (default: {DEFAULT_CACHE_MAX_MB})')
+    parser.add_argument('--force', action='store_true', help='Convert even if a cached result exists, refreshing the cache')
+
+
+def cache_config_from_args(args):
+    """Return cache settings for parsed arguments, or None when caching is disabled."""
+    if not (args.cache or args.cache_dir):
+        return None
+    return make_cache_config(args.cache_dir, args.cache_max_mb, args.force)
+
+
+def path_digest(*parts):
+    """Hash arbitrary values into a short file name."""
+    return hashlib.sha1('\0'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def write_atomic(path, data):
+    """Write a small JSON file atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def read_json(path):
+    """Read a small JSON file, returning None if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def content_hash(cache_dir, input_path):
+    """Return the SHA-256 of a file, reusing the stored hash while size and mtime are unchanged."""
+    stat = input_path.stat()
+    stat_path = cache_dir / 'stat' / path_digest(input_path)
+    cached = read_json(stat_path)
+
+    if cached and cached.get('size') == stat.st_size and cached.get('mtime_ns') == stat.st_mtime_ns:
+        return cached['sha256']
+
+    digest = hashlib.sha256()
+    with open(input_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    write_atomic(stat_path, {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': digest.hexdigest()
+    })
+    return digest.hexdigest()
+
+
+def cache_token(value):
+    """Return a stable key component for option values that are not plain JSON."""
+    return getattr(value, 'cache_token', None) or str(value)
+
+
+def conversion_key(convert_func, input_path, sha256, options):
+    """Build the cache key for one conversion from its input, converter version and flags."""
+    return path_digest(
+        f'{convert_func.__module__}.{convert_func.__name__}',
+        CONVERTER_VERSION,
+        input_path,
+        sha256,
+        json.dumps(options, sort_keys=True, default=cache_token)
+    )
+
+
+def evict(cache_dir, max_bytes):
+    """Delete least recently used cache entries until the cache fits in max_bytes."""
+    entries = []
+    total = 0
+    for entry in (cache_dir / 'entries').glob('*'):
+        # Skip entries that another worker is still writing
+        if entry.name.endswith('.tmp'):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry))
+        total += stat.st_size
+
+    for _, size, entry in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            entry.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def cached_convert(convert_func, input_file, output_file, options, cache):
+    """Run convert_func unless an identical conversion is already available.
+
+    The key covers the input path, size, mtime and content hash as well as the
+    converter version, options and whether the output is gzip-compressed. An output that is already up to date is
+    skipped; otherwise a cached result is copied into place. With
+    cache['force'] the conversion always runs and the cache entry is refreshed.
+    """
+    cache_dir = Path(cache['dir'])
+    input_path = Path(input_file).resolve()
+    output_path = Path(output_file)
+
+    if not input_path.exists():
+        return convert_func(input_file, output_file, **options)
+
+    # Outputs are compressed by their suffix, so a plain and a .gz output need separate entries
+    key = conversion_key(convert_func, input_path, content_hash(cache_dir, input_path),
+                         dict(options, gzip_output=is_gzip_path(output_path)))
+    entry_path = cache_dir / 'entries' / key
+    marker_path = cache_dir / 'outputs' / path_digest(output_path.resolve())
+
+    if not cache['force']:
+        marker = read_json(marker_path)
+        if output_path.exists() and marker:
+            stat = output_path.stat()
+            if (marker.get('key') == key and marker.get('size') == stat.st_size
+                    and marker.get('mtime_ns') == stat.st_mtime_ns):
+                print(f"Up to date: {output_path}")
+                return True
+
+    if not cache['force'] and entry_path.exists():
+        shutil.copyfile(entry_path, output_path)
+        # Refresh the entry's mtime so eviction treats it as recently used
+        os.utime(entry_path)
+        print(f"Restored {output_path} from cache")
+    else:
+        if not convert_func(input_file, output_file, **options):
+            return False
+
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry_path.with_name(f'{key}.{os.getpid()}.tmp')
+        shutil.copyfile(output_path, tmp_path)
+        os.replace(tmp_path, entry_path)
+        evict(cache_dir, cache['max_bytes'])
+
+    stat = output_path.stat()
+    write_atomic(marker_path, {'key': key, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns})
+    return True
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Claude Log Columnar Export
+Writes per-message metadata as typed NumPy columns and memory-maps them back.
+"""
+
+import struct
+import zipfile
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from claude_log_latency import parse_timestamp
+from claude_log_parser import MalformedLine, iter_records
+from claude_log_to_json import build_message_entries, finalize_session_stats, new_session_stats, update_session_stats
+
+COLUMNS_VERSION = 1
+
+# Column name -> (array typecode used while collecting, NumPy dtype written)
+COLUMNS = {
+    'message_id': ('I', 'uint32'),
+    'line_number': ('I', 'uint32'),
+    'timestamp': ('q', 'datetime64[ms]'),
+    'role': ('B', 'uint8'),
+    'is_sidechain': ('B', 'bool'),
+    'content_length': ('I', 'uint32'),
+    'estimated_tokens': ('I', 'uint32'),
+    'file_operation_count': ('H', 'uint16'),
+    'is_interruption': ('B', 'bool')
+}
+# Stored in place of timestamps that are missing or invalid (NumPy's NaT)
+MISSING_TIMESTAMP = -(2 ** 63)
+
+
+def require_numpy():
+    """Fail with an actionable message when NumPy is not installed."""
+    if np is None:
+        raise RuntimeError("NumPy is required for columnar export (pip install numpy)")
+
+
+def timestamp_millis(timestamp):
+    """Convert an ISO timestamp to Unix milliseconds, or NaT's value if it is unusable."""
+    parsed = parse_timestamp(timestamp) if timestamp else None
+    if parsed is None:
+        return MISSING_TIMESTAMP
+    return int(parsed.timestamp() * 1000)
+
+
+def write_columns(input_path, output_path, include_content=True, redactor=None):
+    """Convert a log to an uncompressed .npz of parallel per-message columns.
+
+    Values are collected in typed arrays rather than Python objects, so memory
+    stays at a few dozen bytes per message. Roles are stored as codes into the
+    `role_names` column. The archive is written uncompressed so that
+    load_columns() can memory-map every column.
+    Returns (message_count, file_operation_count, stats).
+    """
+    require_numpy()
+
+    stats = new_session_stats()
+    columns = {name: array(typecode) for name, (typecode, _) in COLUMNS.items()}
+    role_codes = {}
+    message_id = 0
+    file_operation_count = 0
+
+    with open(input_path, 'rb') as src:
+        for record in iter_records(src):
+            update_session_stats(stats, record)
+
+            if isinstance(record, MalformedLine):
+                print(f"Error processing line {record.line_number}: {record.error}")
+                continue
+
+            try:
+                message_id += 1
+                msg, file_ops, _ = build_message_entries(record, message_id, include_content, redactor)
+            except Exception as e:
+                print(f"Error processing line {record.line_number}: {e}")
+                continue
+
+            columns['message_id'].append(msg['id'])
+            columns['line_number'].append(msg['line_number'])
+            columns['timestamp'].append(timestamp_millis(msg['timestamp']))
+            columns['role'].append(role_codes.setdefault(msg['role'], len(role_codes)))
+            columns['is_sidechain'].append(bool(msg['is_sidechain']))
+            columns['content_length'].append(msg['content_length'])
+            columns['estimated_tokens'].append(msg['estimated_tokens'])
+            columns['file_operation_count'].append(min(len(file_ops), 0xFFFF))
+            columns['is_interruption'].append(bool(msg['is_interruption']))
+            file_operation_count += len(file_ops)
+
+    arrays = {}
+    for name, (_, dtype) in COLUMNS.items():
+        if dtype.startswith('datetime64'):
+            arrays[name] = np.array(columns[name], dtype='int64').view(dtype)
+        else:
+            arrays[name] = np.array(columns[name], dtype=dtype)
+    arrays['role_names'] = np.array(sorted(role_codes, key=role_codes.get) or [''], dtype=str)
+    arrays['source_file'] = np.array(redactor.redact(input_path.name) if redactor else input_path.name)
+    arrays['version'] = np.array(COLUMNS_VERSION, dtype='uint16')
+
+    # An open file keeps NumPy from appending a second .npz suffix
+    with open(output_path, 'wb') as f:
+        np.savez(f, **arrays)
+
+    return len(columns['message_id']), file_operation_count, finalize_session_stats(stats)
+
+
+def member_data_offset(f, info):
+    """Return where a stored zip member's bytes start, past its local file header."""
+    f.seek(info.header_offset)
+    header = f.read(30)
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+    return info.header_offset + 30 + name_length + extra_length
+
+
+def load_columns(path, mmap=True):
+    """Load the columns of one exported session as a dict of arrays.
+
+    Columns are memory-mapped straight out of the uncompressed archive, so
+    opening even a very large session is instant and only the pages an
+    operation touches are read. Scalars and compressed members are read normally.
+    """
+    require_numpy()
+    from numpy.lib import format as npy_format
+
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if not mmap or info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = npy_format.read_array(member)
+                continue
+
+            f.seek(member_data_offset(f, info))
+            version = npy_format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = npy_format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = npy_format.read_array_header_2_0(f)
+
+            if dtype.hasobject or not shape or 0 in shape:
+                f.seek(member_data_offset(f, info))
+                arrays[name] = npy_format.read_array(f)
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', shape=shape,
+                                         order='F' if fortran_order else 'C', offset=f.tell())
+
+    return arrays
+
+
+def load_fleet(paths):
+    """Concatenate the columns of many sessions for vectorized analysis.
+
+    Role codes are remapped onto one shared `role_names` vocabulary, and a
+    `session` column holds each message's index into the returned `sessions`
+    list of source files.
+    """
+    require_numpy()
+
+    sessions = []
+    parts = {name: [] for name in COLUMNS}
+    parts['session'] = []
+    role_names = {}
+
+    for index, path in enumerate(paths):
+        columns = load_columns(path)
+        sessions.append(str(columns['source_file']))
+
+        # Translate this session's role codes into the shared vocabulary
+        remap = np.array([role_names.setdefault(str(role), len(role_names)) for role in columns['role_names']],
+                         dtype='uint8')
+        for name in COLUMNS:
+            parts[name].append(remap[columns['role']] if name == 'role' else columns[name])
+        parts['session'].append(np.full(len(columns['message_id']), index, dtype='uint32'))
+
+    fleet = {name: np.concatenate(arrays) for name, arrays in parts.items() if arrays}
+    fleet['role_names'] = np.array(sorted(role_names, key=role_names.get) or [''], dtype=str)
+    fleet['sessions'] = sessions
+    return fleet
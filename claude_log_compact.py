@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Claude Log Compact JSON
+Writes the JSON conversion without duplicated content, using a shared string table.
+"""
+
+import json
+import shutil
+import tempfile
+
+from claude_log_deltas import DeltaEncoder
+from claude_log_output import open_output
+from claude_log_parser import MalformedLine, iter_records
+from claude_log_secrets import apply_secret_replacements_to_dict
+from claude_log_to_json import (
+    build_message_entries, build_stream_tail, finalize_session_stats, new_session_stats, update_session_stats
+)
+
+COMPACT_FORMAT = 'claude-log-compact'
+COMPACT_VERSION = 1
+
+# Messages are stored as arrays in this column order; `content` is replaced by
+# `content_preview` when full content is not included
+MESSAGE_FIELDS = ('id', 'line_number', 'timestamp', 'role', 'is_sidechain', 'is_interruption',
+                  'content_length', 'content')
+# File operation fields stored as indexes into the string table
+INTERNED_OP_FIELDS = ('type', 'file_path', 'language')
+# File operation fields that are rebuilt from the message or the file path
+DERIVED_OP_FIELDS = ('file_name', 'timestamp', 'is_sidechain')
+
+
+class StringTable:
+    """Assigns each distinct string an index in a shared table."""
+
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+
+    def intern(self, value):
+        if value is None:
+            return None
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return position
+
+
+def message_fields(include_content):
+    """Return the column names of compact messages."""
+    if include_content:
+        return list(MESSAGE_FIELDS)
+    return list(MESSAGE_FIELDS[:-1]) + ['content_preview']
+
+
+def compact_message(msg, include_content, strings):
+    """Encode a message as an array, dropping fields that are derived on expansion.
+
+    The preview, token estimate and file operation flags are rebuilt from the
+    content and the file operations, so only the full text is stored.
+    """
+    return [
+        msg['id'],
+        msg['line_number'],
+        msg['timestamp'],
+        strings.intern(msg['role']),
+        int(msg['is_sidechain']),
+        int(msg['is_interruption']),
+        msg['content_length'],
+        msg['content'] if include_content else msg['content_preview']
+    ]
+
+
+def compact_file_operation(op, strings):
+    """Encode a file operation, interning repeated strings and dropping derived fields."""
+    compact = {}
+    for key, value in op.items():
+        if key in DERIVED_OP_FIELDS:
+            continue
+        compact[key] = strings.intern(value) if key in INTERNED_OP_FIELDS else value
+    return compact
+
+
+def write_compact_json(input_path, output_path, include_content=True, redactor=None, write_deltas=False):
+    """Convert a log to the compact format with constant memory.
+
+    Messages are written as they are built. File operations are spooled and
+    copied after them. The string table is written last. The timeline is not
+    stored at all, because expanding the messages and file operations rebuilds it.
+    Returns (message_count, file_operation_count, stats).
+    """
+    stats = new_session_stats()
+    deltas = DeltaEncoder() if write_deltas else None
+    strings = StringTable()
+    progress = {'lines': 0}
+    message_id = 0
+    message_count = 0
+    file_operation_count = 0
+
+    with open(input_path, 'rb') as src, \
+            open_output(output_path) as f, \
+            tempfile.TemporaryFile('w+', encoding='utf-8') as ops_spool:
+        f.write(f'{{"format":"{COMPACT_FORMAT}","version":{COMPACT_VERSION},')
+        f.write(f'"message_fields":{json.dumps(message_fields(include_content))},"messages":[')
+
+        for record in iter_records(src, progress):
+            update_session_stats(stats, record)
+
+            if isinstance(record, MalformedLine):
+                print(f"Error processing line {record.line_number}: {record.error}")
+                continue
+
+            try:
+                message_id += 1
+                msg, file_ops, _ = build_message_entries(record, message_id, include_content, redactor, deltas)
+            except Exception as e:
+                print(f"Error processing line {record.line_number}: {e}")
+                continue
+
+            f.write(',' if message_count else '')
+            f.write(json.dumps(compact_message(msg, include_content, strings),
+                               ensure_ascii=False, separators=(',', ':')))
+            message_count += 1
+            for op in file_ops:
+                ops_spool.write(',' if file_operation_count else '')
+                ops_spool.write(json.dumps(compact_file_operation(op, strings),
+                                           ensure_ascii=False, separators=(',', ':')))
+                file_operation_count += 1
+
+        stats = finalize_session_stats(stats)
+        tail = build_stream_tail(input_path, progress['lines'], include_content,
+                                 stats, message_count, file_operation_count, write_deltas)
+        if redactor:
+            tail = apply_secret_replacements_to_dict(tail, redactor)
+        tail['strings'] = strings.strings
+
+        f.write('],"file_operations":[')
+        ops_spool.seek(0)
+        shutil.copyfileobj(ops_spool, f)
+        f.write('],')
+        # Append the trailing keys to the already open top-level object
+        f.write(json.dumps(tail, ensure_ascii=False, separators=(',', ':'))[1:])
+
+    return message_count, file_operation_count, stats
+
+
+def is_compact(data):
+    """Check if a loaded JSON document is in the compact format."""
+    return isinstance(data, dict) and data.get('format') == COMPACT_FORMAT
+
+
+def expand_compact(data):
+    """Rebuild the regular (streamed) JSON document from a compact one."""
+    strings = data['strings']
+    fields = data['message_fields']
+    include_content = 'content' in fields
+
+    def lookup(index):
+        return None if index is None else strings[index]
+
+    messages = []
+    by_id = {}
+    for row in data['messages']:
+        values = dict(zip(fields, row))
+        text = values.get('content') if include_content else None
+        msg = {
+            'id': values['id'],
+            'line_number': values['line_number'],
+            'timestamp': values['timestamp'],
+            'role': lookup(values['role']),
+            'is_sidechain': bool(values['is_sidechain']),
+            'is_interruption': bool(values['is_interruption']),
+            'has_file_operations': False,
+            'file_operation_count': 0,
+            'content_length': values['content_length'],
+            'estimated_tokens': values['content_length'] // 3
+        }
+        if include_content:
+            msg['content'] = text
+            msg['content_preview'] = text[:200] + ('...' if len(text) > 200 else '')
+        else:
+            msg['content_preview'] = values['content_preview']
+        messages.append(msg)
+        by_id[msg['id']] = msg
+
+    file_operations = []
+    for compact in data['file_operations']:
+        op = {}
+        for key, value in compact.items():
+            op[key] = lookup(value) if key in INTERNED_OP_FIELDS else value
+        file_path = op.get('file_path')
+        op['file_name'] = file_path.split('/')[-1] if file_path else ''
+        msg = by_id[op['message_id']]
+        op['timestamp'] = msg['timestamp']
+        op['is_sidechain'] = msg['is_sidechain']
+        msg['has_file_operations'] = True
+        msg['file_operation_count'] += 1
+        file_operations.append(op)
+
+    # Rebuild the timeline in log order, as the streaming converter writes it
+    ops_by_message = {}
+    for op in file_operations:
+        ops_by_message.setdefault(op['message_id'], []).append(op)
+    timeline = []
+    for msg in messages:
+        timeline.append({
+            'message_id': msg['id'],
+            'timestamp': msg['timestamp'],
+            'type': 'message',
+            'role': msg['role'],
+            'is_sidechain': msg['is_sidechain'],
+            'summary': msg['content_preview']
+        })
+        for op in ops_by_message.get(msg['id'], []):
+            timeline.append({
+                'message_id': msg['id'],
+                'timestamp': msg['timestamp'],
+                'type': 'file_operation',
+                'operation_type': op['type'],
+                'file_name': op['file_name'],
+                'summary': f"{op['type'].title()}: {op['file_name']}"
+            })
+
+    return {
+        'messages': messages,
+        'file_operations': file_operations,
+        'timeline': timeline,
+        'metadata': data['metadata'],
+        'session_stats': data['session_stats'],
+        'summary': data['summary']
+    }
@@ -6,10 +6,22 @@ Converts Claude JSONL logs to human-readable Markdown format.
 
 import json
 import argparse
+import shutil
+import tempfile
 from datetime import datetime
 from pathlib import Path
 import sys
 
+from claude_log_batch import is_batch_request, plan_batch, run_batch
+from claude_log_cache import add_cache_arguments, cache_config_from_args, cached_convert
+from claude_log_latency import format_seconds, new_tool_latency, summarize_tool_latency, update_tool_latency
+from claude_log_output import gzip_suffix, open_output
+from claude_log_parser import MalformedLine, iter_records
+from claude_log_profile import add_profile_arguments, profiling_requested, run_profiled
+from claude_log_secrets import RedactingWriter, add_secrets_argument, print_detection_report, redactor_from_args
+from claude_log_tree import new_tree_stats, summarize_tree_stats, update_tree_stats
+from claude_log_usage import new_usage_stats, summarize_usage_stats, update_usage_stats
+
 
 def format_timestamp(timestamp_str):
     """Convert ISO timestamp to readable format."""
@@ -221,9 +233,9 @@ def format_file_update(content):
         return f"✅ {str(content)}"
 
 
-def calculate_session_stats(lines):
-    """Calculate session statistics from log lines."""
-    stats = {
+def new_session_stats():
+    """Create an empty running session statistics accumulator."""
+    return {
         'total_messages': 0,
         'user_messages': 0,
         'assistant_messages': 0,
@@ -233,76 +245,96 @@ def calculate_session_stats(lines):
         'session_duration': None,
         'estimated_input_tokens': 0,
         'estimated_output_tokens': 0,
-        'estimated_total_tokens': 0
+        'estimated_total_tokens': 0,
+        'tool_latency': new_tool_latency(),
+        'usage': new_usage_stats(),
+        'conversation_tree': new_tree_stats()
     }
+
+
+def update_session_stats(stats, record):
+    """Add a single parsed record to running session statistics and return its conversation thread."""
+    # Malformed lines carry no message data
+    if isinstance(record, MalformedLine):
+        return None
     
-    for line in lines:
-        try:
-            data = json.loads(line.strip())
-            
-            # Skip meta messages
-            if data.get('isMeta') or 'message' not in data:
-                continue
-                
-            message = data['message']
-            content = message.get('content', '')
-            
-            # Skip empty messages
-            if not content:
-                continue
-                
-            # Track timestamps
-            timestamp = data.get('timestamp')
-            if timestamp:
-                if stats['start_time'] is None:
-                    stats['start_time'] = timestamp
-                stats['end_time'] = timestamp
-            
-            # Count messages by role and estimate tokens
-            role = message.get('role', '')
-            
-            # Estimate tokens for this message (improved approximation: 1 token ≈ 3 characters)
-            message_tokens = 0
-            if isinstance(content, str):
-                message_tokens = len(content) // 3
-            elif isinstance(content, list):
-                for part in content:
-                    if isinstance(part, dict):
-                        if part.get('type') == 'text':
-                            message_tokens += len(part.get('text', '')) // 3
-                        elif part.get('type') == 'tool_use':
-                            # Count tool use parameters (file paths, inputs, etc.)
-                            tool_input = part.get('input', {})
-                            tool_text = json.dumps(tool_input)
-                            message_tokens += len(tool_text) // 3
-                        elif part.get('type') == 'tool_result':
-                            # Count tool results (file contents, outputs, etc.)
-                            result_content = str(part.get('content', ''))
-                            message_tokens += len(result_content) // 3
-            
-            if role == 'user':
-                stats['user_messages'] += 1
-                stats['estimated_input_tokens'] += message_tokens
-            elif role == 'assistant':
-                stats['assistant_messages'] += 1
-                stats['estimated_output_tokens'] += message_tokens
-                
-            stats['total_messages'] += 1
-            
-            # Add overhead for message structure, system context, etc. (roughly 20% overhead)
-            message_tokens_with_overhead = int(message_tokens * 1.2)
-            stats['estimated_total_tokens'] += message_tokens_with_overhead
+    thread = None
+    try:
+        thread = update_tree_stats(stats['conversation_tree'], record)
+        # Pair tool calls with their results
+        update_tool_latency(stats['tool_latency'], record)
+        update_usage_stats(stats['usage'], record, thread)
+    except:
+        return thread
+    
+    update_message_stats(stats, record)
+    return thread
+
+
+def update_message_stats(stats, record):
+    """Add a record to the message counts, timestamps and token estimates, leaving the sub-accumulators alone.
+    
+    claude_log_formats shares the tool latency, usage and tree accumulators
+    with the JSON statistics, which update them, and calls this for the rest.
+    """
+    try:
+        content = record.content
+        
+        # Track timestamps
+        timestamp = record.timestamp
+        if timestamp:
+            if stats['start_time'] is None:
+                stats['start_time'] = timestamp
+            stats['end_time'] = timestamp
+        
+        # Count messages by role and estimate tokens
+        role = record.role
+        
+        # Estimate tokens for this message (improved approximation: 1 token ≈ 3 characters)
+        message_tokens = 0
+        if isinstance(content, str):
+            message_tokens = len(content) // 3
+        elif isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict):
+                    if part.get('type') == 'text':
+                        message_tokens += len(part.get('text', '')) // 3
+                    elif part.get('type') == 'tool_use':
+                        # Count tool use parameters (file paths, inputs, etc.)
+                        tool_input = part.get('input', {})
+                        tool_text = json.dumps(tool_input)
+                        message_tokens += len(tool_text) // 3
+                    elif part.get('type') == 'tool_result':
+                        # Count tool results (file contents, outputs, etc.)
+                        result_content = str(part.get('content', ''))
+                        message_tokens += len(result_content) // 3
+        
+        if role == 'user':
+            stats['user_messages'] += 1
+            stats['estimated_input_tokens'] += message_tokens
+        elif role == 'assistant':
+            stats['assistant_messages'] += 1
+            stats['estimated_output_tokens'] += message_tokens
             
-            # Count file operations
-            if isinstance(content, list):
-                for part in content:
-                    if isinstance(part, dict) and part.get('type') == 'tool_use':
-                        tool_name = part.get('name', '').lower()
-                        if tool_name in ['write', 'edit', 'multiedit', 'read']:
-                            stats['file_operations'] += 1
-                            
-        except:
-            continue
+        stats['total_messages'] += 1
+        
+        # Add overhead for message structure, system context, etc. (roughly 20% overhead)
+        message_tokens_with_overhead = int(message_tokens * 1.2)
+        stats['estimated_total_tokens'] += message_tokens_with_overhead
+        
+        # Count file operations
+        for part in record.tool_uses:
+            tool_name = part.get('name', '').lower()
+            if tool_name in ['write', 'edit', 'multiedit', 'read']:
+                stats['file_operations'] += 1
+                        
+    except:
+        pass
+
+
+def finalize_session_stats(stats):
+    """Return session statistics with the formatted session duration filled in."""
+    stats = dict(stats)
     
     # Calculate session duration
     if stats['start_time'] and stats['end_time']:
@@ -327,230 +359,306 @@ def calculate_session_stats(lines):
         except:
             stats['session_duration'] = "Unknown"
     
+    stats['tool_latency'] = summarize_tool_latency(stats['tool_latency'])
+    stats['usage'] = summarize_usage_stats(stats['usage'])
+    stats['conversation_tree'] = summarize_tree_stats(stats['conversation_tree'])
     return stats
 
 
-def convert_log_to_markdown(jsonl_file, output_file=None, presentation_mode=False):
-    """Convert JSONL log file to Markdown format."""
-    input_path = Path(jsonl_file)
+def calculate_session_stats(records):
+    """Calculate session statistics from parsed log records."""
+    stats = new_session_stats()
+    for record in records:
+        update_session_stats(stats, record)
+    return finalize_session_stats(stats)
+
+
+def is_read_operation(record):
+    """Check if a record's tool uses include a Read operation."""
+    for part in record.tool_uses:
+        if part.get('name', '').lower() == 'read':
+            return True
+    return False
+
+
+def write_file_update(f, record):
+    """Write a file update or file read section for a record."""
+    if is_read_operation(record):
+        # Write as file read instead of file update
+        f.write(f"## 📖 File Read\n\n")
+    else:
+        # Write as file update
+        f.write(f"## 📝 File Update\n\n")
     
-    if not input_path.exists():
-        print(f"Error: File {jsonl_file} not found")
-        return False
+    formatted_content = format_file_update(record.content)
+    f.write(f"{formatted_content}\n\n")
+    f.write("\n")
+
+
+def write_sidechain_messages(f, sidechain_records):
+    """Write a sub-session block."""
+    f.write(f"🔧 Sub-Claude Session\n\n")
     
-    if output_file is None:
-        output_file = input_path.with_suffix('.md')
+    for record in sidechain_records:
+        if record.role == 'user':
+            f.write(f"**Task:** {format_message_content(record.content)}\n\n")
+        elif record.role == 'assistant':
+            f.write(f"**Response:** {format_message_content(record.content)}\n\n")
     
-    output_path = Path(output_file)
+    f.write("\n")
+
+
+def write_header(f, input_path, stats):
+    """Write the document title and session statistics table."""
+    # Write header with session statistics
+    f.write(f"# 🤖 Claude Conversation Log\n\n")
+    f.write(f"> **Source:** `{input_path.name}` | **Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
     
-    try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # Calculate session statistics
-        stats = calculate_session_stats(lines)
+    # Session statistics in a table for better GitHub rendering
+    f.write("## 📊 Session Statistics\n\n")
+    f.write("| Metric | Value |\n")
+    f.write("|--------|-------|\n")
+    f.write(f"| **⏱️ Duration** | {stats['session_duration'] or 'Unknown'} |\n")
+    f.write(f"| **💬 Total Messages** | {stats['total_messages']:,} |\n")
+    f.write(f"| **👤 User Messages** | {stats['user_messages']:,} |\n")
+    f.write(f"| **🤖 Assistant Messages** | {stats['assistant_messages']:,} |\n")
+    f.write(f"| **📝 File Operations** | {stats['file_operations']:,} |\n")
+    f.write(f"| **📥 Input Tokens** | {stats['estimated_input_tokens']:,} |\n")
+    f.write(f"| **📤 Output Tokens** | {stats['estimated_output_tokens']:,} |\n")
+    f.write(f"| **🔢 Total Tokens** | {stats['estimated_total_tokens']:,} |\n")
+    tree = stats['conversation_tree']
+    if tree['sidechains'] or tree['forks']:
+        f.write(f"| **🌳 Sub-sessions / Forks** | {tree['sidechains']:,} / {tree['forks']:,} |\n")
+    if stats['start_time'] and stats['end_time']:
+        f.write(f"| **🚀 Session Start** | {format_timestamp(stats['start_time'])} |\n")
+        f.write(f"| **🏁 Session End** | {format_timestamp(stats['end_time'])} |\n")
+    f.write("\n")
+    
+    write_model_usage(f, stats['usage'])
+    write_tool_latency(f, stats['tool_latency'])
+
+
+def write_model_usage(f, usage):
+    """Write token usage, model response latency, throughput and prompt-cache metrics."""
+    if not usage['api_messages']:
+        return
+    
+    f.write("## ⚡ Model Usage\n\n")
+    f.write("| Metric | Value |\n")
+    f.write("|--------|-------|\n")
+    f.write(f"| **🔁 API Responses** | {usage['api_messages']:,} |\n")
+    f.write(f"| **📥 Input Tokens** | {usage['input_tokens']:,} |\n")
+    f.write(f"| **💾 Cache Read Tokens** | {usage['cache_read_input_tokens']:,} |\n")
+    f.write(f"| **✍️ Cache Write Tokens** | {usage['cache_creation_input_tokens']:,} |\n")
+    f.write(f"| **📤 Output Tokens** | {usage['output_tokens']:,} |\n")
+    f.write(f"| **🔢 Total Tokens** | {usage['total_tokens']:,} |\n")
+    if usage['cache_hit_ratio'] is not None:
+        f.write(f"| **🎯 Cache Hit Ratio** | {usage['cache_hit_ratio']:.1%} |\n")
+    latency = usage['response_latency']
+    if latency:
+        f.write(f"| **⏳ Response Latency** | p50 {format_seconds(latency['p50_seconds'])}, "
+                f"p95 {format_seconds(latency['p95_seconds'])}, max {format_seconds(latency['max_seconds'])} |\n")
+    first_token = usage['time_to_first_token']
+    if first_token:
+        f.write(f"| **⏱️ Time to First Token** | p50 {format_seconds(first_token['p50_seconds'])}, "
+                f"p95 {format_seconds(first_token['p95_seconds'])}, max {format_seconds(first_token['max_seconds'])} |\n")
+    throughput = usage['output_tokens_per_second']
+    if throughput:
+        f.write(f"| **🚄 Output Tokens/s** | {throughput['overall']:,.1f} overall, "
+                f"p50 {throughput['p50']:,.1f}, p95 {throughput['p95']:,.1f} |\n")
+    f.write("\n")
+    
+    windows = [window for window in usage['cache_hit_ratio_over_time'] if window['cache_hit_ratio'] is not None]
+    if len(windows) > 1:
+        f.write("**Cache hit ratio over time:**\n\n")
+        f.write("| From | Responses | Cache Hit Ratio |\n")
+        f.write("|------|----------:|----------------:|\n")
+        for window in windows:
+            f.write(f"| {format_timestamp(window['window_start'])} | {window['api_messages']:,} | "
+                    f"{window['cache_hit_ratio']:.1%} |\n")
+        f.write("\n")
+
+
+def write_tool_latency(f, latency):
+    """Write per-tool latency distributions and the slowest individual calls."""
+    if not latency['tools']:
+        return
+    
+    f.write("## ⏱️ Tool Latency\n\n")
+    f.write("| Tool | Calls | p50 | p95 | Max | Total |\n")
+    f.write("|------|------:|----:|----:|----:|------:|\n")
+    for name, tool in latency['tools'].items():
+        f.write(f"| **{name}** | {tool['count']:,} | {format_seconds(tool['p50_seconds'])} | "
+                f"{format_seconds(tool['p95_seconds'])} | {format_seconds(tool['max_seconds'])} | "
+                f"{format_seconds(tool['total_seconds'])} |\n")
+    f.write("\n")
+    
+    f.write("**Slowest calls:**\n\n")
+    for call in latency['slowest_calls']:
+        summary = f" `{call['summary']}`" if call['summary'] else ''
+        f.write(f"- {format_seconds(call['duration_seconds'])} **{call['tool']}**{summary} "
+                f"(line {call['line_number']}, {format_timestamp(call['timestamp'])})\n")
+    if latency['unmatched_calls']:
+        f.write(f"- {latency['unmatched_calls']:,} calls without a result\n")
+    f.write("\n")
+
+
+def render_records(f, placed_records, presentation_mode=False):
+    """Render (record, conversation thread) pairs as Markdown and return the number of messages written.
+    
+    The threads come from the statistics pass (see track_session_stats), so
+    the conversation tree is built once. Sub-session lines are held until the
+    next main-session line and written as one block per thread, in file order,
+    so parallel sub-agents are not mixed; only the lines since the last
+    main-session line are held, so streaming and fully parsed input render
+    the same.
+    """
+    # Messages are counted while rendering instead of in a separate pass
+    message_count = 0
+    pending_threads = {}
+    
+    for record, thread in placed_records:
+        if isinstance(record, MalformedLine):
+            if isinstance(record.error, json.JSONDecodeError):
+                f.write(f"## Error parsing line {record.line_number}\n\n")
+                f.write(f"```\n{record.raw.strip()}\n```\n\n")
+                f.write(f"Error: {record.error}\n\n")
+            else:
+                f.write(f"## Error processing line {record.line_number}\n\n")
+                f.write(f"Error: {record.error}\n\n")
+            continue
         
-        # First pass to count actual messages for display
-        message_count = 0
-        for line in lines:
-            try:
-                data = json.loads(line.strip())
-                if (data.get('isMeta') or (data.get('type') == 'user' and not data.get('message')) 
-                    or 'message' not in data or not data['message'].get('content')):
-                    continue
+        try:
+            role = record.role
+            content = record.content
+            
+            # Check if this is a sidechain (sub-session) message
+            if record.is_sidechain:
+                if not presentation_mode:
+                    pending_threads.setdefault(thread, []).append(record)
+                elif role == 'assistant' and is_file_update_message(content):
+                    # In presentation mode, only file updates from sidechains are shown
+                    write_file_update(f, record)
+                    message_count += 1
+                # Skip other sidechain messages if presentation_mode is True
+            else:
+                # First, write the sub-sessions that ran since the last main-session line
+                for sidechain_records in pending_threads.values():
+                    write_sidechain_messages(f, sidechain_records)
+                pending_threads.clear()
                 
-                # Handle sidechain messages
-                if data.get('isSidechain', False):
-                    if presentation_mode:
-                        # Only count file updates from sidechains in presentation mode
-                        if data.get('message', {}).get('role') == 'assistant' and is_file_update_message(data['message'].get('content')):
-                            message_count += 1
+                # Check if this is a file update in main session
+                if presentation_mode and role == 'assistant' and is_file_update_message(content):
+                    write_file_update(f, record)
+                    message_count += 1
                     continue
                 
-                # In presentation mode, also check if content would be empty after filtering
-                if presentation_mode:
-                    # Always count file updates in main session
-                    if data.get('message', {}).get('role') == 'assistant' and is_file_update_message(data['message'].get('content')):
-                        message_count += 1
-                        continue
-                        
-                    test_content = format_message_content(data['message']['content'], presentation_mode)
-                    if not test_content.strip():
-                        continue
+                # Write content first to check if it's empty
+                formatted_content = format_message_content(content, presentation_mode)
+                
+                # Skip empty messages in presentation mode
+                if presentation_mode and not formatted_content.strip():
+                    continue
                 
                 message_count += 1
-            except:
-                continue
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # Write header with session statistics
-            f.write(f"# 🤖 Claude Conversation Log\n\n")
-            f.write(f"> **Source:** `{input_path.name}` | **Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            
-            # Session statistics in a table for better GitHub rendering
-            f.write("## 📊 Session Statistics\n\n")
-            f.write("| Metric | Value |\n")
-            f.write("|--------|-------|\n")
-            f.write(f"| **⏱️ Duration** | {stats['session_duration'] or 'Unknown'} |\n")
-            f.write(f"| **💬 Total Messages** | {stats['total_messages']:,} |\n")
-            f.write(f"| **👤 User Messages** | {stats['user_messages']:,} |\n")
-            f.write(f"| **🤖 Assistant Messages** | {stats['assistant_messages']:,} |\n")
-            f.write(f"| **📝 File Operations** | {stats['file_operations']:,} |\n")
-            f.write(f"| **📥 Input Tokens** | {stats['estimated_input_tokens']:,} |\n")
-            f.write(f"| **📤 Output Tokens** | {stats['estimated_output_tokens']:,} |\n")
-            f.write(f"| **🔢 Total Tokens** | {stats['estimated_total_tokens']:,} |\n")
-            if stats['start_time'] and stats['end_time']:
-                f.write(f"| **🚀 Session Start** | {format_timestamp(stats['start_time'])} |\n")
-                f.write(f"| **🏁 Session End** | {format_timestamp(stats['end_time'])} |\n")
-            f.write("\n")
-            sidechain_messages = []
-            
-            for i, line in enumerate(lines):
-                try:
-                    data = json.loads(line.strip())
-                    
-                    # Skip meta messages and system messages
-                    if data.get('isMeta') or (data.get('type') == 'user' and not data.get('message')):
-                        continue
-                    
-                    # Only process actual conversation messages
-                    if 'message' not in data:
-                        continue
-                    
-                    message = data['message']
-                    role = message.get('role', 'unknown')
-                    content = message.get('content', '')
-                    
-                    # Skip empty messages
-                    if not content:
-                        continue
-                    
-                    # Check if this is a sidechain (sub-session) message
-                    is_sidechain = data.get('isSidechain', False)
-                    
-                    if is_sidechain:
-                        if not presentation_mode:
-                            # Collect sidechain messages
-                            sidechain_messages.append({
-                                'role': role,
-                                'content': content,
-                                'formatted_content': format_message_content(content, presentation_mode)
-                            })
-                        else:
-                            # In presentation mode, check if this is a file update
-                            if role == 'assistant' and is_file_update_message(content):
-                                # Check if this is a read operation
-                                is_read_operation = False
-                                if isinstance(content, list):
-                                    for part in content:
-                                        if isinstance(part, dict) and part.get('type') == 'tool_use':
-                                            if part.get('name', '').lower() == 'read':
-                                                is_read_operation = True
-                                                break
-                                
-                                if is_read_operation:
-                                    # Write as file read instead of file update
-                                    f.write(f"## 📖 File Read\n\n")
-                                else:
-                                    # Write as file update
-                                    f.write(f"## 📝 File Update\n\n")
-                                
-                                formatted_content = format_file_update(content)
-                                f.write(f"{formatted_content}\n\n")
-                                f.write("\n")
-                        # Skip other sidechain messages if presentation_mode is True
+                
+                # Check if message is short enough for inline format
+                is_short_message = (
+                    len(formatted_content.strip()) <= 80 and
+                    '\n' not in formatted_content.strip() and
+                    not formatted_content.startswith('🛑') and
+                    not formatted_content.startswith('⏸️')
+                )
+                
+                if is_short_message:
+                    # Write as inline format with better styling
+                    if role == 'user':
+                        f.write(f"### 👤 User\n> {formatted_content.strip()}\n\n")
+                    elif role == 'assistant':
+                        f.write(f"### 🤖 Assistant\n> {formatted_content.strip()}\n\n")
                     else:
-                        # First, write any accumulated sidechain messages
-                        if sidechain_messages and not presentation_mode:
-                            f.write(f"🔧 Sub-Claude Session\n\n")
-                            
-                            for sc_msg in sidechain_messages:
-                                if sc_msg['role'] == 'user':
-                                    f.write(f"**Task:** {sc_msg['formatted_content']}\n\n")
-                                elif sc_msg['role'] == 'assistant':
-                                    f.write(f"**Response:** {sc_msg['formatted_content']}\n\n")
-                            
-                            f.write("\n")
-                            sidechain_messages = []
-                        
-                        # Check if this is a file update in main session
-                        if presentation_mode and role == 'assistant' and is_file_update_message(content):
-                            # Check if this is a read operation
-                            is_read_operation = False
-                            if isinstance(content, list):
-                                for part in content:
-                                    if isinstance(part, dict) and part.get('type') == 'tool_use':
-                                        if part.get('name', '').lower() == 'read':
-                                            is_read_operation = True
-                                            break
-                            
-                            if is_read_operation:
-                                # Write as file read instead of file update
-                                f.write(f"## 📖 File Read\n\n")
-                            else:
-                                # Write as file update
-                                f.write(f"## 📝 File Update\n\n")
-                            
-                            formatted_content = format_file_update(content)
-                            f.write(f"{formatted_content}\n\n")
-                            f.write("\n")
-                            continue
-                        
-                        # Write content first to check if it's empty
-                        formatted_content = format_message_content(content, presentation_mode)
-                        
-                        # Skip empty messages in presentation mode
-                        if presentation_mode and not formatted_content.strip():
-                            continue
-                        
-                        # Check if message is short enough for inline format
-                        is_short_message = (
-                            len(formatted_content.strip()) <= 80 and
-                            '\n' not in formatted_content.strip() and
-                            not formatted_content.startswith('🛑') and
-                            not formatted_content.startswith('⏸️')
-                        )
-                        
-                        if is_short_message:
-                            # Write as inline format with better styling
-                            if role == 'user':
-                                f.write(f"### 👤 User\n> {formatted_content.strip()}\n\n")
-                            elif role == 'assistant':
-                                f.write(f"### 🤖 Assistant\n> {formatted_content.strip()}\n\n")
-                            else:
-                                f.write(f"### {role.title()}\n> {formatted_content.strip()}\n\n")
-                        else:
-                            # Write block format with proper headers
-                            if role == 'user':
-                                f.write(f"### 👤 User\n\n")
-                            elif role == 'assistant':
-                                f.write(f"### 🤖 Assistant\n\n")
-                            else:
-                                f.write(f"### {role.title()}\n\n")
-                            
-                            f.write(f"{formatted_content}\n\n")
-                        
-                        f.write("\n")
+                        f.write(f"### {role.title()}\n> {formatted_content.strip()}\n\n")
+                else:
+                    # Write block format with proper headers
+                    if role == 'user':
+                        f.write(f"### 👤 User\n\n")
+                    elif role == 'assistant':
+                        f.write(f"### 🤖 Assistant\n\n")
+                    else:
+                        f.write(f"### {role.title()}\n\n")
                     
-                except json.JSONDecodeError as e:
-                    f.write(f"## Error parsing line {i+1}\n\n")
-                    f.write(f"```\n{line.strip()}\n```\n\n")
-                    f.write(f"Error: {e}\n\n")
-                except Exception as e:
-                    f.write(f"## Error processing line {i+1}\n\n")
-                    f.write(f"Error: {e}\n\n")
-            
-            # Write any remaining sidechain messages at the end
-            if sidechain_messages and not presentation_mode:
-                f.write(f"🔧 Sub-Claude Session\n\n")
-                
-                for sc_msg in sidechain_messages:
-                    if sc_msg['role'] == 'user':
-                        f.write(f"**Task:** {sc_msg['formatted_content']}\n\n")
-                    elif sc_msg['role'] == 'assistant':
-                        f.write(f"**Response:** {sc_msg['formatted_content']}\n\n")
+                    f.write(f"{formatted_content}\n\n")
                 
                 f.write("\n")
+            
+        except Exception as e:
+            f.write(f"## Error processing line {record.line_number}\n\n")
+            f.write(f"Error: {e}\n\n")
+    
+    # Write any remaining sidechain messages at the end
+    for sidechain_records in pending_threads.values():
+        write_sidechain_messages(f, sidechain_records)
+    
+    return message_count
+
+
+def write_markdown(output_path, input_path, placed_records, stats, presentation_mode=False, redactor=None):
+    """Write the Markdown document of fully parsed (record, thread) pairs and return the number of messages written."""
+    with open_output(output_path) as f:
+        if redactor:
+            f = RedactingWriter(f, redactor)
+        write_header(f, input_path, stats)
+        message_count = render_records(f, placed_records, presentation_mode)
+        f.flush()
+        return message_count
+
+
+def track_session_stats(records, stats):
+    """Add records to running statistics, yielding each with its conversation thread."""
+    for record in records:
+        yield record, update_session_stats(stats, record)
+
+
+def convert_log_to_markdown(jsonl_file, output_file=None, presentation_mode=False, streaming=False, redactor=None):
+    """Convert JSONL log file to Markdown format, redacting secrets while writing when a redactor is given."""
+    input_path = Path(jsonl_file)
+    
+    if not input_path.exists():
+        print(f"Error: File {jsonl_file} not found")
+        return False
+    
+    if output_file is None:
+        output_file = input_path.with_suffix('.md')
+    
+    output_path = Path(output_file)
+    
+    try:
+        if streaming:
+            # Decode lazily and render the body to a spool file while statistics
+            # accumulate, then write the header and copy the body after it
+            stats = new_session_stats()
+            with open(input_path, 'rb') as src, \
+                    tempfile.TemporaryFile('w+', encoding='utf-8') as body:
+                writer = RedactingWriter(body, redactor) if redactor else body
+                message_count = render_records(
+                    writer, track_session_stats(iter_records(src), stats), presentation_mode)
+                writer.flush()
+                
+                with open_output(output_path) as f:
+                    header = RedactingWriter(f, redactor) if redactor else f
+                    write_header(header, input_path, finalize_session_stats(stats))
+                    header.flush()
+                    body.seek(0)
+                    shutil.copyfileobj(body, f)
+        else:
+            with open(input_path, 'rb') as f:
+                records = list(iter_records(f))
+            
+            # Calculate session statistics, placing every record in its thread
+            stats = new_session_stats()
+            placed_records = list(track_session_stats(records, stats))
+            message_count = write_markdown(output_path, input_path, placed_records,
+                                           finalize_session_stats(stats), presentation_mode, redactor)
         
         print(f"Successfully converted {message_count} messages to {output_path}")
         return True
@@ -562,15 +670,45 @@ def convert_log_to_markdown(jsonl_file, output_file=None, presentation_mode=Fals
 
 def main():
     parser = argparse.ArgumentParser(description='Convert Claude JSONL logs to Markdown')
-    parser.add_argument('input_file', help='Path to the JSONL log file')
+    parser.add_argument('input_file', nargs='+', help='Path to the JSONL log file (or several files, directories or globs for batch mode)')
     parser.add_argument('-o', '--output', help='Output Markdown file (default: input_file.md)')
     parser.add_argument('--presentation-mode', action='store_true', help='Clean presentation mode: hide sub-sessions and tool details')
+    parser.add_argument('--stream', action='store_true', help='Constant-memory streaming mode for very large logs')
+    parser.add_argument('--gzip', action='store_true', help='Write gzip-compressed output (.md.gz); also implied by an -o path ending in .gz')
+    parser.add_argument('-j', '--workers', type=int, help='Batch mode: number of worker processes (default: CPU count)')
+    parser.add_argument('--output-dir', help='Batch mode: write outputs under this directory instead of next to the inputs')
+    add_secrets_argument(parser)
+    add_cache_arguments(parser)
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
+    cache = cache_config_from_args(args)
+    redactor = redactor_from_args(args)
+    profile = profiling_requested(args)
+    
+    if profile and (cache or is_batch_request(args.input_file)):
+        parser.error('--profile only applies to a single input file without --cache')
     
-    success = convert_log_to_markdown(args.input_file, args.output, args.presentation_mode)
+    options = {'presentation_mode': args.presentation_mode, 'streaming': args.stream, 'redactor': redactor}
+    suffix = gzip_suffix('.md', args.gzip)
+    if profile:
+        output_file = args.output or (Path(args.input_file[0]).with_suffix(suffix) if args.gzip else None)
+        success = run_profiled(convert_log_to_markdown, args.input_file[0], output_file, args, **options)
+    elif is_batch_request(args.input_file):
+        if args.output:
+            parser.error('-o/--output only applies to a single input file; use --output-dir in batch mode')
+        jobs = plan_batch(args.input_file, suffix, args.output_dir)
+        success = run_batch(convert_log_to_markdown, jobs, args.workers, cache, **options)
+    elif cache:
+        output_file = args.output or Path(args.input_file[0]).with_suffix(suffix)
+        success = cached_convert(convert_log_to_markdown, args.input_file[0], output_file, options, cache)
+    else:
+        output_file = args.output or (Path(args.input_file[0]).with_suffix(suffix) if args.gzip else None)
+        success = convert_log_to_markdown(args.input_file[0], output_file, **options)
+        if success:
+            print_detection_report(redactor)
     sys.exit(0 if success else 1)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
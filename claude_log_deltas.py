@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Claude Log Write Deltas
+Stores repeated Writes of a file as line deltas against the previous Write of the same path.
+"""
+
+import json
+import re
+from difflib import SequenceMatcher
+
+LINE_PATTERN = re.compile(r'[^\n]*\n|[^\n]+')
+
+
+def split_lines(text):
+    """Split text into lines that keep their newline; only '\\n' ends a line, as in the viewer."""
+    return LINE_PATTERN.findall(text)
+
+
+def make_delta(base, text):
+    """Encode text as a list of [start, count] runs copied from base's lines and literal strings."""
+    base_lines = split_lines(base)
+    lines = split_lines(text)
+    delta = []
+
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, base_lines, lines).get_opcodes():
+        if tag == 'equal':
+            delta.append([i1, i2 - i1])
+        elif j2 > j1:
+            inserted = ''.join(lines[j1:j2])
+            if delta and isinstance(delta[-1], str):
+                delta[-1] += inserted
+            else:
+                delta.append(inserted)
+    return delta
+
+
+def apply_delta(base, delta):
+    """Rebuild the text a delta was made from."""
+    base_lines = split_lines(base)
+    parts = []
+    for item in delta:
+        if isinstance(item, str):
+            parts.append(item)
+        else:
+            start, count = item
+            parts.extend(base_lines[start:start + count])
+    return ''.join(parts)
+
+
+class DeltaEncoder:
+    """Replaces the content of each Write after the first to a path with a delta.
+
+    Write operations must be passed in output order, so that readers walking
+    file_operations in order always meet a delta's base first. A delta is only
+    kept when it is smaller than the content it replaces.
+    """
+
+    def __init__(self):
+        self.previous = {}
+
+    def encode(self, op):
+        if op['type'] != 'write' or not op.get('file_path'):
+            return op
+
+        content = op.get('content_preview', '')
+        base = self.previous.get(op['file_path'])
+        self.previous[op['file_path']] = content
+        if not base:
+            return op
+
+        delta = make_delta(base, content)
+        if len(json.dumps(delta, ensure_ascii=False)) < len(content):
+            del op['content_preview']
+            op['content_delta'] = delta
+        return op
+
+
+def expand_write_deltas(file_operations):
+    """Restore the full content of delta-encoded Writes in place, walking operations in order."""
+    previous = {}
+    for op in file_operations:
+        if op.get('type') != 'write' or not op.get('file_path'):
+            continue
+        if 'content_delta' in op:
+            op['content_preview'] = apply_delta(previous[op['file_path']], op.pop('content_delta'))
+        previous[op['file_path']] = op.get('content_preview', '')
+    return file_operations
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Claude Log Secret Detection
+Finds common credential shapes and high-entropy tokens that no secrets file lists, in one scan per string.
+"""
+
+import hashlib
+import math
+import re
+import threading
+from collections import Counter
+from functools import partial
+
+# (rule, pattern); a (?P<value>...) group marks the part replaced, the rest of the match is kept.
+# Earlier rules win where two could match at the same position.
+RULES = (
+    ('private_key', r'-----BEGIN (?:[A-Z0-9]+ )*PRIVATE KEY-----'
+                    r'(?:[\s\S]*?-----END (?:[A-Z0-9]+ )*PRIVATE KEY-----|[A-Za-z0-9+/=\s]*)'),
+    ('anthropic_api_key', r'\bsk-ant-[A-Za-z0-9_\-]{20,}'),
+    ('openai_api_key', r'\bsk-(?:proj-)?[A-Za-z0-9_\-]{20,}'),
+    ('aws_access_key', r'\b(?:AKIA|ASIA)[0-9A-Z]{16}\b'),
+    ('github_token', r'\b(?:gh[pousr]_[A-Za-z0-9]{36,}|github_pat_[A-Za-z0-9_]{22,})'),
+    ('slack_token', r'\bxox[abprs]-[A-Za-z0-9\-]{10,}'),
+    ('google_api_key', r'\bAIza[0-9A-Za-z_\-]{35}'),
+    ('stripe_key', r'\b[rs]k_(?:live|test)_[0-9A-Za-z]{16,}'),
+    ('jwt', r'\beyJ[A-Za-z0-9_\-]{8,}\.eyJ[A-Za-z0-9_\-]{8,}\.[A-Za-z0-9_\-]{8,}'),
+    ('bearer_token', r'\b[Bb]earer\s+(?P<value>[A-Za-z0-9\-._~+/]{16,}=*)'),
+    ('connection_string', r'\b[a-z][a-z0-9+.\-]{1,20}://[^\s:/@\'"]+:(?P<value>[^\s:/@\'"]+)@'),
+    # The keyword may sit anywhere in the name, as in DB_PASSWORD or client_secret
+    ('password_assignment', r'(?i:[A-Za-z0-9_]*(?:password|passwd|secret(?:[_-]?key)?|api[_-]?key|token)[A-Za-z0-9_]*)'
+                            r'["\']?\s*[:=]\s*["\']?(?P<value>[A-Za-z0-9_\-+/=.!@#$%^&*]{8,})'),
+    # A run followed by a file extension is a file name, not a key
+    ('high_entropy', r'(?<![A-Za-z0-9+/=_\-])[A-Za-z0-9+/_\-]{32,}={0,2}(?![A-Za-z0-9+/=_\-])(?!\.[A-Za-z])'),
+)
+
+# Every match of the other rules lies inside one run of these characters; a run of them
+# has no neighbour from the set, so a run can be scanned on its own with the same result
+RUN = r'[A-Za-z0-9+/=_\-.]{15,}'
+# Rules that can span several runs have one of these literals in every match (keywords in lower case)
+SPANNING_LITERALS = ('-----BEGIN', 'earer', '://')
+SPANNING_KEYWORDS = ('passw', 'secret', 'api_key', 'api-key', 'apikey', 'token')
+
+HIGH_ENTROPY_BITS = 4.0
+# Dotted names such as settings.apiKey2 are attribute accesses, not passwords
+ATTRIBUTE_ACCESS = re.compile(r'[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)+')
+# Lowercase or capitalized words of three or more letters, as in identifiers and file names
+WORD = re.compile(r'[A-Z]?[a-z]{3,}')
+# Share of letters and digits in words above which a token reads as a name; random
+# keys stay below it in all but about one in 10,000 cases
+WORD_SHARE = 0.7
+
+
+def shannon_entropy(text):
+    """Bits per character of a string's character distribution."""
+    length = len(text)
+    return -sum(count / length * math.log2(count / length) for count in Counter(text).values())
+
+
+def looks_like_words(value):
+    # camelCase and snake_case names are mostly words; random keys switch case too often
+    alphanumeric = sum(char.isalnum() for char in value)
+    return alphanumeric > 0 and sum(map(len, WORD.findall(value))) >= WORD_SHARE * alphanumeric
+
+
+def looks_like_path(value):
+    # Relative and home paths, or several segments that each read as a name (slashes alone
+    # do not make a path: base64 has them too)
+    if value.startswith(('./', '../', '~/')):
+        return True
+    segments = [segment for segment in value.split('/') if segment]
+    return len(segments) >= 2 and all(
+        len(segment) <= 3 or segment.isdigit() or looks_like_words(segment) for segment in segments)
+
+
+def looks_like_password(value):
+    # Assignments from variables and attributes (password=self.password) are code, not secrets
+    if ATTRIBUTE_ACCESS.fullmatch(value) or looks_like_path(value):
+        return False
+    return any(char.isdigit() for char in value) and any(char.isalpha() for char in value)
+
+
+def looks_random(value, bits=HIGH_ENTROPY_BITS):
+    # Hex digests and UUIDs lack one of the character classes of random keys
+    return (any(char.isupper() for char in value) and any(char.islower() for char in value)
+            and any(char.isdigit() for char in value) and not looks_like_words(value)
+            and not looks_like_path(value) and shannon_entropy(value) >= bits)
+
+
+VALIDATORS = {
+    'password_assignment': looks_like_password,
+    'high_entropy': looks_random,
+}
+
+
+class SecretDetector:
+    """All detection rules compiled into one pattern, with per-rule hit counts.
+
+    A string is scanned once: a cheap pre-filter (substring checks for the
+    literals of the rules that can span whitespace) decides whether the whole
+    string needs the combined pattern; otherwise only runs of 15 or more token
+    characters, found by a plain character-class scan, are matched against it.
+    Counts only cover this process, so batch workers keep their own; the
+    server's handler threads share one detector, so counts are updated under
+    a lock.
+    """
+
+    def __init__(self, rules=RULES, entropy_bits=HIGH_ENTROPY_BITS):
+        self.rules = [name for name, _ in rules]
+        self.validators = dict(VALIDATORS, high_entropy=partial(looks_random, bits=entropy_bits))
+        self.value_groups = set()
+        alternatives = []
+        for name, pattern in rules:
+            if '(?P<value>' in pattern:
+                # Group names must be unique across the combined pattern
+                pattern = pattern.replace('(?P<value>', f'(?P<{name}_value>')
+                self.value_groups.add(name)
+            alternatives.append(f'(?P<{name}>{pattern})')
+        # Every rule starts a word, so one lookbehind spares trying each rule mid-word
+        self.pattern = re.compile(f"(?<![A-Za-z0-9_])(?:{'|'.join(alternatives)})")
+        self.runs = re.compile(RUN)
+        self.hits = Counter()
+        self.hits_lock = threading.Lock()
+        # Stable identity for conversion cache keys
+        self.cache_token = hashlib.sha256(repr((rules, entropy_bits)).encode('utf-8')).hexdigest()
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __getstate__(self):
+        # Detectors are sent to worker processes, which start with their own lock
+        state = dict(self.__dict__)
+        del state['hits_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.hits_lock = threading.Lock()
+
+    def needs_full_scan(self, text):
+        if any(literal in text for literal in SPANNING_LITERALS):
+            return True
+        lowered = text.lower()
+        return any(keyword in lowered for keyword in SPANNING_KEYWORDS)
+
+    def _replace(self, match):
+        rule = match.lastgroup
+        if rule in self.value_groups:
+            value_group = f'{rule}_value'
+            value = match.group(value_group)
+        else:
+            value = match.group(rule)
+
+        validator = self.validators.get(rule)
+        if validator and not validator(value):
+            return match.group(0)
+
+        with self.hits_lock:
+            self.hits[rule] += 1
+        placeholder = f'[{rule.upper()}]'
+        if rule not in self.value_groups:
+            return placeholder
+        # Keep the context around the secret, e.g. the host of a connection string
+        text = match.group(0)
+        offset = match.start()
+        start, end = match.span(value_group)
+        return text[:start - offset] + placeholder + text[end - offset:]
+
+    def hit_counts(self):
+        """Return a snapshot of the per-rule hit counts."""
+        with self.hits_lock:
+            return Counter(self.hits)
+
+    def _redact_run(self, run):
+        return self.pattern.sub(self._replace, run.group(0))
+
+    def redact(self, text):
+        """Replace every detected secret in text."""
+        if not text:
+            return text
+        if self.needs_full_scan(text):
+            return self.pattern.sub(self._replace, text)
+        return self.runs.sub(self._redact_run, text)
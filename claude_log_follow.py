@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Claude Log Follow Mode
+Incrementally converts live, growing Claude JSONL logs to JSON.
+"""
+
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from claude_log_batch import plan_batch
+from claude_log_output import GZIP_LEVEL, gzip_suffix, is_gzip_path
+from claude_log_parser import CONVERTER_VERSION, MalformedLine, iter_records
+from claude_log_secrets import apply_secret_replacements_to_dict
+from claude_log_to_json import (
+    build_message_entries, build_stream_tail, finalize_session_stats, new_session_stats, update_session_stats,
+    write_array_item
+)
+
+ARRAY_NAMES = ('messages', 'file_operations', 'timeline')
+SET_STATS = ('files_modified', 'programming_languages')
+# Layout of a follow document changes with this, as converter output does with CONVERTER_VERSION
+FOLLOW_FORMAT = 2
+# Each array is followed by free space for later items: half its size, and at least this much
+MIN_FREE_BYTES = 16 * 1024
+
+
+def state_dir_for(output_path):
+    """Return the directory holding the checkpoint (and, for gzip outputs, the document) of a followed output."""
+    return output_path.with_name(output_path.name + '.follow')
+
+
+def document_path_for(output_path, state_dir):
+    """Return the uncompressed document updated in place: the output itself unless it is gzip-compressed."""
+    return state_dir / 'document.json' if is_gzip_path(output_path) else output_path
+
+
+def redactor_token(redactor):
+    """Identify the secrets a followed output was redacted with."""
+    return redactor.cache_token if redactor else None
+
+
+def new_checkpoint(input_path, include_content, redactor=None):
+    """Create a checkpoint for a log that has not been processed yet."""
+    return {
+        'version': [CONVERTER_VERSION, FOLLOW_FORMAT],
+        'source_file': str(input_path.resolve()),
+        'include_content': include_content,
+        'redactor': redactor_token(redactor),
+        'offset': 0,
+        'lines': 0,
+        'message_count': 0,
+        'file_operation_count': 0,
+        'timeline_count': 0,
+        # Per array: [start of its items, end of its items, end of its free space] in the document
+        'arrays': None,
+        'document_size': 0,
+        'stats': new_session_stats()
+    }
+
+
+def load_checkpoint(state_dir, input_path, include_content, redactor=None):
+    """Load the checkpoint for a followed log, or None if it is missing or stale."""
+    checkpoint_path = state_dir / 'checkpoint.json'
+    if not checkpoint_path.exists():
+        return None
+
+    try:
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable checkpoint {checkpoint_path}: {e}")
+        return None
+
+    if (checkpoint.get('version') != [CONVERTER_VERSION, FOLLOW_FORMAT]
+            or checkpoint.get('source_file') != str(input_path.resolve())
+            or checkpoint.get('include_content') != include_content
+            or checkpoint.get('redactor') != redactor_token(redactor)):
+        return None
+
+    for key in SET_STATS:
+        checkpoint['stats'][key] = set(checkpoint['stats'][key])
+    return checkpoint
+
+
+def save_checkpoint(state_dir, checkpoint):
+    """Atomically write a checkpoint, storing running sets as lists."""
+    data = dict(checkpoint)
+    data['stats'] = dict(checkpoint['stats'])
+    for key in SET_STATS:
+        data['stats'][key] = sorted(data['stats'][key])
+
+    checkpoint_path = state_dir / 'checkpoint.json'
+    tmp_path = checkpoint_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def read_complete_lines(input_path, position):
+    """Yield complete lines appended after position['offset'], advancing it past each one.
+
+    A partially written last line (no trailing newline yet) is left for the next update.
+    """
+    with open(input_path, 'rb') as f:
+        f.seek(position['offset'])
+        for raw in f:
+            if not raw.endswith(b'\n'):
+                break
+            position['offset'] += len(raw)
+            yield raw
+
+
+def encode_tail(input_path, checkpoint, redactor=None):
+    """Serialize the keys after the arrays: metadata, statistics and summary."""
+    stats = finalize_session_stats(checkpoint['stats'])
+    tail = build_stream_tail(input_path, checkpoint['lines'], checkpoint['include_content'], stats,
+                             checkpoint['message_count'], checkpoint['file_operation_count'])
+    if redactor:
+        tail = apply_secret_replacements_to_dict(tail, redactor)
+    # The trailing keys of the top-level object, as finish_json_stream writes them
+    return json.dumps(tail, indent=2, ensure_ascii=False)[2:].encode('utf-8')
+
+
+def copy_bytes(src, dst, length, chunk_size=1 << 20):
+    while length > 0:
+        chunk = src.read(min(chunk_size, length))
+        if not chunk:
+            break
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+def write_document(document_path, arrays, spools, tail):
+    """Write a new document from the items already in the old one plus the spooled new ones.
+
+    Every array gets free space after its items, so the next updates can add
+    items in place. Returns the new array offsets and the document size.
+    """
+    tmp_path = document_path.with_name(document_path.name + '.tmp')
+    offsets = {}
+    old = open(document_path, 'rb') if arrays else None
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(b'{\n  ')
+            for index, name in enumerate(ARRAY_NAMES):
+                if index:
+                    f.write(b',\n  ')
+                f.write(f'"{name}": ['.encode('utf-8'))
+                start = f.tell()
+                if old is not None:
+                    item_start, item_end, _ = arrays[name]
+                    old.seek(item_start)
+                    copy_bytes(old, f, item_end - item_start)
+                spools[name].seek(0)
+                shutil.copyfileobj(spools[name], f)
+                end = f.tell()
+                f.write(b' ' * max(MIN_FREE_BYTES, (end - start) // 2))
+                offsets[name] = [start, end, f.tell()]
+                f.write(b'\n  ]')
+            f.write(b',\n')
+            f.write(tail)
+            size = f.tell()
+    finally:
+        if old is not None:
+            old.close()
+    os.replace(tmp_path, document_path)
+    return offsets, size
+
+
+def update_document(document_path, checkpoint, spools, tail):
+    """Add the spooled items to the document in place if they fit in the free space; otherwise rewrite it."""
+    arrays = checkpoint['arrays']
+    sizes = {name: spools[name].seek(0, 2) for name in ARRAY_NAMES}
+    if arrays is None or any(arrays[name][1] + sizes[name] > arrays[name][2] for name in ARRAY_NAMES):
+        checkpoint['arrays'], checkpoint['document_size'] = write_document(document_path, arrays, spools, tail)
+        return
+
+    # Only the new items and the trailing keys are written
+    with open(document_path, 'r+b') as f:
+        for name in ARRAY_NAMES:
+            spools[name].seek(0)
+            f.seek(arrays[name][1])
+            shutil.copyfileobj(spools[name], f)
+            arrays[name][1] = f.tell()
+        f.seek(arrays[ARRAY_NAMES[-1]][2] + len(b'\n  ],\n'))
+        f.write(tail)
+        f.truncate()
+        checkpoint['document_size'] = f.tell()
+
+
+def compress_document(document_path, output_path):
+    """Write the gzip output of a document; gzip streams cannot be updated in place."""
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    with open(document_path, 'rb') as src, gzip.GzipFile(tmp_path, 'wb', compresslevel=GZIP_LEVEL, mtime=0) as f:
+        shutil.copyfileobj(src, f)
+    os.replace(tmp_path, output_path)
+
+
+def document_is_current(document_path, checkpoint):
+    try:
+        return document_path.stat().st_size == checkpoint['document_size']
+    except OSError:
+        return False
+
+
+def update_follow(input_path, output_path, include_content=True, redactor=None):
+    """Convert lines appended since the last checkpoint and update the output in place.
+
+    Only newly appended complete lines are decoded, and running statistics are
+    restored from the checkpoint. New items go into the free space after each
+    array of the output, and the trailing keys are rewritten, so an update
+    costs the size of the new data; the document is rewritten only when an
+    array outgrows its free space. Returns the number of new messages, or None
+    if nothing changed.
+    """
+    input_path = Path(input_path)
+    output_path = Path(output_path)
+    state_dir = state_dir_for(output_path)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    document_path = document_path_for(output_path, state_dir)
+
+    size = input_path.stat().st_size
+    checkpoint = load_checkpoint(state_dir, input_path, include_content, redactor)
+
+    # Start over for new logs, for logs that were truncated or replaced and for documents changed since
+    if (checkpoint is None or size < checkpoint['offset'] or not output_path.exists()
+            or not document_is_current(document_path, checkpoint)):
+        checkpoint = new_checkpoint(input_path, include_content, redactor)
+        # Array parts of the previous follow format are not used any more
+        for name in ARRAY_NAMES:
+            (state_dir / f'{name}.part').unlink(missing_ok=True)
+    elif size == checkpoint['offset']:
+        return None
+
+    stats = checkpoint['stats']
+    position = {'offset': checkpoint['offset']}
+    progress = {'lines': checkpoint['lines']}
+    new_messages = 0
+    spools = {name: tempfile.TemporaryFile() for name in ARRAY_NAMES}
+
+    try:
+        writers = {name: io.TextIOWrapper(spools[name], encoding='utf-8') for name in ARRAY_NAMES}
+        lines = read_complete_lines(input_path, position)
+        for record in iter_records(lines, progress, checkpoint['lines'] + 1):
+            update_session_stats(stats, record)
+
+            if isinstance(record, MalformedLine):
+                print(f"Error processing line {record.line_number}: {record.error}")
+                continue
+
+            try:
+                message_id = checkpoint['message_count'] + 1
+                msg, file_ops, timeline = build_message_entries(record, message_id, include_content, redactor)
+            except Exception as e:
+                print(f"Error processing line {record.line_number}: {e}")
+                continue
+
+            write_array_item(writers['messages'], msg, checkpoint['message_count'])
+            checkpoint['message_count'] = message_id
+            new_messages += 1
+            for op in file_ops:
+                write_array_item(writers['file_operations'], op, checkpoint['file_operation_count'])
+                checkpoint['file_operation_count'] += 1
+            for event in timeline:
+                write_array_item(writers['timeline'], event, checkpoint['timeline_count'])
+                checkpoint['timeline_count'] += 1
+
+        if position['offset'] == checkpoint['offset'] and checkpoint['arrays'] is not None:
+            return None
+
+        for writer in writers.values():
+            writer.flush()
+        checkpoint['offset'] = position['offset']
+        checkpoint['lines'] = progress['lines']
+        update_document(document_path, checkpoint, spools, encode_tail(input_path, checkpoint, redactor))
+    finally:
+        for spool in spools.values():
+            spool.close()
+
+    if document_path != output_path:
+        compress_document(document_path, output_path)
+    save_checkpoint(state_dir, checkpoint)
+    return new_messages
+
+
+def follow_logs(inputs, output_file=None, output_dir=None, include_content=True, interval=2.0, once=False,
+                redactor=None, compress=False):
+    """Poll log files or directories and incrementally update their JSON outputs.
+
+    Directories are rescanned on every poll, so new session files are picked up
+    as soon as they appear.
+    """
+    try:
+        while True:
+            if output_file:
+                jobs = [(Path(inputs[0]), Path(output_file), 0)]
+            else:
+                jobs = plan_batch(inputs, gzip_suffix('.json', compress), output_dir)
+
+            for input_path, output_path, _ in jobs:
+                try:
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    new_messages = update_follow(input_path, output_path, include_content, redactor)
+                except Exception as e:
+                    print(f"Error following {input_path}: {e}")
+                    continue
+                if new_messages is not None:
+                    print(f"Updated {output_path}: +{new_messages} messages")
+
+            if once:
+                return True
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return True
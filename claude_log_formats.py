@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Claude Log Multi-Format Converter
+Writes Markdown, presentation Markdown, JSON and session statistics from a single decode of a log.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from claude_log_batch import is_batch_request, plan_batch, run_batch
+from claude_log_converter import (
+    finalize_session_stats as finalize_markdown_stats, new_session_stats as new_markdown_stats,
+    update_message_stats as update_markdown_stats, write_markdown
+)
+from claude_log_output import gzip_suffix, open_output
+from claude_log_parser import MalformedLine, iter_records
+from claude_log_profile import add_profile_arguments, profiling_requested, run_profiled
+from claude_log_secrets import (
+    add_secrets_argument, apply_secret_replacements_to_dict, print_detection_report, redactor_from_args
+)
+from claude_log_to_json import (
+    build_json_document, build_summary, finalize_session_stats, new_session_stats, update_session_stats
+)
+
+# Format name: suffix appended to the output base path
+FORMATS = {
+    'md': '.md',
+    'md-presentation': '.presentation.md',
+    'json': '.json',
+    'stats': '.stats.json'
+}
+# Accumulators the Markdown and JSON statistics have in common; only the JSON side updates them
+SHARED_STATS = ('tool_latency', 'usage', 'conversation_tree')
+
+
+def parse_formats(text):
+    """Parse a comma-separated list of format names, keeping their order."""
+    formats = [name.strip() for name in text.split(',') if name.strip()]
+    unknown = [name for name in formats if name not in FORMATS]
+    if not formats:
+        raise ValueError(f"No formats given (choose from {', '.join(FORMATS)})")
+    if unknown:
+        raise ValueError(f"Unknown formats: {', '.join(unknown)} (choose from {', '.join(FORMATS)})")
+    return list(dict.fromkeys(formats))
+
+
+def format_paths(base, formats, compress=False):
+    """Return {format: output path}, each the base path with the format's suffix appended."""
+    return {name: Path(str(base) + gzip_suffix(FORMATS[name], compress)) for name in formats}
+
+
+def calculate_all_stats(records, markdown=True):
+    """Return (JSON statistics, Markdown statistics, threads) from one pass over the records.
+
+    The two converters estimate tokens differently, so each keeps its own
+    counts, but tool latency, usage and the conversation tree are built once.
+    threads holds each record's conversation thread, for rendering Markdown.
+    Without markdown, the Markdown statistics and threads are None.
+    """
+    stats = new_session_stats()
+    markdown_stats = None
+    if markdown:
+        markdown_stats = new_markdown_stats()
+        markdown_stats.update((key, stats[key]) for key in SHARED_STATS)
+
+    threads = [] if markdown else None
+    for record in records:
+        thread = update_session_stats(stats, record)
+        if markdown_stats is not None:
+            threads.append(thread)
+            if not isinstance(record, MalformedLine):
+                update_markdown_stats(markdown_stats, record)
+
+    # Summarizing does not change the shared accumulators, so both sides summarize them
+    if markdown_stats is not None:
+        markdown_stats = finalize_markdown_stats(markdown_stats)
+    return finalize_session_stats(stats), markdown_stats, threads
+
+
+def convert_log_to_formats(jsonl_file, output_file=None, formats=tuple(FORMATS), include_content=True,
+                           redactor=None, compress=False):
+    """Convert a JSONL log to several formats at once, decoding it and calculating statistics once.
+
+    output_file is the base path the format suffixes are appended to (default:
+    the input without its .jsonl suffix). Every output is the same as the one
+    its own converter writes for the same options.
+    """
+    input_path = Path(jsonl_file)
+
+    if not input_path.exists():
+        print(f"Error: File {jsonl_file} not found")
+        return False
+
+    base = Path(output_file) if output_file else input_path.with_suffix('')
+    paths = format_paths(base, formats, compress)
+
+    try:
+        with open(input_path, 'rb') as f:
+            lines = f.readlines()
+        records = list(iter_records(lines))
+
+        markdown = 'md' in paths or 'md-presentation' in paths
+        stats, markdown_stats, threads = calculate_all_stats(records, markdown)
+        if redactor:
+            stats = apply_secret_replacements_to_dict(stats, redactor)
+
+        message_count = sum(1 for record in records if not isinstance(record, MalformedLine))
+        file_operation_count = stats['file_operations']
+        written = []
+
+        if markdown:
+            for name, presentation_mode in (('md', False), ('md-presentation', True)):
+                if name in paths:
+                    count = write_markdown(paths[name], input_path, zip(records, threads), markdown_stats,
+                                           presentation_mode, redactor)
+                    written.append((paths[name], count))
+
+        if 'json' in paths:
+            result = build_json_document(input_path, records, len(lines), stats, include_content, redactor)
+            with open_output(paths['json']) as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            message_count = len(result['messages'])
+            file_operation_count = len(result['file_operations'])
+            written.append((paths['json'], message_count))
+
+        if 'stats' in paths:
+            document = {
+                'metadata': {
+                    'source_file': redactor.redact(input_path.name) if redactor else input_path.name,
+                    'generated_at': datetime.now().isoformat(),
+                    'total_lines_processed': len(lines)
+                },
+                'session_stats': stats,
+                'summary': build_summary(stats, message_count, file_operation_count)
+            }
+            with open_output(paths['stats']) as f:
+                json.dump(document, f, indent=2, ensure_ascii=False)
+            written.append((paths['stats'], None))
+
+        print(f"Successfully converted {input_path.name} to {len(written)} formats from one pass:")
+        for path, count in written:
+            print(f"- {path}" + (f" ({count} messages)" if count is not None else ''))
+        return True
+
+    except Exception as e:
+        print(f"Error processing file: {e}")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert Claude JSONL logs to several formats from a single parse')
+    parser.add_argument('input_file', nargs='+', help='Path to the JSONL log file (or several files, directories or globs for batch mode)')
+    parser.add_argument('--formats', default=','.join(FORMATS),
+                        help=f'Comma-separated formats to write (default: all): {", ".join(FORMATS)}')
+    parser.add_argument('-o', '--output', help='Output base path; each format appends its suffix, e.g. .md or .stats.json '
+                                               '(default: the input without .jsonl)')
+    parser.add_argument('--no-content', action='store_true', help='JSON: exclude full message content (only include previews)')
+    parser.add_argument('--gzip', action='store_true', help='Write gzip-compressed outputs (.md.gz, .json.gz, ...)')
+    parser.add_argument('-j', '--workers', type=int, help='Batch mode: number of worker processes (default: CPU count)')
+    parser.add_argument('--output-dir', help='Batch mode: write outputs under this directory instead of next to the inputs')
+    add_secrets_argument(parser)
+    add_profile_arguments(parser)
+
+    args = parser.parse_args()
+    try:
+        formats = parse_formats(args.formats)
+    except ValueError as e:
+        parser.error(str(e))
+    redactor = redactor_from_args(args)
+    profile = profiling_requested(args)
+
+    if profile and is_batch_request(args.input_file):
+        parser.error('--profile only applies to a single input file')
+
+    options = {'formats': formats, 'include_content': not args.no_content, 'redactor': redactor,
+               'compress': args.gzip}
+    if is_batch_request(args.input_file):
+        if args.output:
+            parser.error('-o/--output only applies to a single input file; use --output-dir in batch mode')
+        jobs = plan_batch(args.input_file, '', args.output_dir)
+        success = run_batch(convert_log_to_formats, jobs, args.workers, **options)
+    elif profile:
+        success = run_profiled(convert_log_to_formats, args.input_file[0], args.output, args, **options)
+    else:
+        success = convert_log_to_formats(args.input_file[0], args.output, **options)
+        if success:
+            print_detection_report(redactor)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
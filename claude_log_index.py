@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Claude Log Session Index
+Incrementally indexes session logs into SQLite with FTS5 full-text search over message text.
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from claude_log_batch import collect_input_files
+from claude_log_cache import default_cache_dir
+from claude_log_follow import read_complete_lines
+from claude_log_parser import MalformedLine, iter_records
+from claude_log_to_json import extract_file_operations
+
+INDEX_VERSION = 2
+# Bytes hashed at the start of a log and just before its indexed offset, to notice a replaced log
+CHECK_BYTES = 64 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL DEFAULT 0,
+    mtime_ns INTEGER NOT NULL DEFAULT 0,
+    byte_offset INTEGER NOT NULL DEFAULT 0,
+    prefix_hash TEXT,
+    line_count INTEGER NOT NULL DEFAULT 0,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    file_operation_count INTEGER NOT NULL DEFAULT 0,
+    start_time TEXT,
+    end_time TEXT,
+    indexed_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    line_number INTEGER NOT NULL,
+    timestamp TEXT,
+    role TEXT,
+    is_sidechain INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_session ON messages(session_id, line_number);
+
+CREATE TABLE IF NOT EXISTS file_operations (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    message_id INTEGER NOT NULL REFERENCES messages(id),
+    type TEXT NOT NULL,
+    file_path TEXT,
+    file_name TEXT
+);
+CREATE INDEX IF NOT EXISTS file_operations_name ON file_operations(file_name);
+CREATE INDEX IF NOT EXISTS file_operations_path ON file_operations(file_path);
+CREATE INDEX IF NOT EXISTS file_operations_session ON file_operations(session_id);
+
+-- External-content FTS index: the text is stored once, in messages
+CREATE VIRTUAL TABLE IF NOT EXISTS message_text USING fts5(
+    text, content='messages', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS messages_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO message_text(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO message_text(message_text, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+def default_index_path():
+    """Return the default index database, next to the conversion cache."""
+    return default_cache_dir() / 'sessions.sqlite'
+
+
+def open_index(db_path=None):
+    """Open (creating if needed) the session index database."""
+    db_path = Path(db_path or default_index_path())
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version not in (0, 1, INDEX_VERSION):
+        conn.close()
+        raise RuntimeError(f"Index {db_path} has unsupported version {version}; delete it to rebuild")
+    try:
+        conn.executescript(SCHEMA)
+    except sqlite3.OperationalError as e:
+        conn.close()
+        raise RuntimeError(f"SQLite was built without FTS5 support: {e}")
+    if version == 1:
+        # Sessions without a prefix hash are reindexed the next time they change
+        conn.execute('ALTER TABLE sessions ADD COLUMN prefix_hash TEXT')
+    conn.execute(f'PRAGMA user_version={INDEX_VERSION}')
+    return conn
+
+
+def clear_session(conn, session_id):
+    """Remove everything indexed for a session, keeping its row."""
+    conn.execute('DELETE FROM file_operations WHERE session_id = ?', (session_id,))
+    conn.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
+    conn.execute('UPDATE sessions SET byte_offset = 0, prefix_hash = NULL, line_count = 0, message_count = 0, '
+                 'file_operation_count = 0, start_time = NULL, end_time = NULL WHERE id = ?', (session_id,))
+
+
+def prefix_hash(input_path, offset):
+    """Hash the first bytes of a log and those just before offset, without reading the rest."""
+    digest = hashlib.sha256()
+    with open(input_path, 'rb') as f:
+        digest.update(f.read(min(offset, CHECK_BYTES)))
+        f.seek(max(0, offset - CHECK_BYTES))
+        digest.update(f.read(offset - f.tell()))
+    return digest.hexdigest()
+
+
+def index_session(conn, input_path):
+    """Index the lines appended to a log since it was last indexed.
+
+    Logs only grow, so the stored byte offset is where reading resumes. A log
+    that shrank, or whose first bytes or bytes before the offset no longer
+    hash the same, was replaced and is indexed from scratch. Each session is
+    updated in one transaction. Returns the number of new messages, or None if
+    the log has not changed.
+    """
+    input_path = Path(input_path)
+    path = str(input_path.resolve())
+    stat = input_path.stat()
+
+    row = conn.execute('SELECT * FROM sessions WHERE path = ?', (path,)).fetchone()
+    if row is not None and row['size'] == stat.st_size and row['mtime_ns'] == stat.st_mtime_ns:
+        return None
+
+    with conn:
+        if row is None:
+            session_id = conn.execute('INSERT INTO sessions (path) VALUES (?)', (path,)).lastrowid
+        else:
+            session_id = row['id']
+            if stat.st_size < row['byte_offset'] or prefix_hash(input_path, row['byte_offset']) != row['prefix_hash']:
+                clear_session(conn, session_id)
+        session = conn.execute('SELECT * FROM sessions WHERE id = ?', (session_id,)).fetchone()
+
+        position = {'offset': session['byte_offset']}
+        progress = {'lines': session['line_count']}
+        start_time = session['start_time']
+        end_time = session['end_time']
+        new_messages = 0
+        new_file_operations = 0
+
+        lines = read_complete_lines(input_path, position)
+        for record in iter_records(lines, progress, session['line_count'] + 1):
+            if isinstance(record, MalformedLine):
+                continue
+
+            message_id = conn.execute(
+                'INSERT INTO messages (session_id, line_number, timestamp, role, is_sidechain, text) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (session_id, record.line_number, record.timestamp, record.role,
+                 int(bool(record.is_sidechain)), record.text)
+            ).lastrowid
+            new_messages += 1
+
+            file_ops = extract_file_operations(record.content)
+            conn.executemany(
+                'INSERT INTO file_operations (session_id, message_id, type, file_path, file_name) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(session_id, message_id, op['type'], op['file_path'], op['file_name']) for op in file_ops]
+            )
+            new_file_operations += len(file_ops)
+
+            if record.timestamp:
+                start_time = start_time or record.timestamp
+                end_time = record.timestamp
+
+        conn.execute(
+            'UPDATE sessions SET size = ?, mtime_ns = ?, byte_offset = ?, prefix_hash = ?, line_count = ?, '
+            'message_count = message_count + ?, file_operation_count = file_operation_count + ?, '
+            'start_time = ?, end_time = ?, indexed_at = ? WHERE id = ?',
+            (stat.st_size, stat.st_mtime_ns, position['offset'], prefix_hash(input_path, position['offset']),
+             progress['lines'], new_messages, new_file_operations, start_time, end_time, time.time(), session_id)
+        )
+
+    return new_messages
+
+
+def index_sessions(conn, inputs, pattern='*.jsonl'):
+    """Index files, directories and globs of logs. Returns (indexed_sessions, new_messages)."""
+    indexed = 0
+    total_messages = 0
+
+    for input_path, _ in collect_input_files(inputs, pattern):
+        try:
+            new_messages = index_session(conn, input_path)
+        except Exception as e:
+            print(f"Error indexing {input_path}: {e}")
+            continue
+        if new_messages is not None:
+            indexed += 1
+            total_messages += new_messages
+            print(f"Indexed {input_path}: +{new_messages} messages")
+
+    return indexed, total_messages
+
+
+def like_pattern(text):
+    """Escape LIKE wildcards so text matches literally (use with ESCAPE '\\')."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def literal_query(query):
+    """Quote every word of a query so FTS5 matches it as plain text."""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def search_messages(conn, query, limit=20, role=None, session=None):
+    """Full-text search message text, best matches first.
+
+    `query` uses FTS5 syntax: words, "quoted phrases", prefix*, AND/OR/NOT.
+    A query that is not valid FTS5, such as foo-bar or a path, is searched
+    for word by word instead.
+    """
+    sql = ('SELECT s.path, m.line_number, m.timestamp, m.role, m.is_sidechain, '
+           "snippet(message_text, 0, '[', ']', '…', 12) AS snippet "
+           'FROM message_text JOIN messages m ON m.id = message_text.rowid '
+           'JOIN sessions s ON s.id = m.session_id '
+           'WHERE message_text MATCH ?')
+    params = []
+    if role:
+        sql += ' AND m.role = ?'
+        params.append(role)
+    if session:
+        sql += " AND s.path LIKE ? ESCAPE '\\'"
+        params.append(f'%{like_pattern(session)}%')
+    sql += ' ORDER BY rank LIMIT ?'
+    params.append(limit)
+    try:
+        return conn.execute(sql, [query] + params).fetchall()
+    except sqlite3.OperationalError:
+        return conn.execute(sql, [literal_query(query)] + params).fetchall()
+
+
+def find_file_sessions(conn, name, operation=None):
+    """Find the sessions that operated on a file, by file name or path fragment.
+
+    An exact file name uses the file_name index; anything containing a slash
+    is matched against the end of the full path.
+    """
+    if '/' in name:
+        where, params = "f.file_path LIKE ? ESCAPE '\\'", [f'%{like_pattern(name)}']
+    else:
+        where, params = 'f.file_name = ?', [name]
+    if operation:
+        where += ' AND f.type = ?'
+        params.append(operation.lower())
+
+    return conn.execute(
+        'SELECT s.path, s.start_time, f.file_path, COUNT(*) AS operation_count, '
+        'GROUP_CONCAT(DISTINCT f.type) AS operation_types, MIN(m.line_number) AS first_line '
+        'FROM file_operations f JOIN sessions s ON s.id = f.session_id '
+        'JOIN messages m ON m.id = f.message_id '
+        f'WHERE {where} GROUP BY s.id, f.file_path ORDER BY s.start_time',
+        params
+    ).fetchall()
+
+
+def list_sessions(conn, limit=50):
+    """Return the most recent indexed sessions."""
+    return conn.execute(
+        'SELECT path, start_time, end_time, message_count, file_operation_count FROM sessions '
+        'ORDER BY end_time DESC LIMIT ?', (limit,)
+    ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index Claude JSONL logs into SQLite and search them')
+    parser.add_argument('--db', help='Index database (default: ~/.cache/claude-log-converter/sessions.sqlite)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    index_parser = commands.add_parser('index', help='Add new and grown session logs to the index')
+    index_parser.add_argument('input_file', nargs='+', help='Input JSONL files, directories or glob patterns')
+
+    search_parser = commands.add_parser('search', help='Full-text search message text (FTS5 query syntax)')
+    search_parser.add_argument('query', help='Search query, e.g. \'"localization provider" AND error\'')
+    search_parser.add_argument('--role', choices=['user', 'assistant'], help='Only search messages with this role')
+    search_parser.add_argument('--session', help='Only search sessions whose path contains this text')
+    search_parser.add_argument('-n', '--limit', type=int, default=20, help='Maximum number of results (default: 20)')
+
+    files_parser = commands.add_parser('files', help='Find the sessions that operated on a file')
+    files_parser.add_argument('name', help='File name (e.g. localization-provider.tsx) or path suffix')
+    files_parser.add_argument('--type', help='Only this operation type (write, edit, multiedit, read, todowrite)')
+
+    sessions_parser = commands.add_parser('sessions', help='List indexed sessions, most recent first')
+    sessions_parser.add_argument('-n', '--limit', type=int, default=50, help='Maximum number of sessions (default: 50)')
+
+    args = parser.parse_args()
+
+    try:
+        conn = open_index(args.db)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    try:
+        if args.command == 'index':
+            indexed, total_messages = index_sessions(conn, args.input_file)
+            if indexed:
+                conn.execute("INSERT INTO message_text(message_text) VALUES ('optimize')")
+            conn.commit()
+            print(f"Indexed {indexed} changed sessions (+{total_messages} messages) "
+                  f"in {time.perf_counter() - start:.2f}s")
+        elif args.command == 'search':
+            rows = search_messages(conn, args.query, args.limit, args.role, args.session)
+            for row in rows:
+                chain = ' (sidechain)' if row['is_sidechain'] else ''
+                print(f"{row['path']}:{row['line_number']}  {row['timestamp'] or ''}  {row['role']}{chain}")
+                print(f"    {' '.join(row['snippet'].split())}")
+            print(f"{len(rows)} results in {(time.perf_counter() - start) * 1000:.1f} ms")
+        elif args.command == 'files':
+            rows = find_file_sessions(conn, args.name, args.type)
+            for row in rows:
+                print(f"{row['path']}:{row['first_line']}  {row['start_time'] or ''}  "
+                      f"{row['operation_count']}x {row['operation_types']}  {row['file_path']}")
+            print(f"{len(rows)} results in {(time.perf_counter() - start) * 1000:.1f} ms")
+        else:
+            for row in list_sessions(conn, args.limit):
+                print(f"{row['path']}  {row['start_time'] or ''} → {row['end_time'] or ''}  "
+                      f"{row['message_count']} messages, {row['file_operation_count']} file operations")
+    except sqlite3.OperationalError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
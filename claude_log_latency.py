@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Claude Log Tool Latency
+Pairs tool_use blocks with their tool_result blocks to measure per-tool wall time.
+"""
+
+import math
+from datetime import datetime
+
+SLOWEST_CALLS = 10
+SUMMARY_FIELDS = ('command', 'file_path', 'description', 'pattern', 'url', 'path')
+
+
+def parse_timestamp(timestamp):
+    """Parse an ISO log timestamp, returning None if it is missing or invalid."""
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except Exception:
+        return None
+
+
+def seconds_between(start, end):
+    """Return the non-negative seconds between two ISO timestamps, or None if either is unusable."""
+    start_dt = parse_timestamp(start) if start else None
+    end_dt = parse_timestamp(end) if end else None
+    if start_dt is None or end_dt is None:
+        return None
+    return round(max((end_dt - start_dt).total_seconds(), 0.0), 3)
+
+
+def summarize_tool_input(tool_input):
+    """Pick a short description of a tool call, such as its command or file path."""
+    if not isinstance(tool_input, dict):
+        return ''
+    for field in SUMMARY_FIELDS:
+        value = tool_input.get(field)
+        if isinstance(value, str) and value:
+            value = ' '.join(value.split())
+            return value[:80] + ('...' if len(value) > 80 else '')
+    return ''
+
+
+def new_tool_latency(partial=False):
+    """Create an empty tool latency accumulator.
+
+    The accumulator holds only JSON types so it can be checkpointed with the
+    rest of the session statistics. `records` counts non-malformed records,
+    which matches the message ids assigned by the JSON converter. A partial
+    accumulator, for one range of a log, also keeps the results whose call
+    is not in the range, so merge_tool_latency can pair them later.
+    """
+    latency = {
+        'records': 0,
+        'pending': {},
+        'durations': {},
+        'slowest': []
+    }
+    if partial:
+        latency['unresolved'] = []
+    return latency
+
+
+def add_call_duration(latency, call, finished, result_message_id):
+    """Record the duration of a completed call [name, started, message id, line, summary]."""
+    name, started, use_message_id, line_number, summary = call
+    duration = seconds_between(started, finished)
+    if duration is None:
+        return
+
+    latency['durations'].setdefault(name, []).append(duration)
+
+    slowest = latency['slowest']
+    if len(slowest) < SLOWEST_CALLS or duration > slowest[-1]['duration_seconds']:
+        slowest.append({
+            'tool': name,
+            'duration_seconds': duration,
+            'message_id': use_message_id,
+            'result_message_id': result_message_id,
+            'line_number': line_number,
+            'timestamp': started,
+            'summary': summary
+        })
+        # Ties keep result order, so merged partial accumulators rank calls like a single pass
+        slowest.sort(key=lambda call: (-call['duration_seconds'], call['result_message_id']))
+        del slowest[SLOWEST_CALLS:]
+
+
+def update_tool_latency(latency, record):
+    """Register the tool calls of one record and complete those its results answer."""
+    latency['records'] += 1
+    message_id = latency['records']
+    pending = latency['pending']
+
+    for part in record.tool_uses:
+        tool_id = part.get('id')
+        if tool_id:
+            pending[tool_id] = [part.get('name') or 'unknown', record.timestamp, message_id,
+                                record.line_number, summarize_tool_input(part.get('input'))]
+
+    for part in record.tool_results:
+        call = pending.pop(part.get('tool_use_id'), None)
+        if call is None:
+            unresolved = latency.get('unresolved')
+            if unresolved is not None:
+                unresolved.append([part.get('tool_use_id'), record.timestamp, message_id])
+            continue
+        add_call_duration(latency, call, record.timestamp, message_id)
+
+
+def merge_tool_latency(latency, partial, line_offset=0):
+    """Merge the accumulator of the next range of a log into latency, in place.
+
+    The partial's message ids and line numbers are local to its range; they
+    are shifted by the records already in latency and by line_offset. Results
+    the range could not pair are paired with calls still pending here, or kept
+    for an earlier range when latency is itself partial.
+    """
+    offset = latency['records']
+    pending = latency['pending']
+    unresolved = latency.get('unresolved')
+
+    for tool_id, finished, message_id in partial['unresolved']:
+        call = pending.pop(tool_id, None)
+        if call is not None:
+            add_call_duration(latency, call, finished, message_id + offset)
+        elif unresolved is not None:
+            unresolved.append([tool_id, finished, message_id + offset])
+
+    for tool_id, (name, started, message_id, line_number, summary) in partial['pending'].items():
+        pending[tool_id] = [name, started, message_id + offset, line_number + line_offset, summary]
+
+    for name, durations in partial['durations'].items():
+        latency['durations'].setdefault(name, []).extend(durations)
+
+    slowest = latency['slowest']
+    for call in partial['slowest']:
+        slowest.append(dict(call, message_id=call['message_id'] + offset,
+                            result_message_id=call['result_message_id'] + offset,
+                            line_number=call['line_number'] + line_offset))
+    slowest.sort(key=lambda call: (-call['duration_seconds'], call['result_message_id']))
+    del slowest[SLOWEST_CALLS:]
+
+    latency['records'] += partial['records']
+    return latency
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def duration_distribution(durations):
+    """Summarize a non-empty list of durations in seconds."""
+    ordered = sorted(durations)
+    return {
+        'count': len(ordered),
+        'p50_seconds': percentile(ordered, 0.5),
+        'p95_seconds': percentile(ordered, 0.95),
+        'max_seconds': ordered[-1],
+        'total_seconds': round(sum(ordered), 3)
+    }
+
+
+def summarize_tool_latency(latency):
+    """Return per-tool latency distributions, slowest tools (by total time) first."""
+    tools = {name: duration_distribution(durations) for name, durations in latency['durations'].items()}
+
+    return {
+        'tools': dict(sorted(tools.items(), key=lambda item: item[1]['total_seconds'], reverse=True)),
+        'slowest_calls': [dict(call) for call in latency['slowest']],
+        'unmatched_calls': len(latency['pending'])
+    }
+
+
+def format_seconds(seconds):
+    """Format a duration in seconds compactly, e.g. 0.8s, 42.0s or 3m 05s."""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Claude Log Line Index
+Keeps a sidecar index of line start offsets so any raw line of a log can be read without scanning it.
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+from claude_log_batch import format_size
+from claude_log_secrets import add_secrets_argument, redactor_from_args
+
+INDEX_MAGIC = b'CLLINES1'
+# Magic, indexed bytes (the end of the last complete line), complete lines, SHA-256 of the bytes before that end
+HEADER = struct.Struct('=8sQQ32s')
+# Enough of the log to tell an appended-to log from a replaced one
+TAIL_CHECK_BYTES = 4096
+OFFSET_BYTES = array('Q').itemsize
+
+
+def sidecar_path(log_path):
+    """Return the default index path of a log: the log's name with .lines appended."""
+    log_path = Path(log_path)
+    return log_path.with_name(log_path.name + '.lines')
+
+
+def tail_digest(data, end):
+    return hashlib.sha256(data[max(0, end - TAIL_CHECK_BYTES):end]).digest()
+
+
+def map_file(f, size):
+    """Map the first size bytes of a file read-only; empty files cannot be mapped."""
+    return mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) if size else b''
+
+
+def read_header(index_path):
+    """Return (indexed bytes, line count, tail digest) of an index file, or None if it is unusable."""
+    try:
+        with open(index_path, 'rb') as f:
+            header = f.read(HEADER.size)
+            f.seek(0, 2)
+            size = f.tell()
+    except OSError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, indexed, count, digest = HEADER.unpack(header)
+    if magic != INDEX_MAGIC or size < HEADER.size + (count + 1) * OFFSET_BYTES:
+        return None
+    return indexed, count, digest
+
+
+def find_line_starts(data, start, end, starts):
+    """Append the offset after every newline in data[start:end] to starts; return the last one."""
+    find = data.find
+    position = find(b'\n', start, end)
+    while position >= 0:
+        start = position + 1
+        starts.append(start)
+        position = find(b'\n', start, end)
+    return start
+
+
+def update_line_index(log_path, index_path=None):
+    """Bring a log's line index up to date and return (line count, action).
+
+    The index holds the start offset of every complete line plus the end of
+    the last one. Logs only grow, so when the bytes before the indexed end are
+    unchanged only the appended lines are scanned; a log that shrank or
+    changed is indexed again. A partially written last line is left for the
+    next update. `action` is 'current', 'extended' or 'built'.
+    """
+    log_path = Path(log_path)
+    index_path = Path(index_path) if index_path else sidecar_path(log_path)
+
+    with open(log_path, 'rb') as f:
+        size = f.seek(0, 2)
+        data = map_file(f, size)
+        try:
+            header = read_header(index_path)
+            if header is not None:
+                indexed, count, digest = header
+                if indexed > size or tail_digest(data, indexed) != digest:
+                    header = None
+            if header is not None and data.rfind(b'\n', indexed, size) < 0:
+                return count, 'current'
+
+            starts = array('Q')
+            if header is None:
+                # Line 1 starts the log; each newline found starts the next line
+                starts.append(0)
+                indexed = find_line_starts(data, 0, size, starts)
+                kept, count = 0, len(starts) - 1
+            else:
+                kept = count
+                indexed = find_line_starts(data, indexed, size, starts)
+                count += len(starts)
+            digest = tail_digest(data, indexed)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(index_path, 'r+b' if header else 'wb') as f:
+        if header:
+            # Drop anything an interrupted update left after the offsets the header counts
+            f.truncate(HEADER.size + (kept + 1) * OFFSET_BYTES)
+            f.seek(0, 2)
+        else:
+            f.write(HEADER.pack(INDEX_MAGIC, 0, 0, bytes(32)))
+        starts.tofile(f)
+        # The header goes last, so an interrupted update leaves the previous index valid
+        f.flush()
+        f.seek(0)
+        f.write(HEADER.pack(INDEX_MAGIC, indexed, count, digest))
+    return count, 'extended' if header else 'built'
+
+
+class LineIndex:
+    """Random access to the raw lines of a log through its line index.
+
+    Both the log and the index are memory-mapped, so reading a line costs
+    two offset lookups and a slice whatever the log's size. Line numbers are
+    1-based, as in LogRecord.line_number. A last line without a newline yet is
+    readable but not indexed until it is complete.
+    """
+
+    def __init__(self, log_path, index_path=None):
+        self.log_path = Path(log_path)
+        self.index_path = Path(index_path) if index_path else sidecar_path(self.log_path)
+        self.version = None
+        self.action = None
+        self.data = b''
+        self.index_data = None
+        self.index_view = None
+        self.offsets = ()
+        self.indexed_lines = 0
+        self.size = 0
+        self.tail_end = 0
+        self.refresh()
+
+    def refresh(self):
+        """Update the index and the mappings if the log changed since they were made; returns True if it did."""
+        stat = self.log_path.stat()
+        version = (stat.st_size, stat.st_mtime_ns)
+        if version == self.version:
+            return False
+
+        self.close()
+        self.indexed_lines, self.action = update_line_index(self.log_path, self.index_path)
+        with open(self.index_path, 'rb') as f:
+            self.index_data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index_view = memoryview(self.index_data)
+        self.offsets = self.index_view[HEADER.size:HEADER.size + (self.indexed_lines + 1) * OFFSET_BYTES].cast('Q')
+        with open(self.log_path, 'rb') as f:
+            self.size = f.seek(0, 2)
+            self.data = map_file(f, self.size)
+        # Lines appended since the index was updated wait for the next refresh, except the first
+        newline = self.data.find(b'\n', self.offsets[self.indexed_lines])
+        self.tail_end = newline if newline >= 0 else self.size
+        self.version = version
+        return True
+
+    @property
+    def line_count(self):
+        """Number of lines, counting a last line that has no newline yet."""
+        return self.indexed_lines + (self.tail_end > self.offsets[self.indexed_lines])
+
+    def bounds(self, number):
+        """Return the (start, end) byte offsets of a line, without its newline."""
+        if not 1 <= number <= self.line_count:
+            raise IndexError(f"Line {number} is out of range (the log has {self.line_count} lines)")
+        if number > self.indexed_lines:
+            return self.offsets[self.indexed_lines], self.tail_end
+        return self.offsets[number - 1], self.offsets[number] - 1
+
+    def line(self, number):
+        """Return one raw line as bytes."""
+        start, end = self.bounds(number)
+        return self.data[start:end]
+
+    def lines(self, first, last):
+        """Return [(line number, raw bytes)] for lines first to last inclusive."""
+        if first > last:
+            raise ValueError(f"Invalid line range {first}-{last}")
+        self.bounds(last)
+        return [(number, self.line(number)) for number in range(first, last + 1)]
+
+    def close(self):
+        # The views must be released before the mapping under them can be closed
+        if self.index_view is not None:
+            self.offsets.release()
+            self.index_view.release()
+            self.index_view = None
+        self.offsets = ()
+        if self.index_data is not None:
+            self.index_data.close()
+            self.index_data = None
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = b''
+        self.version = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def parse_line_range(text):
+    """Parse 'N' or 'N-M' into (first, last)."""
+    first, _, last = text.partition('-')
+    try:
+        first = int(first)
+        last = int(last) if last else first
+    except ValueError:
+        raise ValueError(f"Invalid line range: {text} (expected N or N-M)")
+    if first < 1 or last < first:
+        raise ValueError(f"Invalid line range: {text}")
+    return first, last
+
+
+def format_line(raw, pretty=False, redactor=None):
+    """Decode a raw line, optionally re-indented as JSON and with secrets replaced."""
+    text = raw.decode('utf-8', errors='replace')
+    if pretty:
+        try:
+            text = json.dumps(json.loads(text), indent=2, ensure_ascii=False)
+        except ValueError:
+            pass
+    return redactor.redact(text) if redactor else text
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show raw lines of a Claude log by line number, using a line offset index')
+    parser.add_argument('input_file', help='Input JSONL log')
+    parser.add_argument('lines', nargs='?', help='Line number or range, e.g. 1500 or 1500-1510 (omit to only build the index)')
+    parser.add_argument('--index', help='Index file (default: the log path with .lines appended)')
+    parser.add_argument('--pretty', action='store_true', help='Print each line as indented JSON, headed by its line number')
+    add_secrets_argument(parser)
+
+    args = parser.parse_args()
+
+    try:
+        line_range = parse_line_range(args.lines) if args.lines else None
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    redactor = redactor_from_args(args)
+
+    start = time.perf_counter()
+    try:
+        index = LineIndex(args.input_file, args.index)
+    except OSError as e:
+        print(f"Error reading {args.input_file}: {e}")
+        sys.exit(1)
+
+    with index:
+        if line_range is None:
+            print(f"Index of {index.line_count:,} lines ({format_size(index.size)}) {index.action} "
+                  f"in {time.perf_counter() - start:.3f}s: {index.index_path}")
+            return
+        try:
+            lines = index.lines(*line_range)
+        except IndexError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        for number, raw in lines:
+            if args.pretty:
+                print(f"--- line {number} ---")
+            print(format_line(raw, args.pretty, redactor))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Claude Log Output Files
+Opens converter outputs for writing, compressing `.gz` outputs on the fly.
+"""
+
+import gzip
+import io
+from pathlib import Path
+
+GZIP_LEVEL = 6
+
+
+def is_gzip_path(path):
+    """Check if an output path asks for gzip compression."""
+    return Path(path).suffix == '.gz'
+
+
+def gzip_suffix(suffix, compress):
+    """Return the output suffix for a format, e.g. '.json' or '.json.gz'."""
+    return suffix + '.gz' if compress else suffix
+
+
+def open_output(path, compress=None):
+    """Open an output file for writing text, streaming it through gzip when compressed.
+
+    Compression defaults to the path's `.gz` suffix. The gzip header carries no
+    timestamp, so identical conversions produce identical files.
+    """
+    if compress is None:
+        compress = is_gzip_path(path)
+    if not compress:
+        return open(path, 'w', encoding='utf-8')
+
+    return io.TextIOWrapper(gzip.GzipFile(path, 'wb', compresslevel=GZIP_LEVEL, mtime=0), encoding='utf-8')
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Claude Log Parallel Conversion
+Splits one huge JSONL log into newline-aligned byte ranges that are decoded on a process pool.
+"""
+
+import heapq
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from operator import itemgetter
+from pathlib import Path
+
+from claude_log_output import open_output
+from claude_log_parser import MalformedLine, iter_records
+from claude_log_secrets import apply_secret_replacements_to_dict
+from claude_log_to_json import (
+    build_message_entries, build_summary, finalize_session_stats, merge_session_stats,
+    new_session_stats, update_session_stats
+)
+
+# Ranges per worker, so that a slow range does not leave the other workers idle
+RANGES_PER_WORKER = 4
+# Smaller ranges cost more in process overhead than they save
+MIN_RANGE_BYTES = 1 << 20
+
+
+def split_byte_ranges(path, parts):
+    """Split a file into at most `parts` (start, end) byte ranges that begin at line starts."""
+    size = Path(path).stat().st_size
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            target = size * i // parts
+            if target <= bounds[-1]:
+                continue
+            # The line holding the byte before target ends at or after it; the next range starts after it
+            f.seek(target - 1)
+            f.readline()
+            position = f.tell()
+            if position >= size:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start] or [(0, size)]
+
+
+def plan_ranges(path, workers):
+    """Pick byte ranges for a pool of `workers` processes."""
+    size = Path(path).stat().st_size
+    parts = max(1, min(workers * RANGES_PER_WORKER, size // MIN_RANGE_BYTES))
+    return split_byte_ranges(path, parts)
+
+
+def read_range(path, start, end):
+    """Yield the lines of a byte range."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = start
+        for line in f:
+            yield line
+            position += len(line)
+            if position >= end:
+                break
+
+
+def scan_range(input_path, start, end):
+    """Worker: return (line count, record count, partial session stats) for a byte range."""
+    stats = new_session_stats(partial=True)
+    progress = {'lines': 0}
+    records = 0
+    for record in iter_records(read_range(input_path, start, end), progress):
+        update_session_stats(stats, record)
+        if not isinstance(record, MalformedLine):
+            records += 1
+    return progress['lines'], records, stats
+
+
+def format_array_item(item):
+    """Serialize an element of a top-level array exactly as json.dump(indent=2) lays it out."""
+    return json.dumps(item, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+
+
+def convert_range(input_path, start, end, first_line, first_message_id, include_content, redactor, spool_prefix):
+    """Worker: write the messages and file operations of a byte range to spool files.
+
+    Every item is written with a leading separator; the parent drops the first
+    one of each array. Timeline events are returned with their timestamps,
+    sorted, so the parent can merge the ranges' timelines.
+    """
+    message_id = first_message_id - 1
+    counts = {'messages': 0, 'file_operations': 0}
+    errors = []
+    timeline = []
+
+    with open(f'{spool_prefix}.messages', 'w', encoding='utf-8') as messages, \
+            open(f'{spool_prefix}.file_operations', 'w', encoding='utf-8') as operations:
+        for record in iter_records(read_range(input_path, start, end), first_line=first_line):
+            if isinstance(record, MalformedLine):
+                errors.append(f"Error processing line {record.line_number}: {record.error}")
+                continue
+
+            try:
+                message_id += 1
+                msg, file_ops, events = build_message_entries(record, message_id, include_content, redactor)
+            except Exception as e:
+                errors.append(f"Error processing line {record.line_number}: {e}")
+                continue
+
+            messages.write(',\n    ' + format_array_item(msg))
+            counts['messages'] += 1
+            for op in file_ops:
+                operations.write(',\n    ' + format_array_item(op))
+            counts['file_operations'] += len(file_ops)
+            timeline.extend((event.get('timestamp', ''), format_array_item(event)) for event in events)
+
+    # Same key as the sequential converter's sort; sort is stable, as is the merge of ranges
+    timeline.sort(key=itemgetter(0))
+    return counts, errors, timeline
+
+
+def scan_ranges(executor, input_path, ranges):
+    """Scan all ranges and return the merged session stats with each range's first line and message id."""
+    stats = new_session_stats()
+    starts = []
+    lines = 0
+    records = 0
+    scans = executor.map(scan_range, *zip(*[(input_path, start, end) for start, end in ranges]))
+    for line_count, record_count, partial in scans:
+        merge_session_stats(stats, partial, lines)
+        starts.append((lines + 1, records + 1))
+        lines += line_count
+        records += record_count
+    return stats, starts, lines
+
+
+def parallel_session_stats(input_path, workers=None):
+    """Calculate a log's session statistics by scanning byte ranges on a process pool."""
+    workers = workers or os.cpu_count() or 1
+    ranges = plan_ranges(input_path, workers)
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        stats, _, _ = scan_ranges(executor, str(input_path), ranges)
+    return finalize_session_stats(stats)
+
+
+def copy_array_part(f, part_path, first):
+    """Copy a spooled array part, dropping the separator before the array's first item."""
+    with open(part_path, 'r', encoding='utf-8') as part:
+        if first:
+            part.read(1)
+        shutil.copyfileobj(part, f)
+
+
+def write_json_parallel(input_path, output_path, include_content=True, redactor=None, workers=None):
+    """Convert one log in byte ranges on a process pool, producing the same document as a single pass.
+
+    A first pass scans the ranges for session statistics and counts, which
+    give each range its first line number and message id. A second pass
+    builds and serializes the ranges' items, which are then concatenated, with
+    the timeline merged by timestamp. Each line is decoded twice, but every
+    pass runs on all workers. Returns (message_count, file_operation_count, stats).
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = plan_ranges(input_path, workers)
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor, \
+            tempfile.TemporaryDirectory(prefix='claude-log-parallel-') as spool_dir:
+        stats, starts, total_lines = scan_ranges(executor, str(input_path), ranges)
+        stats = finalize_session_stats(stats)
+        if redactor:
+            stats = apply_secret_replacements_to_dict(stats, redactor)
+
+        prefixes = [str(Path(spool_dir) / str(index)) for index in range(len(ranges))]
+        futures = [
+            executor.submit(convert_range, str(input_path), start, end, first_line, first_message_id,
+                            include_content, redactor, prefix)
+            for (start, end), (first_line, first_message_id), prefix in zip(ranges, starts, prefixes)
+        ]
+        results = [future.result() for future in futures]
+
+        for _, errors, _ in results:
+            for error in errors:
+                print(error)
+
+        message_count = sum(counts['messages'] for counts, _, _ in results)
+        file_operation_count = sum(counts['file_operations'] for counts, _, _ in results)
+        head = {
+            'metadata': {
+                'source_file': redactor.redact(input_path.name) if redactor else input_path.name,
+                'generated_at': datetime.now().isoformat(),
+                'total_lines_processed': total_lines,
+                'include_full_content': include_content
+            },
+            'session_stats': stats
+        }
+
+        with open_output(output_path) as f:
+            # The head without its closing brace, then the arrays and summary, as json.dump(indent=2) writes them
+            f.write(json.dumps(head, indent=2, ensure_ascii=False)[:-2])
+            for name, count in (('messages', message_count), ('file_operations', file_operation_count)):
+                f.write(f',\n  "{name}": [')
+                first = True
+                for (counts, _, _), prefix in zip(results, prefixes):
+                    if counts[name]:
+                        copy_array_part(f, f'{prefix}.{name}', first)
+                        first = False
+                f.write('\n  ]' if count else ']')
+
+            f.write(',\n  "timeline": [')
+            index = -1
+            for index, (_, text) in enumerate(heapq.merge(*(events for _, _, events in results), key=itemgetter(0))):
+                f.write((',\n    ' if index else '\n    ') + text)
+            f.write('\n  ]' if index >= 0 else ']')
+
+            summary = json.dumps({'summary': build_summary(stats, message_count, file_operation_count)},
+                                 indent=2, ensure_ascii=False)
+            f.write(',' + summary[1:])
+
+    return message_count, file_operation_count, stats
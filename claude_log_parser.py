@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Claude Log Parser
+Shared single-pass parsing of Claude JSONL logs into compact message records.
+"""
+
+import json
+import os
+from typing import Any, TypedDict
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bump whenever converter output changes so cached conversions are invalidated
+CONVERTER_VERSION = '7'
+
+
+class MessageFields(TypedDict, total=False):
+    """The parts of a log line's `message` object the converters read."""
+    id: Any
+    role: Any
+    content: Any
+    usage: Any
+
+
+class LineFields(TypedDict, total=False):
+    """The top-level fields of a log line the converters read.
+
+    Decoding into this type lets msgspec skip everything else, such as the
+    `toolUseResult` copies of whole files, without building Python objects for it.
+    """
+    isMeta: Any
+    message: MessageFields
+    timestamp: Any
+    isSidechain: Any
+    uuid: Any
+    parentUuid: Any
+
+
+class LogRecord:
+    """A conversation message decoded from a single JSONL line."""
+
+    __slots__ = ('line_number', 'role', 'timestamp', 'is_sidechain', 'text',
+                 'tool_uses', 'tool_results', 'content', 'api_message_id', 'usage',
+                 'uuid', 'parent_uuid')
+
+    def __init__(self, line_number, role, timestamp, is_sidechain, text,
+                 tool_uses, tool_results, content, api_message_id=None, usage=None,
+                 uuid=None, parent_uuid=None):
+        self.line_number = line_number
+        self.role = role
+        self.timestamp = timestamp
+        self.is_sidechain = is_sidechain
+        self.text = text
+        self.tool_uses = tool_uses
+        self.tool_results = tool_results
+        self.content = content
+        # Assistant messages split over several lines share one API message id and usage
+        self.api_message_id = api_message_id
+        self.usage = usage
+        # Links into the conversation tree (see claude_log_tree)
+        self.uuid = uuid
+        self.parent_uuid = parent_uuid
+
+
+class MalformedLine:
+    """A JSONL line that could not be decoded into a record."""
+
+    __slots__ = ('line_number', 'raw', 'error')
+
+    def __init__(self, line_number, raw, error):
+        self.line_number = line_number
+        self.raw = raw
+        self.error = error
+
+
+def extract_text_content(content):
+    """Extract plain text from message content."""
+    if isinstance(content, str):
+        return content
+    elif isinstance(content, list):
+        text_parts = []
+        for part in content:
+            if isinstance(part, dict):
+                if part.get('type') == 'text':
+                    text_parts.append(part.get('text', ''))
+            else:
+                text_parts.append(str(part))
+        return '\n'.join(text_parts)
+    else:
+        return str(content)
+
+
+def select_decoder(name=None):
+    """Return (name, loads) for the fastest available JSON backend.
+
+    `name` (or the CLAUDE_LOG_DECODER environment variable) may force 'msgspec',
+    'orjson' or 'json'; 'auto' picks msgspec, then orjson, then the stdlib.
+    """
+    name = name or os.environ.get('CLAUDE_LOG_DECODER', 'auto')
+
+    if name in ('auto', 'msgspec') and msgspec is not None:
+        return 'msgspec', msgspec.json.Decoder(LineFields).decode
+    if name in ('auto', 'orjson') and orjson is not None:
+        return 'orjson', orjson.loads
+    if name not in ('auto', 'json'):
+        print(f"Warning: JSON decoder {name} is not available, using the standard library")
+    return 'json', json.loads
+
+
+DECODER_NAME, fast_loads = select_decoder()
+
+
+def is_message_line(line):
+    """Cheaply rule out lines without a message, before decoding them.
+
+    Only complete-looking objects are filtered, so malformed lines still reach
+    the decoder and are reported. isMeta is left to the decoded line: the key
+    may also appear in nested objects, which do not make the line meta.
+    """
+    if not (line[:1] == b'{' and line[-1:] == b'}'):
+        return True
+    return b'"message"' in line
+
+
+def decode_line(line):
+    """Decode a JSON line with the fast backend, falling back to the stdlib.
+
+    The fallback gives lines the fast backend rejects the same treatment and
+    error messages as before.
+    """
+    try:
+        return fast_loads(line)
+    except Exception:
+        return json.loads(line)
+
+
+def parse_line(line, line_number):
+    """Decode one JSONL line into a LogRecord, or None if it is not a conversation message."""
+    line = line.strip()
+    if isinstance(line, str):
+        line = line.encode('utf-8', 'surrogatepass')
+
+    if not is_message_line(line):
+        return None
+
+    data = decode_line(line)
+
+    # Skip meta messages and lines without a message payload
+    if data.get('isMeta') or not data.get('message'):
+        return None
+
+    message = data['message']
+    content = message.get('content', '')
+
+    # Skip empty messages
+    if not content:
+        return None
+
+    tool_uses = []
+    tool_results = []
+    if isinstance(content, list):
+        for part in content:
+            if isinstance(part, dict):
+                part_type = part.get('type')
+                if part_type == 'tool_use':
+                    tool_uses.append(part)
+                elif part_type == 'tool_result':
+                    tool_results.append(part)
+
+    return LogRecord(
+        line_number,
+        message.get('role', 'unknown'),
+        data.get('timestamp'),
+        data.get('isSidechain', False),
+        extract_text_content(content),
+        tool_uses,
+        tool_results,
+        content,
+        message.get('id'),
+        message.get('usage'),
+        data.get('uuid'),
+        data.get('parentUuid')
+    )
+
+
+def iter_records(lines, progress=None, first_line=1):
+    """Yield a LogRecord or MalformedLine for every conversation line, decoding each line once.
+    
+    `lines` may be any iterable of bytes or str, including a file opened in binary
+    mode, so logs can be consumed lazily.
+    When a `progress` dict is given, progress['lines'] tracks the number of the last line read.
+    `first_line` is the line number of the first line, for logs read from an offset.
+    """
+    for line_number, line in enumerate(lines, first_line):
+        if progress is not None:
+            progress['lines'] = line_number
+        
+        try:
+            record = parse_line(line, line_number)
+        except Exception as e:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8', errors='replace')
+            yield MalformedLine(line_number, line, e)
+            continue
+
+        if record is not None:
+            yield record
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Claude Log Conversion Profiling
+Times each stage of a conversion (read, decode, stats, file operations, formatting, redaction, write).
+"""
+
+import builtins
+import cProfile
+import functools
+import importlib
+import json
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from claude_log_batch import format_size
+
+# Stages in report order; time spent outside all of them is reported as 'other'
+STAGES = ('read', 'decode', 'session_stats', 'file_operations', 'format', 'redact', 'write')
+
+# Modules that open the input and output files of a conversion
+CONVERSION_MODULES = ('claude_log_converter', 'claude_log_to_json', 'claude_log_compact',
+                      'claude_log_shards', 'claude_log_columns', 'claude_log_formats')
+
+# (module, function, stage) for the hot functions of each stage; none of them is a generator.
+# Every entry must exist: Instrumentation refuses to run rather than drop a renamed stage
+STAGE_FUNCTIONS = (
+    ('claude_log_parser', 'parse_line', 'decode'),
+    ('claude_log_converter', 'calculate_session_stats', 'session_stats'),
+    ('claude_log_converter', 'update_session_stats', 'session_stats'),
+    ('claude_log_converter', 'update_message_stats', 'session_stats'),
+    ('claude_log_converter', 'finalize_session_stats', 'session_stats'),
+    ('claude_log_to_json', 'calculate_session_stats', 'session_stats'),
+    ('claude_log_to_json', 'update_session_stats', 'session_stats'),
+    ('claude_log_to_json', 'finalize_session_stats', 'session_stats'),
+    ('claude_log_to_json', 'extract_file_operations', 'file_operations'),
+    ('claude_log_converter', 'write_header', 'format'),
+    ('claude_log_converter', 'render_records', 'format'),
+    ('claude_log_to_json', 'build_message_entries', 'format'),
+    ('claude_log_to_json', 'build_summary', 'format'),
+    ('claude_log_to_json', 'build_stream_tail', 'format'),
+)
+
+
+class StageProfiler:
+    """Accumulates exclusive wall time and call counts per stage.
+
+    Stages nest: while a stage runs inside another, the outer one is paused,
+    so the stage times add up to the conversion's wall time. A stage entered
+    again from inside itself is not counted twice.
+    """
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.calls = dict.fromkeys(STAGES, 0)
+        self.stack = []
+        self.lines = 0
+        self.bytes = 0
+
+    def enter(self, stage):
+        """Start timing a stage; returns False when it is already the running stage."""
+        if self.stack and self.stack[-1][0] == stage:
+            return False
+        now = time.perf_counter()
+        if self.stack:
+            outer = self.stack[-1]
+            self.seconds[outer[0]] += now - outer[1]
+        self.stack.append([stage, now])
+        self.calls[stage] += 1
+        return True
+
+    def exit(self):
+        now = time.perf_counter()
+        stage, start = self.stack.pop()
+        self.seconds[stage] += now - start
+        if self.stack:
+            self.stack[-1][1] = now
+
+    def wrap(self, func, stage):
+        profiler = self
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            if not profiler.enter(stage):
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.exit()
+
+        return timed
+
+
+class ProfiledInput:
+    """An input file whose reads are timed as the read stage, counting lines and bytes."""
+
+    def __init__(self, f, profiler):
+        self.f = f
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+    def __enter__(self):
+        self.f.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.f.__exit__(*exc_info)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        entered = self.profiler.enter('read')
+        try:
+            line = next(self.f)
+        finally:
+            if entered:
+                self.profiler.exit()
+        self.profiler.lines += 1
+        self.profiler.bytes += len(line)
+        return line
+
+    def readlines(self, *args):
+        entered = self.profiler.enter('read')
+        try:
+            lines = self.f.readlines(*args)
+        finally:
+            if entered:
+                self.profiler.exit()
+        self.profiler.lines += len(lines)
+        self.profiler.bytes += sum(map(len, lines))
+        return lines
+
+    def read(self, *args):
+        entered = self.profiler.enter('read')
+        try:
+            data = self.f.read(*args)
+        finally:
+            if entered:
+                self.profiler.exit()
+        self.profiler.bytes += len(data)
+        return data
+
+
+class ProfiledOutput:
+    """An output file; the body of its `with` block counts as the write stage.
+
+    Serialization that happens while the file is open (json.dump, array items)
+    is therefore part of writing, minus any other stage running inside the block.
+    """
+
+    def __init__(self, f, profiler):
+        self.f = f
+        self.profiler = profiler
+        self.entered = False
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+    def __enter__(self):
+        self.f.__enter__()
+        self.entered = self.profiler.enter('write')
+        if self.entered:
+            # Already timed as a whole: write straight through, json.dump makes millions of calls
+            self.write = self.f.write
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            return self.f.__exit__(*exc_info)
+        finally:
+            if self.entered:
+                del self.write
+                self.profiler.exit()
+
+    def write(self, text):
+        entered = self.profiler.enter('write')
+        try:
+            return self.f.write(text)
+        finally:
+            if entered:
+                self.profiler.exit()
+
+
+def is_repo_module(module):
+    return getattr(module, '__name__', '').startswith('claude_log_')
+
+
+def check_stage_functions():
+    """Raise if a function listed in STAGE_FUNCTIONS no longer exists, naming every missing one."""
+    missing = [f'{module_name}.{name}' for module_name, name, _ in STAGE_FUNCTIONS
+               if not callable(getattr(importlib.import_module(module_name), name, None))]
+    if missing:
+        raise AttributeError(f"Stage functions not found, update STAGE_FUNCTIONS: {', '.join(missing)}")
+
+
+class Instrumentation:
+    """Installs stage timing into the converter modules for the duration of a `with` block."""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.patches = []
+
+    def patch(self, owner, name, replacement):
+        self.patches.append((owner, name, owner.__dict__.get(name)))
+        setattr(owner, name, replacement)
+
+    def __enter__(self):
+        profiler = self.profiler
+        for name in CONVERSION_MODULES:
+            importlib.import_module(name)
+        check_stage_functions()
+
+        for module_name, name, stage in STAGE_FUNCTIONS:
+            module = sys.modules[module_name]
+            original = getattr(module, name)
+            timed = profiler.wrap(original, stage)
+            if isinstance(original, type):
+                self.patch(module, name, timed)
+                continue
+            # Replace every reference, since modules import these functions by name
+            for other in list(sys.modules.values()):
+                if is_repo_module(other) and other.__dict__.get(name) is original:
+                    self.patch(other, name, timed)
+
+        from claude_log_output import open_output
+        from claude_log_secrets import SecretRedactor
+        self.patch(SecretRedactor, 'redact', profiler.wrap(SecretRedactor.redact, 'redact'))
+
+        def profiled_open(file, mode='r', *args, **kwargs):
+            f = builtins.open(file, mode, *args, **kwargs)
+            if any(flag in mode for flag in 'wax+'):
+                return ProfiledOutput(f, profiler)
+            return ProfiledInput(f, profiler)
+
+        def profiled_open_output(*args, **kwargs):
+            return ProfiledOutput(open_output(*args, **kwargs), profiler)
+
+        for name in CONVERSION_MODULES:
+            module = sys.modules[name]
+            # A module global named open shadows the builtin for that module only
+            self.patch(module, 'open', profiled_open)
+            if module.__dict__.get('open_output') is open_output:
+                self.patch(module, 'open_output', profiled_open_output)
+        return profiler
+
+    def __exit__(self, *exc_info):
+        for owner, name, original in reversed(self.patches):
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        self.patches = []
+        return False
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process; ru_maxrss is in KB on Linux and bytes on macOS."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def profile_conversion(convert_func, input_file, output_file=None, trace_memory=True, cprofile_path=None, **options):
+    """Run one conversion with stage timing and return (success, report).
+
+    Memory tracing slows allocation-heavy stages, so compare stage times
+    between runs with the same settings.
+    """
+    if convert_func.__module__ == '__main__':
+        # Run as a script: call the importable module's function, which is the one instrumented
+        module = importlib.import_module(Path(sys.modules['__main__'].__file__).stem)
+        convert_func = getattr(module, convert_func.__name__)
+
+    profiler = StageProfiler()
+    cprofiler = cProfile.Profile() if cprofile_path else None
+    if trace_memory:
+        tracemalloc.start()
+
+    try:
+        with Instrumentation(profiler):
+            start = time.perf_counter()
+            if cprofiler:
+                success = cprofiler.runcall(convert_func, input_file, output_file, **options)
+            else:
+                success = convert_func(input_file, output_file, **options)
+            wall = time.perf_counter() - start
+        peak_traced = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    if cprofiler:
+        cprofiler.dump_stats(cprofile_path)
+
+    return success, build_report(profiler, input_file, wall, peak_traced, convert_func.__name__, options)
+
+
+def build_report(profiler, input_file, wall, peak_traced, converter, options):
+    """Build the JSON-ready profile of a finished conversion."""
+    other = max(0.0, wall - sum(profiler.seconds.values()))
+    stages = [{'stage': stage, 'seconds': round(profiler.seconds[stage], 6), 'calls': profiler.calls[stage],
+               'percent': round(100 * profiler.seconds[stage] / wall, 1) if wall else 0.0}
+              for stage in STAGES]
+    stages.append({'stage': 'other', 'seconds': round(other, 6), 'calls': None,
+                   'percent': round(100 * other / wall, 1) if wall else 0.0})
+    return {
+        'format': 'claude-log-profile',
+        'converter': converter,
+        'input_file': str(input_file),
+        'options': {key: value for key, value in options.items() if key != 'redactor'},
+        'redaction': bool(options.get('redactor')),
+        'wall_seconds': round(wall, 6),
+        'lines': profiler.lines,
+        'bytes': profiler.bytes,
+        'lines_per_second': round(profiler.lines / wall) if wall else None,
+        'bytes_per_second': round(profiler.bytes / wall) if wall else None,
+        'peak_traced_memory_bytes': peak_traced,
+        'peak_rss_bytes': peak_rss_bytes(),
+        'stages': stages
+    }
+
+
+def print_report(report):
+    """Print a profile as a table of stages followed by throughput and memory."""
+    print(f"\nProfile of {report['input_file']}:")
+    print(f"  {'Stage':<16} {'Time (s)':>10} {'Share':>7} {'Calls':>11}")
+    for stage in report['stages']:
+        if stage['calls'] == 0:
+            continue
+        calls = f"{stage['calls']:,}" if stage['calls'] is not None else '-'
+        print(f"  {stage['stage']:<16} {stage['seconds']:>10.3f} {stage['percent']:>6.1f}% {calls:>11}")
+    print(f"  {'total':<16} {report['wall_seconds']:>10.3f} {100:>6.1f}%")
+
+    wall = report['wall_seconds']
+    print(f"- {report['lines']:,} lines, {format_size(report['bytes'])} read")
+    if wall:
+        print(f"- {report['lines_per_second']:,} lines/s, {format_size(report['bytes_per_second'])}/s")
+    if report['peak_traced_memory_bytes'] is not None:
+        print(f"- Peak traced memory: {format_size(report['peak_traced_memory_bytes'])}")
+    print(f"- Peak RSS: {format_size(report['peak_rss_bytes'])}")
+
+
+def add_profile_arguments(parser):
+    """Add the profiling options to a converter's argument parser."""
+    parser.add_argument('--profile', action='store_true', help='Report time and calls per conversion stage, throughput and peak memory')
+    parser.add_argument('--profile-json', metavar='PATH', help='Also save the profile as JSON (implies --profile)')
+    parser.add_argument('--profile-cprofile', metavar='PATH', help='Also save a cProfile dump for pstats or snakeviz (implies --profile)')
+    parser.add_argument('--no-trace-memory', action='store_true', help='Profile without tracemalloc, which slows allocation-heavy stages')
+
+
+def profiling_requested(args):
+    return bool(args.profile or args.profile_json or args.profile_cprofile)
+
+
+def run_profiled(convert_func, input_file, output_file, args, **options):
+    """Profile one conversion as the command line asked, print the table and save the requested files."""
+    success, report = profile_conversion(convert_func, input_file, output_file, not args.no_trace_memory,
+                                         args.profile_cprofile, **options)
+    print_report(report)
+
+    if args.profile_json:
+        with open(args.profile_json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved profile to {args.profile_json}")
+    if args.profile_cprofile:
+        print(f"Saved cProfile stats to {args.profile_cprofile}")
+    return success
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Claude Log File Replay
+Reconstructs the content of every file a session touched, as of any message, from its Write and Edit operations.
+"""
+
+import argparse
+import gzip
+import json
+import sys
+from bisect import bisect_right
+from pathlib import Path
+
+from claude_log_deltas import expand_write_deltas
+from claude_log_parser import MalformedLine, iter_records
+from claude_log_to_json import extract_file_operations
+
+# Operations that change a file's content
+CONTENT_OPERATIONS = ('write', 'edit', 'multiedit')
+# Keep the content after every Nth operation, so a seek replays at most N - 1 operations
+SNAPSHOT_INTERVAL = 16
+
+
+def apply_edit(content, edit):
+    """Apply one edit like the Edit tool does, returning the new content or None if it would fail."""
+    old_string = edit.get('old_string', '')
+    new_string = edit.get('new_string', '')
+    if not old_string:
+        # An empty old_string only creates a file that is empty
+        return new_string if content == '' else None
+    if old_string not in content:
+        return None
+    if edit.get('replace_all'):
+        return content.replace(old_string, new_string)
+    return content.replace(old_string, new_string, 1)
+
+
+def apply_file_operation(content, op):
+    """Return (content, failed_edits) after one operation.
+
+    A content of None means the file's content is unknown: it existed before
+    the session and has not been written since, so edits cannot be applied.
+    A MultiEdit is all or nothing, like the tool itself.
+    """
+    if op['type'] == 'write':
+        return op.get('content_preview', ''), 0
+    if op['type'] not in ('edit', 'multiedit'):
+        return content, 0
+
+    edits = op.get('edits') or []
+    if content is None:
+        return None, len(edits)
+
+    failed = 0
+    updated = content
+    for edit in edits:
+        result = apply_edit(updated, edit)
+        if result is None:
+            failed += 1
+            if op['type'] == 'multiedit':
+                return content, len(edits)
+        else:
+            updated = result
+    return updated, failed
+
+
+class FileHistory:
+    """The content-changing operations on one file, with periodic snapshots."""
+
+    __slots__ = ('path', 'message_ids', 'operations', 'snapshots', 'content', 'failed_edits')
+
+    def __init__(self, path):
+        self.path = path
+        self.message_ids = []
+        self.operations = []
+        # snapshots[i] is (content, failed_edits) after the first i * SNAPSHOT_INTERVAL operations
+        self.snapshots = [(None, 0)]
+        self.content = None
+        self.failed_edits = 0
+
+    def add(self, message_id, op):
+        self.content, failed = apply_file_operation(self.content, op)
+        self.failed_edits += failed
+        self.message_ids.append(message_id)
+        self.operations.append(op)
+        if len(self.operations) % SNAPSHOT_INTERVAL == 0:
+            self.snapshots.append((self.content, self.failed_edits))
+
+    def state_at(self, message_id):
+        """Return (content, failed_edits, operations_applied) after all operations up to message_id."""
+        count = bisect_right(self.message_ids, message_id)
+        index = count // SNAPSHOT_INTERVAL
+        content, failed_edits = self.snapshots[index]
+        for op in self.operations[index * SNAPSHOT_INTERVAL:count]:
+            content, failed = apply_file_operation(content, op)
+            failed_edits += failed
+        return content, failed_edits, count
+
+
+class FileReplay:
+    """Replays a session's file operations once and answers "file as of message" queries.
+
+    Operations must be added in message order, which is the order of the
+    converter's file_operations list.
+    """
+
+    def __init__(self, file_operations=()):
+        self.files = {}
+        for op in file_operations:
+            self.add(op)
+
+    def add(self, op):
+        if op['type'] not in CONTENT_OPERATIONS or not op.get('file_path'):
+            return
+        history = self.files.get(op['file_path'])
+        if history is None:
+            history = self.files[op['file_path']] = FileHistory(op['file_path'])
+        history.add(op['message_id'], op)
+
+    def paths(self, message_id=None):
+        """Return the files changed up to message_id (or in the whole session)."""
+        return sorted(path for path, history in self.files.items()
+                      if message_id is None or history.message_ids[0] <= message_id)
+
+    def resolve(self, name):
+        """Find a file by its full path, or by a unique path suffix such as its file name."""
+        if name in self.files:
+            return name
+        matches = [path for path in self.files if path.endswith('/' + name.lstrip('/'))]
+        if len(matches) == 1:
+            return matches[0]
+        if not matches:
+            raise KeyError(f"No changes to {name} in this session")
+        raise KeyError(f"{name} is ambiguous: " + ', '.join(sorted(matches)))
+
+    def file_at(self, path, message_id=None):
+        """Return the content of a file as of a message, with how certain it is."""
+        path = self.resolve(path)
+        history = self.files[path]
+        if message_id is None:
+            message_id = history.message_ids[-1]
+        content, failed_edits, applied = history.state_at(message_id)
+        return {
+            'file_path': path,
+            'message_id': message_id,
+            'content': content,
+            # Unknown content: the file predates the session and has not been fully written yet
+            'known': content is not None,
+            'operations_applied': applied,
+            'operations_total': len(history.operations),
+            'failed_edits': failed_edits
+        }
+
+
+def read_file_operations(input_path):
+    """Read the file operations of a log or of a converted JSON file (plain, compact or gzipped)."""
+    input_path = Path(input_path)
+
+    if input_path.suffix == '.jsonl':
+        operations = []
+        message_id = 0
+        with open(input_path, 'rb') as src:
+            for record in iter_records(src):
+                if isinstance(record, MalformedLine):
+                    continue
+                # Number messages like the converters do
+                message_id += 1
+                for op in extract_file_operations(record.content):
+                    op['message_id'] = message_id
+                    operations.append(op)
+        return operations
+
+    with open(input_path, 'rb') as f:
+        data = f.read()
+    if data[:2] == b'\x1f\x8b':
+        data = gzip.decompress(data)
+    data = json.loads(data)
+
+    from claude_log_compact import expand_compact, is_compact
+    if is_compact(data):
+        data = expand_compact(data)
+    return expand_write_deltas(data['file_operations'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show a file as it was at any point of a Claude session')
+    parser.add_argument('input_file', help='Input JSONL log, or JSON converted from one')
+    parser.add_argument('file', nargs='?', help='File path or unique path suffix (omit to list changed files)')
+    parser.add_argument('--at', type=int, metavar='MESSAGE_ID', help='Message id to replay up to (default: the end of the session)')
+    parser.add_argument('-o', '--output', help='Write the content to this file instead of stdout')
+
+    args = parser.parse_args()
+
+    try:
+        replay = FileReplay(read_file_operations(args.input_file))
+    except Exception as e:
+        print(f"Error reading {args.input_file}: {e}")
+        sys.exit(1)
+
+    if not args.file:
+        for path in replay.paths(args.at):
+            history = replay.files[path]
+            print(f"{path}  ({len(history.operations)} changes, messages {history.message_ids[0]}-{history.message_ids[-1]})")
+        return
+
+    try:
+        state = replay.file_at(args.file, args.at)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        sys.exit(1)
+
+    if not state['known']:
+        print(f"Error: The content of {state['file_path']} before this session is unknown "
+              f"({state['failed_edits']} edits could not be applied)")
+        sys.exit(1)
+    if state['failed_edits']:
+        print(f"Warning: {state['failed_edits']} edits did not apply and were skipped", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(state['content'])
+        print(f"Wrote {state['file_path']} as of message {state['message_id']} to {args.output}")
+    else:
+        sys.stdout.write(state['content'])
+
+
+if __name__ == '__main__':
+    main()
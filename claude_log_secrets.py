@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Claude Log Secret Redaction
+Compiles secret replacements into a single pattern and redacts text in one scan, optionally detecting unlisted secrets too.
+"""
+
+import hashlib
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from claude_log_detect import SecretDetector
+
+DEFAULT_SECRETS_FILE = Path(__file__).parent / 'secrets.local.md'
+
+
+def load_secret_replacements(secrets_file_path):
+    """Load secret replacement patterns from secrets.local.md file."""
+    replacements = {}
+    secrets_path = Path(secrets_file_path)
+
+    if not secrets_path.exists():
+        return replacements
+
+    try:
+        with open(secrets_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and '=' in line:
+                    secret, replacement = line.split('=', 1)
+                    replacements[secret.strip()] = replacement.strip()
+    except Exception as e:
+        print(f"Warning: Could not load secrets file {secrets_file_path}: {e}")
+
+    return replacements
+
+
+def build_trie_pattern(node):
+    """Build a regex from a character trie, preferring the longest match at each position."""
+    branches = []
+    for char, child in node.items():
+        if not char:
+            continue
+        # Collapse runs of single-child nodes into one literal so long secrets do not recurse per character
+        literal = [char]
+        while len(child) == 1 and '' not in child:
+            (char, child), = child.items()
+            literal.append(char)
+        branches.append(re.escape(''.join(literal)) + build_trie_pattern(child))
+
+    if not branches:
+        return ''
+
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        # A secret ends here; the greedy optional group still tries longer secrets first
+        return f'(?:{body})?' if len(branches) == 1 else body + '?'
+    return body
+
+
+class SecretRedactor:
+    """All secret replacements compiled into one case-insensitive pattern.
+
+    Secrets are merged into a prefix tree so each string is redacted in a single
+    left-to-right scan, taking the longest secret that matches at each position.
+    With a SecretDetector, unlisted secrets are detected in what remains once
+    the listed ones are replaced, so listed secrets keep their replacements.
+    """
+
+    def __init__(self, replacements, detector=None):
+        self.replacements = {}
+        trie = {}
+
+        # Longest first, so that among secrets differing only in case the first listed wins
+        for secret in sorted(replacements, key=len, reverse=True):
+            if not secret:
+                continue
+            key = secret.lower()
+            if key in self.replacements:
+                continue
+            self.replacements[key] = replacements[secret]
+
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        self.pattern = re.compile(build_trie_pattern(trie), re.IGNORECASE) if trie else None
+        self.detector = detector
+        # Stable identity for conversion cache keys
+        self.cache_token = hashlib.sha256(repr(sorted(self.replacements.items())).encode('utf-8')).hexdigest()
+        if detector is not None:
+            self.cache_token = hashlib.sha256((self.cache_token + detector.cache_token).encode('utf-8')).hexdigest()
+
+    def __len__(self):
+        return len(self.replacements)
+
+    def __bool__(self):
+        # A redactor with only a detector has no replacements but still redacts
+        return self.pattern is not None or self.detector is not None
+
+    def _replace(self, match):
+        secret = match.group(0)
+        replacement = self.replacements.get(secret.lower())
+        if replacement is None:
+            # Case folding that str.lower() does not mirror; fall back to a direct comparison
+            for key, value in self.replacements.items():
+                if re.fullmatch(re.escape(key), secret, re.IGNORECASE):
+                    return value
+            return secret
+        return replacement
+
+    def redact(self, text):
+        """Replace every secret in text."""
+        if not text:
+            return text
+        if self.pattern is not None:
+            text = self.pattern.sub(self._replace, text)
+        if self.detector is not None:
+            text = self.detector.redact(text)
+        return text
+
+
+REDACT_CHUNK_SIZE = 64 * 1024
+
+
+class RedactingWriter:
+    """File-like wrapper that redacts text before writing it.
+
+    Writes are collected and redacted up to the last blank line once enough
+    text is pending, so a secret split across several writes is still
+    redacted whole. Call flush() after the last write.
+    """
+
+    def __init__(self, f, redactor):
+        self.f = f
+        self.redactor = redactor
+        self.pending = []
+        self.pending_size = 0
+        self.limit = REDACT_CHUNK_SIZE
+
+    def write(self, text):
+        self.pending.append(text)
+        self.pending_size += len(text)
+        if self.pending_size >= self.limit:
+            buffered = ''.join(self.pending)
+            end = buffered.rfind('\n\n') + 2
+            if end > 1:
+                self.f.write(self.redactor.redact(buffered[:end]))
+                buffered = buffered[end:]
+            self.pending = [buffered]
+            self.pending_size = len(buffered)
+            # Without a blank line to split at, wait for twice as much text before joining again
+            self.limit = max(REDACT_CHUNK_SIZE, 2 * self.pending_size)
+        return len(text)
+
+    def flush(self):
+        """Redact and write everything pending."""
+        if self.pending:
+            self.f.write(self.redactor.redact(''.join(self.pending)))
+            self.pending = []
+            self.pending_size = 0
+            self.limit = REDACT_CHUNK_SIZE
+
+
+@lru_cache(maxsize=8)
+def _compile_items(items):
+    return SecretRedactor(dict(items))
+
+
+def compile_secret_replacements(replacements):
+    """Return a SecretRedactor for a replacements dict, reusing one that is already compiled."""
+    if isinstance(replacements, SecretRedactor):
+        return replacements
+    return _compile_items(tuple(replacements.items()))
+
+
+def apply_secret_replacements(text, replacements):
+    """Apply secret replacements to text content."""
+    if not replacements or not text:
+        return text
+
+    return compile_secret_replacements(replacements).redact(text)
+
+
+def apply_secret_replacements_to_value(value, replacements):
+    """Apply secret replacements to a single value (string)."""
+    if not replacements or not isinstance(value, str):
+        return value
+
+    return compile_secret_replacements(replacements).redact(value)
+
+
+def apply_secret_replacements_to_dict(obj, replacements):
+    """Recursively apply secret replacements to all string values in a dictionary or list."""
+    if replacements:
+        replacements = compile_secret_replacements(replacements)
+
+    if isinstance(obj, dict):
+        return {key: apply_secret_replacements_to_dict(value, replacements) for key, value in obj.items()}
+    elif isinstance(obj, list):
+        return [apply_secret_replacements_to_dict(item, replacements) for item in obj]
+    elif isinstance(obj, str):
+        return apply_secret_replacements_to_value(obj, replacements)
+    else:
+        return obj
+
+
+def add_secrets_argument(parser):
+    """Add the --secrets and --detect-secrets options to a converter's argument parser."""
+    parser.add_argument('--secrets', nargs='?', const=str(DEFAULT_SECRETS_FILE), metavar='PATH',
+                        help='Redact secrets listed in a secrets file while writing (default: secrets.local.md next to the scripts)')
+    parser.add_argument('--detect-secrets', action='store_true',
+                        help='Also redact unlisted API keys, tokens, private keys, connection string passwords '
+                             'and high-entropy strings')
+
+
+def redactor_from_args(args):
+    """Load and compile the secrets file named on the command line, or return None."""
+    detector = SecretDetector() if getattr(args, 'detect_secrets', False) else None
+    replacements = load_secret_replacements(args.secrets) if args.secrets is not None else {}
+
+    if args.secrets is not None and not replacements:
+        if detector is None:
+            print("No secret replacements found - file processed without changes")
+            return None
+        print("No secret replacements found")
+    elif replacements:
+        print(f"Applying {len(replacements)} secret replacements")
+
+    if detector is None:
+        return SecretRedactor(replacements) if replacements else None
+    print(f"Detecting secrets with {len(detector)} rules")
+    return SecretRedactor(replacements, detector)
+
+
+def print_detection_report(redactor):
+    """Print how many replacements each detection rule made, if the redactor detects secrets."""
+    if redactor is None or redactor.detector is None:
+        return
+    hits = redactor.detector.hit_counts()
+    print(f"Redacted {sum(hits.values()):,} detected secrets" + (':' if hits else ''))
+    for rule, count in hits.most_common():
+        print(f"- {rule}: {count:,}")
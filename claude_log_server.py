@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Claude Log Viewer Server
+Serves the viewer and a paginated, filtered session API backed by cached shard conversions.
+"""
+
+import argparse
+import gzip
+import json
+import shutil
+import threading
+from functools import lru_cache
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from claude_log_batch import collect_input_files
+from claude_log_cache import default_cache_dir, path_digest
+from claude_log_lines import LineIndex
+from claude_log_parser import CONVERTER_VERSION
+from claude_log_replay import FileReplay
+from claude_log_secrets import add_secrets_argument, redactor_from_args
+from claude_log_shards import MANIFEST_NAME, VIEWER_FILTERS, message_filters, write_json_shards
+
+SESSION_FORMAT = 'claude-log-session'
+SESSION_FORMAT_VERSION = 1
+VIEWER_FILE = Path(__file__).with_name('index.html')
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+# Seconds a client is asked to wait before asking again for a session still being converted
+RETRY_AFTER_SECONDS = 1
+
+
+@lru_cache(maxsize=64)
+def load_shard(path):
+    """Read a shard file; shards never change once their conversion directory exists."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class ConversionPending(Exception):
+    """Raised for a session whose first conversion is still running."""
+
+
+class SessionStore:
+    """Finds session logs and keeps an up-to-date shard conversion of each one on disk.
+
+    Conversions are keyed by the log's path, size and mtime and survive
+    restarts. Conversions are built in the background: requests for a session
+    that has none yet get ConversionPending, and when its log changes later,
+    requests keep getting the previous conversion while the new one is built,
+    so no request waits for a full conversion.
+    """
+
+    def __init__(self, inputs, cache_dir, redactor=None, shard_size=500):
+        self.inputs = inputs
+        self.cache_dir = Path(cache_dir)
+        self.redactor = redactor
+        self.shard_size = shard_size
+        self.paths = {}
+        self.locks = {}
+        self.converting = set()
+        # session_id: (version key, error) of the last conversion that failed
+        self.failures = {}
+        self.replays = {}
+        self.line_indexes = {}
+        self.lock = threading.Lock()
+
+    def scan(self):
+        """Rescan the inputs and return {session_id: path}, so new sessions appear without a restart."""
+        paths = {}
+        for input_path, _ in collect_input_files(self.inputs):
+            paths[path_digest(input_path.resolve())[:16]] = input_path
+        with self.lock:
+            self.paths = paths
+        return paths
+
+    def path_for(self, session_id):
+        path = self.paths.get(session_id) or self.scan().get(session_id)
+        if path is None:
+            raise KeyError(session_id)
+        return path
+
+    def version_key(self, session_id):
+        """Identify the current content of a session without reading it."""
+        stat = self.path_for(session_id).stat()
+        redactor = self.redactor.cache_token if self.redactor else None
+        return path_digest(CONVERTER_VERSION, stat.st_size, stat.st_mtime_ns, redactor, self.shard_size)[:16]
+
+    def session_lock(self, session_id):
+        with self.lock:
+            return self.locks.setdefault(session_id, threading.Lock())
+
+    def conversions(self, session_id):
+        """Return the finished conversion directories of a session, newest first."""
+        finished = [path for path in self.cache_dir.glob(f'{session_id}-*')
+                    if not path.name.endswith('.tmp') and (path / MANIFEST_NAME).exists()]
+        return sorted(finished, key=lambda path: (path / MANIFEST_NAME).stat().st_mtime_ns, reverse=True)
+
+    def convert(self, session_id):
+        """Convert the current version of a session unless it already is; returns its directory."""
+        key = self.version_key(session_id)
+        shard_dir = self.cache_dir / f'{session_id}-{key}'
+
+        with self.session_lock(session_id):
+            if not (shard_dir / MANIFEST_NAME).exists():
+                tmp_dir = self.cache_dir / f'{session_id}-{key}.tmp'
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                write_json_shards(self.path_for(session_id), tmp_dir, True, self.redactor, self.shard_size)
+                tmp_dir.rename(shard_dir)
+                # The conversion served until now may still be read by requests in flight;
+                # anything older is no longer reachable
+                for stale in self.conversions(session_id)[2:]:
+                    shutil.rmtree(stale, ignore_errors=True)
+        return shard_dir
+
+    def convert_in_background(self, session_id):
+        """Start converting a session's current version, unless a conversion of it is already running."""
+        with self.lock:
+            if session_id in self.converting:
+                return
+            self.converting.add(session_id)
+
+        def run():
+            key = None
+            try:
+                key = self.version_key(session_id)
+                self.convert(session_id)
+            except Exception as e:
+                print(f"Error converting {self.paths.get(session_id)}: {e}")
+                with self.lock:
+                    self.failures[session_id] = (key, str(e))
+            finally:
+                with self.lock:
+                    self.converting.discard(session_id)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def manifest(self, session_id):
+        """Return (shard_dir, manifest) of the newest conversion of a session.
+
+        If the log changed since the newest one, that one is returned and a new
+        conversion starts in the background. A session without any conversion
+        starts one and raises ConversionPending, or RuntimeError if converting
+        this version of the log already failed.
+        """
+        key = self.version_key(session_id)
+        shard_dir = self.cache_dir / f'{session_id}-{key}'
+        if not (shard_dir / MANIFEST_NAME).exists():
+            previous = self.conversions(session_id)
+            if not previous:
+                failure = self.failures.get(session_id)
+                if failure and failure[0] == key:
+                    raise RuntimeError(failure[1])
+                self.convert_in_background(session_id)
+                raise ConversionPending(session_id)
+            self.convert_in_background(session_id)
+            shard_dir = previous[0]
+        return shard_dir, load_shard(str(shard_dir / MANIFEST_NAME))
+
+    def replay(self, session_id):
+        """Return (shard_dir, file replay) of a session's served conversion, building the replay on first use."""
+        shard_dir, manifest = self.manifest(session_id)
+        with self.session_lock(session_id):
+            cached = self.replays.get(session_id)
+            if cached is None or cached[0] != shard_dir:
+                replay = FileReplay()
+                for page in manifest['pages']:
+                    for op in load_shard(str(shard_dir / page['file']))['file_operations']:
+                        replay.add(op)
+                cached = self.replays[session_id] = (shard_dir, replay)
+        return cached
+
+    def raw_lines(self, session_id, first, last):
+        """Return (line count, [(line number, text)]) for lines first to last of a session's log.
+
+        The log's line index is kept in the cache directory and extended as the
+        log grows, so no request reads the log beyond the lines it returns.
+        """
+        path = self.path_for(session_id)
+        with self.lock:
+            entry = self.line_indexes.setdefault(session_id, [threading.Lock(), None])
+        # Refreshing remaps the log, so reads of the same index wait for it
+        with entry[0]:
+            if entry[1] is None:
+                entry[1] = LineIndex(path, self.cache_dir / f'{session_id}.lines')
+            else:
+                entry[1].refresh()
+            index = entry[1]
+            # A range running past the end is cut short; one starting past it is an IndexError
+            lines = index.lines(first, max(first, min(last, index.line_count)))
+            line_count = index.line_count
+
+        texts = [(number, raw.decode('utf-8', errors='replace')) for number, raw in lines]
+        if self.redactor:
+            texts = [(number, self.redactor.redact(text)) for number, text in texts]
+        return line_count, texts
+
+    def warm(self):
+        """Convert every session ahead of its first request, most recently modified first."""
+        sessions = sorted(self.scan().items(), key=lambda item: item[1].stat().st_mtime, reverse=True)
+        for session_id, path in sessions:
+            try:
+                self.convert(session_id)
+            except Exception as e:
+                print(f"Error converting {path}: {e}")
+
+
+def conversion_etag(shard_dir, *request):
+    """ETag of a response built from a conversion: its version key plus a digest of the request's parameters."""
+    key = shard_dir.name.rsplit('-', 1)[1]
+    return f'"{key}-{path_digest(*request)[:8]}"' if request else f'"{key}"'
+
+
+def filter_totals(manifest):
+    """Sum the per-page filter counts of a manifest."""
+    return {name: sum(page['counts'][name] for page in manifest['pages']) for name in VIEWER_FILTERS}
+
+
+def session_summary(session_id, manifest):
+    """The stats response: everything the viewer shows before the first message."""
+    return {
+        'format': SESSION_FORMAT,
+        'version': SESSION_FORMAT_VERSION,
+        'id': session_id,
+        'metadata': manifest['metadata'],
+        'session_stats': manifest['session_stats'],
+        'summary': manifest['summary'],
+        'counts': filter_totals(manifest)
+    }
+
+
+def page_messages(shard_dir, manifest, filter_name, offset, limit):
+    """Return the `limit` messages shown under a filter from position `offset` on.
+
+    The manifest's per-page counts locate the first shard needed, so a page
+    deep into a session reads only the one or two shards that hold it.
+    """
+    total = filter_totals(manifest)[filter_name]
+    skipped = 0
+    messages = []
+    file_operations = []
+
+    for page in manifest['pages']:
+        count = page['counts'][filter_name]
+        if skipped + count <= offset:
+            skipped += count
+            continue
+
+        shard = load_shard(str(shard_dir / page['file']))
+        ids = set()
+        for msg in shard['messages']:
+            if filter_name not in message_filters(msg):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            messages.append(msg)
+            ids.add(msg['id'])
+            if len(messages) >= limit:
+                break
+        file_operations.extend(op for op in shard['file_operations'] if op['message_id'] in ids)
+
+        if len(messages) >= limit:
+            break
+
+    next_offset = offset + len(messages)
+    return {
+        'filter': filter_name,
+        'offset': offset,
+        'total': total,
+        'next_offset': next_offset if next_offset < total else None,
+        'messages': messages,
+        'file_operations': file_operations
+    }
+
+
+class ViewerRequestHandler(BaseHTTPRequestHandler):
+    """Routes requests for the viewer page and the session API.
+
+    GET /                                  the viewer
+    GET /api/sessions                      the list of sessions
+    GET /api/sessions/<id>                 metadata, stats and per-filter message counts
+    GET /api/sessions/<id>/messages        ?filter=main|all|file-ops|interruptions&offset=0&limit=100
+    GET /api/sessions/<id>/file            ?path=...&at=<message id>, a file as of that message
+    GET /api/sessions/<id>/lines           ?from=<line>&to=<line>, raw log lines by line number
+
+    Session requests answer 202 {"status": "converting"} with a Retry-After
+    header until the session's first conversion is ready.
+    """
+
+    server_version = 'ClaudeLogServer/1'
+    store = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        try:
+            if not parts or parts == ['index.html']:
+                self.send_viewer()
+            elif parts == ['api', 'sessions']:
+                self.send_sessions()
+            elif len(parts) == 3 and parts[:2] == ['api', 'sessions']:
+                self.send_session(parts[2])
+            elif len(parts) == 4 and parts[:2] == ['api', 'sessions'] and parts[3] == 'messages':
+                self.send_messages(parts[2], query)
+            elif len(parts) == 4 and parts[:2] == ['api', 'sessions'] and parts[3] == 'file':
+                self.send_file_state(parts[2], query)
+            elif len(parts) == 4 and parts[:2] == ['api', 'sessions'] and parts[3] == 'lines':
+                self.send_raw_lines(parts[2], query)
+            else:
+                self.send_error(HTTPStatus.NOT_FOUND)
+        except ConversionPending:
+            self.send_pending()
+        except KeyError:
+            self.send_error(HTTPStatus.NOT_FOUND, 'Unknown session')
+        except ValueError as e:
+            self.send_error(HTTPStatus.BAD_REQUEST, str(e))
+        except Exception as e:
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+
+    def not_modified(self, etag):
+        """Answer 304 if the client already has this version; otherwise False."""
+        if etag not in (self.headers.get('If-None-Match') or ''):
+            return False
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header('ETag', etag)
+        self.end_headers()
+        return True
+
+    def send_body(self, body, content_type, etag):
+        """Send a response body with its ETag, gzipped when the client accepts it."""
+        if len(body) >= GZIP_MIN_BYTES and 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+            encoding = 'gzip'
+        else:
+            encoding = None
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        # Clients may keep responses but must revalidate them, which costs one 304
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, data, etag):
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.send_body(body, 'application/json; charset=utf-8', etag)
+
+    def send_pending(self):
+        """Answer 202 for a session still being converted; the client asks again after Retry-After."""
+        body = json.dumps({'status': 'converting'}).encode('utf-8')
+        self.send_response(HTTPStatus.ACCEPTED)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Retry-After', str(RETRY_AFTER_SECONDS))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_viewer(self):
+        stat = VIEWER_FILE.stat()
+        etag = f'"{path_digest(stat.st_size, stat.st_mtime_ns)[:16]}"'
+        if not self.not_modified(etag):
+            self.send_body(VIEWER_FILE.read_bytes(), 'text/html; charset=utf-8', etag)
+
+    def send_sessions(self):
+        sessions = []
+        for session_id, path in self.store.scan().items():
+            stat = path.stat()
+            sessions.append({
+                'id': session_id,
+                'name': path.name,
+                'project': path.parent.name,
+                'size': stat.st_size,
+                'modified': stat.st_mtime
+            })
+        sessions.sort(key=lambda session: session['modified'], reverse=True)
+
+        etag = f'"{path_digest(*(s["id"] + str(s["size"]) + str(s["modified"]) for s in sessions))[:16]}"'
+        if not self.not_modified(etag):
+            self.send_json({'sessions': sessions}, etag)
+
+    def send_session(self, session_id):
+        shard_dir, manifest = self.store.manifest(session_id)
+        etag = conversion_etag(shard_dir)
+        if not self.not_modified(etag):
+            self.send_json(session_summary(session_id, manifest), etag)
+
+    def send_messages(self, session_id, query):
+        filter_name = query.get('filter', 'main')
+        if filter_name not in VIEWER_FILTERS:
+            raise ValueError(f"Unknown filter: {filter_name}")
+        offset = max(int(query.get('offset', 0)), 0)
+        limit = min(max(int(query.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+
+        shard_dir, manifest = self.store.manifest(session_id)
+        etag = conversion_etag(shard_dir, filter_name, offset, limit)
+        if not self.not_modified(etag):
+            self.send_json(page_messages(shard_dir, manifest, filter_name, offset, limit), etag)
+
+    def send_file_state(self, session_id, query):
+        if 'path' not in query:
+            raise ValueError("Missing path")
+        message_id = int(query['at']) if 'at' in query else None
+
+        shard_dir, replay = self.store.replay(session_id)
+        etag = conversion_etag(shard_dir, query['path'], message_id)
+        if self.not_modified(etag):
+            return
+        try:
+            state = replay.file_at(query['path'], message_id)
+        except KeyError as e:
+            self.send_error(HTTPStatus.NOT_FOUND, e.args[0])
+            return
+        self.send_json(state, etag)
+
+    def send_raw_lines(self, session_id, query):
+        if 'from' not in query:
+            raise ValueError("Missing from")
+        first = int(query['from'])
+        last = int(query.get('to', first))
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid line range {first}-{last}")
+        last = min(last, first + MAX_PAGE_SIZE - 1)
+
+        etag = f'"{self.store.version_key(session_id)}-{path_digest(first, last)[:8]}"'
+        if self.not_modified(etag):
+            return
+        try:
+            line_count, lines = self.store.raw_lines(session_id, first, last)
+        except IndexError as e:
+            self.send_error(HTTPStatus.NOT_FOUND, str(e))
+            return
+        self.send_json({
+            'line_count': line_count,
+            'lines': [{'line_number': number, 'text': text} for number, text in lines]
+        }, etag)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the log viewer with a paginated session API')
+    parser.add_argument('input_file', nargs='*', help='Input JSONL files, directories or glob patterns (default: ~/.claude/projects)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    parser.add_argument('--cache-dir', help='Where converted sessions are kept (default: ~/.cache/claude-log-converter/server)')
+    parser.add_argument('--no-warm', action='store_true', help='Convert sessions on first request instead of in the background at startup')
+    add_secrets_argument(parser)
+
+    args = parser.parse_args()
+
+    inputs = args.input_file or [str(Path.home() / '.claude' / 'projects')]
+    cache_dir = Path(args.cache_dir) if args.cache_dir else default_cache_dir() / 'server'
+    ViewerRequestHandler.store = SessionStore(inputs, cache_dir, redactor_from_args(args))
+
+    if not args.no_warm:
+        threading.Thread(target=ViewerRequestHandler.store.warm, daemon=True).start()
+
+    server = ThreadingHTTPServer((args.host, args.port), ViewerRequestHandler)
+    print(f"Serving {len(ViewerRequestHandler.store.scan())} sessions at http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
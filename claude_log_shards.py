@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Claude Log Sharded Output
+Writes a small manifest plus fixed-size message and timeline shards for lazy loading.
+"""
+
+import json
+import os
+
+from claude_log_parser import MalformedLine, iter_records
+from claude_log_secrets import apply_secret_replacements_to_dict
+from claude_log_to_json import (
+    build_message_entries, build_stream_tail, finalize_session_stats, new_session_stats, update_session_stats
+)
+
+SHARD_FORMAT = 'claude-log-shards'
+SHARD_FORMAT_VERSION = 1
+DEFAULT_SHARD_SIZE = 500
+MANIFEST_NAME = 'manifest.json'
+
+
+VIEWER_FILTERS = ('main', 'all', 'file-ops', 'interruptions')
+
+
+def message_filters(msg):
+    """Return the viewer filters under which a message is shown."""
+    # Mirrors the viewer, which skips messages with nothing to display
+    if not ((msg.get('content') or '').strip() or msg['has_file_operations'] or msg['is_interruption']):
+        return ()
+    filters = ['all']
+    if not msg['is_sidechain']:
+        filters.append('main')
+    if msg['has_file_operations']:
+        filters.append('file-ops')
+    if msg['is_interruption']:
+        filters.append('interruptions')
+    return filters
+
+
+def page_counts(messages):
+    """Count the messages of a page the viewer would show under each filter."""
+    counts = dict.fromkeys(VIEWER_FILTERS, 0)
+    for msg in messages:
+        for name in message_filters(msg):
+            counts[name] += 1
+    return counts
+
+
+def write_shard(output_dir, name, data):
+    """Write one shard file atomically."""
+    tmp_path = output_dir / f'{name}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, output_dir / name)
+
+
+def remove_stale_shards(output_dir, keep):
+    """Delete shards left over from an earlier, longer conversion."""
+    for pattern in ('messages-*.json', 'timeline-*.json'):
+        for path in output_dir.glob(pattern):
+            if path.name not in keep:
+                path.unlink()
+
+
+def write_json_shards(input_path, output_dir, include_content=True, redactor=None, shard_size=DEFAULT_SHARD_SIZE):
+    """Convert a log into a directory of shards and a manifest, with constant memory.
+
+    Each message shard holds `shard_size` messages together with their file
+    operations; timeline shards hold `shard_size` events in log order. The
+    manifest carries metadata, session_stats, summary and an index of all pages
+    with per-filter counts, so a viewer can skip pages a filter does not need.
+    It is written last, once every shard it lists is in place.
+    Returns (message_count, file_operation_count, stats).
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stats = new_session_stats()
+    progress = {'lines': 0}
+    message_id = 0
+    file_operation_count = 0
+    timeline_count = 0
+    pages = []
+    timeline_pages = []
+    messages, file_operations, timeline = [], [], []
+
+    def flush_messages():
+        name = f'messages-{len(pages):05d}.json'
+        write_shard(output_dir, name, {'messages': messages, 'file_operations': file_operations})
+        pages.append({
+            'file': name,
+            'first_id': messages[0]['id'],
+            'last_id': messages[-1]['id'],
+            'message_count': len(messages),
+            'file_operation_count': len(file_operations),
+            'start_time': messages[0]['timestamp'],
+            'end_time': messages[-1]['timestamp'],
+            'counts': page_counts(messages)
+        })
+
+    def flush_timeline():
+        name = f'timeline-{len(timeline_pages):05d}.json'
+        write_shard(output_dir, name, {'timeline': timeline})
+        timeline_pages.append({'file': name, 'event_count': len(timeline)})
+
+    with open(input_path, 'rb') as src:
+        for record in iter_records(src, progress):
+            update_session_stats(stats, record)
+
+            if isinstance(record, MalformedLine):
+                print(f"Error processing line {record.line_number}: {record.error}")
+                continue
+
+            try:
+                message_id += 1
+                msg, file_ops, events = build_message_entries(record, message_id, include_content, redactor)
+            except Exception as e:
+                print(f"Error processing line {record.line_number}: {e}")
+                continue
+
+            messages.append(msg)
+            file_operations.extend(file_ops)
+            file_operation_count += len(file_ops)
+            timeline.extend(events)
+            timeline_count += len(events)
+
+            if len(messages) >= shard_size:
+                flush_messages()
+                messages, file_operations = [], []
+            if len(timeline) >= shard_size:
+                flush_timeline()
+                timeline = []
+
+    if messages:
+        flush_messages()
+    if timeline:
+        flush_timeline()
+
+    stats = finalize_session_stats(stats)
+    manifest = build_stream_tail(input_path, progress['lines'], include_content, stats, message_id, file_operation_count)
+    if redactor:
+        manifest = apply_secret_replacements_to_dict(manifest, redactor)
+    manifest = {
+        'format': SHARD_FORMAT,
+        'version': SHARD_FORMAT_VERSION,
+        **manifest,
+        'shard_size': shard_size,
+        'pages': pages,
+        'timeline_pages': timeline_pages
+    }
+
+    write_shard(output_dir, MANIFEST_NAME, manifest)
+    remove_stale_shards(output_dir, {page['file'] for page in pages + timeline_pages})
+
+    return message_id, file_operation_count, stats
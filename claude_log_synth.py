@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Claude Log Synthetic Sessions
+Generates realistic Claude JSONL logs of any size for benchmarks, deterministic for a given seed.
+"""
+
+import argparse
+import json
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Default share of each kind of content; every ratio is a probability per turn or per tool call
+DEFAULT_MIX = {
+    'tool_ratio': 0.6,        # turns where the assistant calls a tool rather than only answering
+    'sidechain_ratio': 0.03,  # tool calls that start a sub-agent (Task) running in a sidechain
+    'write_ratio': 0.005,     # tool calls that are a huge Write of a file
+    'write_size': 100_000,    # bytes in a huge Write
+    'malformed_ratio': 0.001  # lines that are truncated JSON
+}
+
+# Planted in message text so the secret redaction paths have something to replace
+SECRETS = {
+    'sk-synthetic-4f9c2a7be81d': '[API_KEY]',
+    'ghp_SyntheticToken0123456789': '[GITHUB_TOKEN]',
+    'synthetic-db-password': '[DB_PASSWORD]',
+    '/home/synthetic-user': '/home/user'
+}
+
+WORDS = (
+    'the a to of and in is that for it with on this be as file function test we should '
+    'update fix add check error value return config parser message session output line '
+    'data json markdown stream record tool result stats cache index path build run '
+    'handle case list dict string type import module class method field option default'
+).split()
+
+LANGUAGES = (('py', 'python'), ('js', 'javascript'), ('ts', 'typescript'), ('md', 'markdown'),
+             ('json', 'json'), ('go', 'go'), ('rs', 'rust'), ('html', 'html'))
+
+MODELS = ('claude-sonnet-4-20250514', 'claude-opus-4-20250514', 'claude-3-5-haiku-20241022')
+
+
+class SessionGenerator:
+    """Writes one synthetic session, with a uuid/parentUuid chain like real logs.
+
+    A turn is a user prompt followed by assistant text and, with the mix's
+    probabilities, tool calls (each a tool_use line and a tool_result line),
+    a sub-agent whose lines run in a sidechain, or a large Write that later
+    turns rewrite with small changes.
+    """
+
+    def __init__(self, mix=None, seed=0):
+        self.mix = dict(DEFAULT_MIX, **(mix or {}))
+        self.rng = random.Random(seed)
+        self.session_id = str(self.new_uuid())
+        self.time = datetime(2025, 7, 20, 10, 0, tzinfo=timezone.utc)
+        self.parent = None
+        self.sidechain = False
+        self.message_number = 0
+        self.tool_number = 0
+        self.files = [f'/home/synthetic-user/project/src/module_{i}.{ext}'
+                      for i, (ext, _) in enumerate(self.rng.choices(LANGUAGES, k=40))]
+        # Large files that huge Writes keep rewriting, with their last content
+        self.large_files = {}
+
+    def new_uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def words(self, count):
+        return ' '.join(self.rng.choices(WORDS, k=count))
+
+    def sentence(self, low=6, high=30):
+        text = self.words(self.rng.randint(low, high)).capitalize() + '.'
+        if self.rng.random() < 0.05:
+            text += ' Using ' + self.rng.choice(list(SECRETS)) + ' here.'
+        return text
+
+    def paragraph(self, sentences=3):
+        return ' '.join(self.sentence() for _ in range(sentences))
+
+    def code(self, lines):
+        return ''.join(f'    {self.words(self.rng.randint(2, 10))}  # line {i}\n' for i in range(lines))
+
+    def tick(self, low=0.05, high=5.0):
+        self.time += timedelta(seconds=self.rng.uniform(low, high))
+        return self.time.strftime('%Y-%m-%dT%H:%M:%S.') + f'{self.time.microsecond // 1000:03d}Z'
+
+    def entry(self, kind, message, **extra):
+        key = str(self.new_uuid())
+        line = {
+            'parentUuid': self.parent,
+            'isSidechain': self.sidechain,
+            'userType': 'external',
+            'cwd': '/home/synthetic-user/project',
+            'sessionId': self.session_id,
+            'version': '1.0.56',
+            'type': kind,
+            'message': message,
+            'uuid': key,
+            'timestamp': self.tick()
+        }
+        line.update(extra)
+        self.parent = key
+        return line
+
+    def usage(self):
+        return {
+            'input_tokens': self.rng.randint(4, 400),
+            'cache_creation_input_tokens': self.rng.randint(0, 5000),
+            'cache_read_input_tokens': self.rng.randint(0, 60000),
+            'output_tokens': self.rng.randint(20, 2000),
+            'service_tier': 'standard'
+        }
+
+    def assistant(self, blocks, model):
+        """Lines of one API response; like real logs, each content block is its own line."""
+        self.message_number += 1
+        message_id = f'msg_synthetic{self.message_number:08d}'
+        usage = self.usage()
+        for block in blocks:
+            yield self.entry('assistant', {
+                'id': message_id,
+                'type': 'message',
+                'role': 'assistant',
+                'model': model,
+                'content': [block],
+                'stop_reason': None,
+                'usage': usage
+            }, requestId=f'req_synthetic{self.message_number:08d}')
+
+    def user(self, content, **extra):
+        return self.entry('user', {'role': 'user', 'content': content}, **extra)
+
+    def tool_call(self):
+        """Return a tool_use block and the (result text, toolUseResult) it produces."""
+        self.tool_number += 1
+        tool_id = f'toolu_synthetic{self.tool_number:08d}'
+        path = self.rng.choice(self.files)
+        roll = self.rng.random()
+
+        if roll < self.mix['write_ratio']:
+            return self.large_write(tool_id)
+        if roll < 0.35:
+            content = self.code(self.rng.randint(10, 120))
+            numbered = ''.join(f'{i + 1:>6}\t{line}\n' for i, line in enumerate(content.splitlines()))
+            return ({'type': 'tool_use', 'id': tool_id, 'name': 'Read', 'input': {'file_path': path}},
+                    numbered, {'type': 'text', 'file': {'filePath': path, 'content': content}})
+        if roll < 0.55:
+            old, new = self.words(8), self.words(10)
+            return ({'type': 'tool_use', 'id': tool_id, 'name': 'Edit',
+                     'input': {'file_path': path, 'old_string': old, 'new_string': new}},
+                    f'The file {path} has been updated.',
+                    {'filePath': path, 'oldString': old, 'newString': new, 'replaceAll': False})
+        if roll < 0.62:
+            edits = [{'old_string': self.words(6), 'new_string': self.words(7)}
+                     for _ in range(self.rng.randint(2, 5))]
+            return ({'type': 'tool_use', 'id': tool_id, 'name': 'MultiEdit',
+                     'input': {'file_path': path, 'edits': edits}},
+                    f'Applied {len(edits)} edits to {path}', {'filePath': path, 'edits': edits})
+        if roll < 0.67:
+            content = self.code(self.rng.randint(10, 80))
+            return ({'type': 'tool_use', 'id': tool_id, 'name': 'Write',
+                     'input': {'file_path': path, 'content': content}},
+                    f'File created successfully at: {path}', {'type': 'create', 'filePath': path, 'content': content})
+        if roll < 0.72:
+            todos = [{'content': self.sentence(3, 8), 'status': self.rng.choice(('pending', 'in_progress', 'completed')),
+                      'priority': self.rng.choice(('high', 'medium', 'low')), 'id': str(i)}
+                     for i in range(self.rng.randint(2, 8))]
+            return ({'type': 'tool_use', 'id': tool_id, 'name': 'TodoWrite', 'input': {'todos': todos}},
+                    'Todos have been modified successfully.', {'oldTodos': [], 'newTodos': todos})
+        if roll < 0.85:
+            output = '\n'.join(f'{self.rng.choice(self.files)}:{self.rng.randint(1, 500)}: {self.words(8)}'
+                               for _ in range(self.rng.randint(1, 30)))
+            pattern = self.rng.choice(WORDS)
+            return ({'type': 'tool_use', 'id': tool_id, 'name': 'Grep', 'input': {'pattern': pattern, 'path': '.'}},
+                    output, {'mode': 'content', 'numFiles': 3, 'content': output})
+        stdout = '\n'.join(self.words(self.rng.randint(3, 14)) for _ in range(self.rng.randint(1, 60)))
+        return ({'type': 'tool_use', 'id': tool_id, 'name': 'Bash',
+                 'input': {'command': f'python -m pytest -q {path}', 'description': 'Run tests'}},
+                stdout, {'stdout': stdout, 'stderr': '', 'interrupted': False, 'isImage': False})
+
+    def large_write(self, tool_id):
+        """A huge Write; rewrites of the same file change a few lines, like an agent iterating."""
+        if self.large_files and self.rng.random() < 0.7:
+            path = self.rng.choice(list(self.large_files))
+            lines = self.large_files[path].splitlines(keepends=True)
+            for _ in range(self.rng.randint(1, 10)):
+                lines[self.rng.randrange(len(lines))] = f'    {self.words(6)}  # changed\n'
+            content = ''.join(lines)
+        else:
+            path = f'/home/synthetic-user/project/generated/large_{len(self.large_files)}.py'
+            content = self.code(max(1, self.mix['write_size'] // 50))
+        self.large_files[path] = content
+        return ({'type': 'tool_use', 'id': tool_id, 'name': 'Write', 'input': {'file_path': path, 'content': content}},
+                f'File created successfully at: {path}', {'type': 'update', 'filePath': path, 'content': content})
+
+    def exchange(self, model):
+        """Lines of one tool call and its result."""
+        block, result_text, tool_result = self.tool_call()
+        yield from self.assistant([block], model)
+        yield self.user([{'tool_use_id': block['id'], 'type': 'tool_result', 'content': result_text}],
+                        toolUseResult=tool_result)
+
+    def sub_agent(self, model):
+        """A Task call whose sub-agent runs in a sidechain, then its result in the main session."""
+        self.tool_number += 1
+        tool_id = f'toolu_synthetic{self.tool_number:08d}'
+        prompt = self.paragraph(2)
+        yield from self.assistant([{'type': 'tool_use', 'id': tool_id, 'name': 'Task',
+                                    'input': {'description': self.words(4), 'prompt': prompt}}], model)
+        main_parent = self.parent
+        self.parent, self.sidechain = None, True
+        yield self.user(prompt)
+        for _ in range(self.rng.randint(1, 8)):
+            yield from self.exchange(model)
+        report = self.paragraph(4)
+        yield from self.assistant([{'type': 'text', 'text': report}], model)
+        self.parent, self.sidechain = main_parent, False
+        yield self.user([{'tool_use_id': tool_id, 'type': 'tool_result', 'content': [{'type': 'text', 'text': report}]}],
+                        toolUseResult={'content': [{'type': 'text', 'text': report}], 'totalDurationMs': 45000})
+
+    def turn(self):
+        """Lines of one user prompt and everything the assistant does to answer it."""
+        model = self.rng.choice(MODELS)
+        if self.rng.random() < 0.1:
+            yield self.user('<command-name>/clear</command-name>', isMeta=True)
+        yield self.user(self.paragraph(self.rng.randint(1, 4)))
+        yield from self.assistant([{'type': 'text', 'text': self.paragraph(self.rng.randint(1, 3))}], model)
+        while self.rng.random() < self.mix['tool_ratio']:
+            if self.rng.random() < self.mix['sidechain_ratio']:
+                yield from self.sub_agent(model)
+            else:
+                yield from self.exchange(model)
+        yield from self.assistant([{'type': 'text', 'text': self.paragraph(self.rng.randint(1, 5))}], model)
+
+    def lines(self):
+        """Yield JSONL lines forever."""
+        yield json.dumps({'type': 'summary', 'summary': 'Synthetic benchmark session',
+                          'leafUuid': str(self.new_uuid())}) + '\n'
+        while True:
+            for entry in self.turn():
+                line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+                if self.rng.random() < self.mix['malformed_ratio']:
+                    # A line cut off mid-write, as left by an interrupted session
+                    line = line[:self.rng.randint(1, len(line) - 1)]
+                yield line + '\n'
+
+
+def generate_session(output_path, line_count, mix=None, seed=0):
+    """Write a synthetic log of exactly line_count lines and return its size in bytes."""
+    generator = SessionGenerator(mix, seed)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for number, line in enumerate(generator.lines(), 1):
+            f.write(line)
+            if number >= line_count:
+                break
+    return Path(output_path).stat().st_size
+
+
+def write_secrets_file(path):
+    """Write a secrets file listing the secrets planted in synthetic sessions."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for secret, replacement in SECRETS.items():
+            f.write(f'{secret}={replacement}\n')
+
+
+def parse_count(text):
+    """Parse a line count such as 1000, 10k or 1M."""
+    text = text.strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def add_mix_arguments(parser):
+    """Add the options controlling a synthetic session's content mix."""
+    parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same log (default: 0)')
+    parser.add_argument('--tool-ratio', type=float, default=DEFAULT_MIX['tool_ratio'],
+                        help=f"Chance the assistant calls another tool in a turn (default: {DEFAULT_MIX['tool_ratio']})")
+    parser.add_argument('--sidechain-ratio', type=float, default=DEFAULT_MIX['sidechain_ratio'],
+                        help=f"Chance a tool call starts a sub-agent sidechain (default: {DEFAULT_MIX['sidechain_ratio']})")
+    parser.add_argument('--write-ratio', type=float, default=DEFAULT_MIX['write_ratio'],
+                        help=f"Chance a tool call is a huge Write (default: {DEFAULT_MIX['write_ratio']})")
+    parser.add_argument('--write-size', type=int, default=DEFAULT_MIX['write_size'], metavar='BYTES',
+                        help=f"Size of a huge Write (default: {DEFAULT_MIX['write_size']})")
+    parser.add_argument('--malformed-ratio', type=float, default=DEFAULT_MIX['malformed_ratio'],
+                        help=f"Share of truncated, malformed lines (default: {DEFAULT_MIX['malformed_ratio']})")
+
+
+def mix_from_args(args):
+    return {name: getattr(args, name) for name in DEFAULT_MIX}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Claude JSONL log for benchmarks')
+    parser.add_argument('lines', type=parse_count, help='Number of lines, e.g. 1000, 100k or 1M')
+    parser.add_argument('-o', '--output', help='Output JSONL file (default: synthetic-<lines>.jsonl)')
+    parser.add_argument('--secrets-file', metavar='PATH', help='Also write a secrets file for the planted secrets')
+    add_mix_arguments(parser)
+
+    args = parser.parse_args()
+    output = args.output or f'synthetic-{args.lines}.jsonl'
+
+    try:
+        size = generate_session(output, args.lines, mix_from_args(args), args.seed)
+    except Exception as e:
+        print(f"Error generating {output}: {e}")
+        sys.exit(1)
+    print(f"Wrote {args.lines} lines ({size / 1024 / 1024:.1f} MB) to {output}")
+
+    if args.secrets_file:
+        write_secrets_file(args.secrets_file)
+        print(f"Wrote {len(SECRETS)} secrets to {args.secrets_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,10 +6,25 @@ Converts Claude JSONL logs to simplified JSON format for interactive visualizati
 
 import json
 import argparse
+import shutil
+import tempfile
 from datetime import datetime
 from pathlib import Path
 import sys
 
+from claude_log_batch import is_batch_request, plan_batch, run_batch
+from claude_log_cache import add_cache_arguments, cache_config_from_args, cached_convert
+from claude_log_deltas import DeltaEncoder
+from claude_log_latency import merge_tool_latency, new_tool_latency, summarize_tool_latency, update_tool_latency
+from claude_log_output import gzip_suffix, open_output
+from claude_log_parser import MalformedLine, extract_text_content, iter_records
+from claude_log_profile import add_profile_arguments, profiling_requested, run_profiled
+from claude_log_secrets import (
+    add_secrets_argument, apply_secret_replacements_to_dict, print_detection_report, redactor_from_args
+)
+from claude_log_tree import merge_tree_stats, new_tree_stats, summarize_tree_stats, update_tree_stats
+from claude_log_usage import merge_usage_stats, new_usage_stats, summarize_usage_stats, update_usage_stats
+
 
 def extract_file_operations(content):
     """Extract file operation details from message content."""
@@ -106,23 +121,6 @@ def get_language_from_filename(filename):
     return lang_map.get(ext, 'text')
 
 
-def extract_text_content(content):
-    """Extract plain text from message content."""
-    if isinstance(content, str):
-        return content
-    elif isinstance(content, list):
-        text_parts = []
-        for part in content:
-            if isinstance(part, dict):
-                if part.get('type') == 'text':
-                    text_parts.append(part.get('text', ''))
-            else:
-                text_parts.append(str(part))
-        return '\n'.join(text_parts)
-    else:
-        return str(content)
-
-
 def is_user_interruption(content):
     """Check if content contains user interruption."""
     text = extract_text_content(content)
@@ -130,9 +128,17 @@ def is_user_interruption(content):
             "[Request interrupted by user for tool use]" in text)
 
 
-def calculate_session_stats(lines):
-    """Calculate session statistics."""
-    stats = {
+COUNTED_STATS = ('total_messages', 'user_messages', 'assistant_messages', 'file_operations',
+                 'estimated_input_tokens', 'estimated_output_tokens', 'estimated_total_tokens')
+
+
+def new_session_stats(partial=False):
+    """Create an empty running session statistics accumulator.
+    
+    A partial accumulator covers one byte range of a log and is combined with
+    the others by merge_session_stats (see claude_log_parallel).
+    """
+    return {
         'total_messages': 0,
         'user_messages': 0,
         'assistant_messages': 0,
@@ -144,63 +150,93 @@ def calculate_session_stats(lines):
         'estimated_output_tokens': 0,
         'estimated_total_tokens': 0,
         'files_modified': set(),
-        'programming_languages': set()
+        'programming_languages': set(),
+        'tool_latency': new_tool_latency(partial),
+        'usage': new_usage_stats(partial),
+        'conversation_tree': new_tree_stats(partial)
     }
+
+
+def update_session_stats(stats, record):
+    """Add a single parsed record to running session statistics and return its conversation thread.
     
-    for line in lines:
-        try:
-            data = json.loads(line.strip())
-            
-            if data.get('isMeta') or 'message' not in data:
-                continue
-                
-            message = data['message']
-            content = message.get('content', '')
-            
-            if not content:
-                continue
-                
-            # Track timestamps
-            timestamp = data.get('timestamp')
-            if timestamp:
-                if stats['start_time'] is None:
-                    stats['start_time'] = timestamp
-                stats['end_time'] = timestamp
-            
-            # Count messages and estimate tokens
-            role = message.get('role', '')
-            message_tokens = len(extract_text_content(content)) // 3
-            
-            if isinstance(content, list):
-                for part in content:
-                    if isinstance(part, dict):
-                        if part.get('type') == 'tool_use':
-                            tool_input = part.get('input', {})
-                            message_tokens += len(json.dumps(tool_input)) // 3
-                        elif part.get('type') == 'tool_result':
-                            result_content = str(part.get('content', ''))
-                            message_tokens += len(result_content) // 3
+    The thread is None for malformed lines and in partial accumulators.
+    """
+    if isinstance(record, MalformedLine):
+        return None
+    
+    thread = None
+    try:
+        thread = update_tree_stats(stats['conversation_tree'], record)
+        # Pair tool calls with their results
+        update_tool_latency(stats['tool_latency'], record)
+        update_usage_stats(stats['usage'], record, thread)
+        
+        # Track timestamps
+        timestamp = record.timestamp
+        if timestamp:
+            if stats['start_time'] is None:
+                stats['start_time'] = timestamp
+            stats['end_time'] = timestamp
+        
+        # Count messages and estimate tokens
+        role = record.role
+        message_tokens = len(record.text) // 3
+        
+        for part in record.tool_uses:
+            tool_input = part.get('input', {})
+            message_tokens += len(json.dumps(tool_input)) // 3
+        for part in record.tool_results:
+            result_content = str(part.get('content', ''))
+            message_tokens += len(result_content) // 3
+        
+        if role == 'user':
+            stats['user_messages'] += 1
+            stats['estimated_input_tokens'] += message_tokens
+        elif role == 'assistant':
+            stats['assistant_messages'] += 1
+            stats['estimated_output_tokens'] += message_tokens
             
-            if role == 'user':
-                stats['user_messages'] += 1
-                stats['estimated_input_tokens'] += message_tokens
-            elif role == 'assistant':
-                stats['assistant_messages'] += 1
-                stats['estimated_output_tokens'] += message_tokens
+        stats['total_messages'] += 1
+        stats['estimated_total_tokens'] += int(message_tokens * 1.2)
+        
+        # Track file operations
+        file_ops = extract_file_operations(record.content)
+        for op in file_ops:
+            stats['file_operations'] += 1
+            if op['file_name']:
+                stats['files_modified'].add(op['file_name'])
+                stats['programming_languages'].add(op.get('language', 'text'))
                 
-            stats['total_messages'] += 1
-            stats['estimated_total_tokens'] += int(message_tokens * 1.2)
-            
-            # Track file operations
-            file_ops = extract_file_operations(content)
-            for op in file_ops:
-                stats['file_operations'] += 1
-                if op['file_name']:
-                    stats['files_modified'].add(op['file_name'])
-                    stats['programming_languages'].add(op.get('language', 'text'))
-                    
-        except:
-            continue
+    except:
+        pass
+    return thread
+
+
+def merge_session_stats(stats, partial, line_offset=0):
+    """Merge the accumulator of the next range of a log into stats, in place.
+    
+    Ranges must be merged in log order; line_offset is the number of lines
+    before the partial's range, whose line numbers start at 1.
+    """
+    for key in COUNTED_STATS:
+        stats[key] += partial[key]
+    if stats['start_time'] is None:
+        stats['start_time'] = partial['start_time']
+    if partial['end_time'] is not None:
+        stats['end_time'] = partial['end_time']
+    stats['files_modified'] |= partial['files_modified']
+    stats['programming_languages'] |= partial['programming_languages']
+    merge_tool_latency(stats['tool_latency'], partial['tool_latency'], line_offset)
+    # Usage pairs prompts and responses per thread, so the tree is merged first
+    threads = merge_tree_stats(stats['conversation_tree'], partial['conversation_tree'], line_offset)
+    merge_usage_stats(stats['usage'], partial['usage'], line_offset, threads)
+    return stats
+
+
+def finalize_session_stats(stats):
+    """Return JSON-ready session statistics from a running accumulator."""
+    stats = dict(stats)
     
     # Calculate duration
     if stats['start_time'] and stats['end_time']:
@@ -214,140 +250,306 @@ def calculate_session_stats(lines):
     # Convert sets to lists for JSON serialization
     stats['files_modified'] = list(stats['files_modified'])
     stats['programming_languages'] = list(stats['programming_languages'])
+    stats['tool_latency'] = summarize_tool_latency(stats['tool_latency'])
+    stats['usage'] = summarize_usage_stats(stats['usage'])
+    stats['conversation_tree'] = summarize_tree_stats(stats['conversation_tree'])
     
     return stats
 
 
-def convert_log_to_json(jsonl_file, output_file=None, include_content=True):
-    """Convert JSONL log file to simplified JSON format."""
-    input_path = Path(jsonl_file)
+def calculate_session_stats(records):
+    """Calculate session statistics."""
+    stats = new_session_stats()
+    for record in records:
+        update_session_stats(stats, record)
+    return finalize_session_stats(stats)
+
+
+def build_message_entries(record, message_id, include_content=True, redactor=None, deltas=None):
+    """Build the message object, file operations and timeline events for one record.
     
-    if not input_path.exists():
-        print(f"Error: File {jsonl_file} not found")
-        return False
+    With a redactor, secrets are replaced in the text and file operations before
+    anything derived from them (previews, timeline summaries) is built. With a
+    DeltaEncoder, later Writes of a file are stored as deltas (claude_log_deltas).
+    """
+    timestamp = record.timestamp
+    is_sidechain = record.is_sidechain
+    text = record.text
     
-    if output_file is None:
-        output_file = input_path.with_suffix('.json')
+    # Extract file operations
+    file_ops = extract_file_operations(record.content)
     
-    output_path = Path(output_file)
+    if redactor:
+        text = redactor.redact(text)
+        file_ops = apply_secret_replacements_to_dict(file_ops, redactor)
     
-    try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+    content_preview = text[:200] + ('...' if len(text) > 200 else '')
+    
+    # Create message object
+    msg = {
+        'id': message_id,
+        'line_number': record.line_number,
+        'timestamp': timestamp,
+        'role': record.role,
+        'is_sidechain': is_sidechain,
+        'is_interruption': is_user_interruption(text),
+        'has_file_operations': len(file_ops) > 0,
+        'file_operation_count': len(file_ops),
+        'content_length': len(text),
+        'estimated_tokens': len(text) // 3
+    }
+    
+    # Optionally include full content
+    if include_content:
+        msg['content'] = text
+    msg['content_preview'] = content_preview
+    
+    # Add to timeline
+    timeline = [{
+        'message_id': message_id,
+        'timestamp': timestamp,
+        'type': 'message',
+        'role': record.role,
+        'is_sidechain': is_sidechain,
+        'summary': content_preview
+    }]
+    
+    # Process file operations
+    for op in file_ops:
+        op['message_id'] = message_id
+        op['timestamp'] = timestamp
+        op['is_sidechain'] = is_sidechain
+        if deltas:
+            deltas.encode(op)
         
-        # Calculate session statistics
-        stats = calculate_session_stats(lines)
+        # Add file operation to timeline
+        timeline.append({
+            'message_id': message_id,
+            'timestamp': timestamp,
+            'type': 'file_operation',
+            'operation_type': op['type'],
+            'file_name': op['file_name'],
+            'summary': f"{op['type'].title()}: {op['file_name']}"
+        })
+    
+    return msg, file_ops, timeline
+
+
+def build_json_document(input_path, records, total_lines, stats, include_content=True, redactor=None,
+                        write_deltas=False):
+    """Build the JSON document of fully parsed records, given their finalized (and redacted) statistics."""
+    messages = []
+    timeline = []
+    file_operations = []
+    message_id = 0
+    deltas = DeltaEncoder() if write_deltas else None
+    
+    for record in records:
+        if isinstance(record, MalformedLine):
+            print(f"Error processing line {record.line_number}: {record.error}")
+            continue
         
-        # Process messages
-        messages = []
-        timeline = []
-        file_operations = []
-        message_id = 0
+        try:
+            message_id += 1
+            msg, file_ops, events = build_message_entries(record, message_id, include_content, redactor, deltas)
+            messages.append(msg)
+            file_operations.extend(file_ops)
+            timeline.extend(events)
+        except Exception as e:
+            print(f"Error processing line {record.line_number}: {e}")
+            continue
+    
+    # Create final JSON structure
+    result = {
+        'metadata': {
+            'source_file': redactor.redact(input_path.name) if redactor else input_path.name,
+            'generated_at': datetime.now().isoformat(),
+            'total_lines_processed': total_lines,
+            'include_full_content': include_content
+        },
+        'session_stats': stats,
+        'messages': messages,
+        'file_operations': file_operations,
+        'timeline': sorted(timeline, key=lambda x: x.get('timestamp', '')),
+        'summary': build_summary(stats, len(messages), len(file_operations))
+    }
+    if write_deltas:
+        result['metadata']['write_deltas'] = True
+    return result
+
+
+def build_summary(stats, message_count, file_operation_count):
+    """Build the summary section of the JSON output."""
+    return {
+        'message_count': message_count,
+        'file_operation_count': file_operation_count,
+        'unique_files': len(stats['files_modified']),
+        'programming_languages': stats['programming_languages'],
+        'session_duration_formatted': format_duration(stats['session_duration_seconds'])
+    }
+
+
+def write_array_item(f, item, index):
+    """Write one element of a streamed JSON array, preceded by its separator."""
+    f.write(',\n    ' if index else '\n    ')
+    f.write(json.dumps(item, ensure_ascii=False))
+
+
+def build_stream_tail(input_path, total_lines, include_content, stats, message_count, file_operation_count,
+                      write_deltas=False):
+    """Build the keys written after the arrays of a streamed JSON document."""
+    metadata = {
+        'source_file': input_path.name,
+        'generated_at': datetime.now().isoformat(),
+        'total_lines_processed': total_lines,
+        'include_full_content': include_content,
+        'streamed': True
+    }
+    if write_deltas:
+        metadata['write_deltas'] = True
+    return {
+        'metadata': metadata,
+        'session_stats': stats,
+        'summary': build_summary(stats, message_count, file_operation_count)
+    }
+
+
+def finish_json_stream(f, ops_part, timeline_part, tail):
+    """Close the messages array and copy the spooled arrays and trailing keys into a streamed document."""
+    f.write('\n  ],\n  "file_operations": [')
+    shutil.copyfileobj(ops_part, f)
+    f.write('\n  ],\n  "timeline": [')
+    shutil.copyfileobj(timeline_part, f)
+    f.write('\n  ],\n')
+    # Append the trailing keys to the already open top-level object
+    f.write(json.dumps(tail, indent=2, ensure_ascii=False)[2:])
+
+
+def write_json_stream(input_path, output_path, include_content=True, redactor=None, write_deltas=False):
+    """Convert a log with constant memory, writing the output arrays incrementally.
+    
+    Lines are decoded lazily and each message is written as soon as it is built.
+    File operations and timeline events are spooled to temporary files and copied
+    after the messages, so the timeline stays in log order instead of being sorted.
+    Returns (message_count, file_operation_count, stats).
+    """
+    stats = new_session_stats()
+    deltas = DeltaEncoder() if write_deltas else None
+    progress = {'lines': 0}
+    message_id = 0
+    file_operation_count = 0
+    timeline_count = 0
+    
+    with open(input_path, 'rb') as src, \
+            open_output(output_path) as f, \
+            tempfile.TemporaryFile('w+', encoding='utf-8') as ops_spool, \
+            tempfile.TemporaryFile('w+', encoding='utf-8') as timeline_spool:
+        f.write('{\n  "messages": [')
         
-        for line_num, line in enumerate(lines):
+        for record in iter_records(src, progress):
+            update_session_stats(stats, record)
+            
+            if isinstance(record, MalformedLine):
+                print(f"Error processing line {record.line_number}: {record.error}")
+                continue
+            
             try:
-                data = json.loads(line.strip())
-                
-                # Skip meta messages
-                if data.get('isMeta') or 'message' not in data:
-                    continue
-                
-                message = data['message']
-                role = message.get('role', 'unknown')
-                content = message.get('content', '')
-                
-                if not content:
-                    continue
-                
                 message_id += 1
-                timestamp = data.get('timestamp')
-                is_sidechain = data.get('isSidechain', False)
-                
-                # Extract file operations
-                file_ops = extract_file_operations(content)
-                
-                # Create message object
-                msg = {
-                    'id': message_id,
-                    'line_number': line_num + 1,
-                    'timestamp': timestamp,
-                    'role': role,
-                    'is_sidechain': is_sidechain,
-                    'is_interruption': is_user_interruption(content),
-                    'has_file_operations': len(file_ops) > 0,
-                    'file_operation_count': len(file_ops),
-                    'content_length': len(extract_text_content(content)),
-                    'estimated_tokens': len(extract_text_content(content)) // 3
-                }
-                
-                # Optionally include full content
-                if include_content:
-                    msg['content'] = extract_text_content(content)
-                    msg['content_preview'] = extract_text_content(content)[:200] + ('...' if len(extract_text_content(content)) > 200 else '')
-                else:
-                    msg['content_preview'] = extract_text_content(content)[:200] + ('...' if len(extract_text_content(content)) > 200 else '')
-                
-                messages.append(msg)
-                
-                # Add to timeline
-                timeline_event = {
-                    'message_id': message_id,
-                    'timestamp': timestamp,
-                    'type': 'message',
-                    'role': role,
-                    'is_sidechain': is_sidechain,
-                    'summary': msg['content_preview']
-                }
-                timeline.append(timeline_event)
-                
-                # Process file operations
-                for op in file_ops:
-                    op['message_id'] = message_id
-                    op['timestamp'] = timestamp
-                    op['is_sidechain'] = is_sidechain
-                    file_operations.append(op)
-                    
-                    # Add file operation to timeline
-                    timeline.append({
-                        'message_id': message_id,
-                        'timestamp': timestamp,
-                        'type': 'file_operation',
-                        'operation_type': op['type'],
-                        'file_name': op['file_name'],
-                        'summary': f"{op['type'].title()}: {op['file_name']}"
-                    })
-                
+                msg, file_ops, timeline = build_message_entries(record, message_id, include_content, redactor, deltas)
             except Exception as e:
-                print(f"Error processing line {line_num + 1}: {e}")
+                print(f"Error processing line {record.line_number}: {e}")
                 continue
+            
+            write_array_item(f, msg, message_id - 1)
+            for op in file_ops:
+                write_array_item(ops_spool, op, file_operation_count)
+                file_operation_count += 1
+            for event in timeline:
+                write_array_item(timeline_spool, event, timeline_count)
+                timeline_count += 1
         
-        # Create final JSON structure
-        result = {
-            'metadata': {
-                'source_file': input_path.name,
-                'generated_at': datetime.now().isoformat(),
-                'total_lines_processed': len(lines),
-                'include_full_content': include_content
-            },
-            'session_stats': stats,
-            'messages': messages,
-            'file_operations': file_operations,
-            'timeline': sorted(timeline, key=lambda x: x.get('timestamp', '')),
-            'summary': {
-                'message_count': len(messages),
-                'file_operation_count': len(file_operations),
-                'unique_files': len(stats['files_modified']),
-                'programming_languages': stats['programming_languages'],
-                'session_duration_formatted': format_duration(stats['session_duration_seconds'])
-            }
-        }
-        
-        # Write JSON output
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        stats = finalize_session_stats(stats)
+        tail = build_stream_tail(input_path, progress['lines'], include_content,
+                                 stats, message_id, file_operation_count, write_deltas)
+        if redactor:
+            tail = apply_secret_replacements_to_dict(tail, redactor)
+        ops_spool.seek(0)
+        timeline_spool.seek(0)
+        finish_json_stream(f, ops_spool, timeline_spool, tail)
+    
+    return message_id, file_operation_count, stats
+
+
+def convert_log_to_json(jsonl_file, output_file=None, include_content=True, streaming=False, redactor=None,
+                        shard_size=None, compact=False, npz=False, write_deltas=False, workers=None):
+    """Convert JSONL log file to simplified JSON format.
+    
+    An optional SecretRedactor redacts every emitted string, so the output is
+    written once, already safe for sharing. With a shard_size, output_file is a
+    directory that receives a manifest and shard files for lazy loading. With
+    compact, the output is streamed in the compact format of claude_log_compact.
+    With npz, per-message metadata is exported as NumPy columns instead.
+    With write_deltas, repeated Writes of a file are stored as deltas.
+    With more than one worker, the log is split into byte ranges converted on
+    a process pool (claude_log_parallel), for single logs too big for one core.
+    """
+    input_path = Path(jsonl_file)
+    
+    if not input_path.exists():
+        print(f"Error: File {jsonl_file} not found")
+        return False
+    
+    if output_file is None:
+        output_file = input_path.with_suffix('.shards' if shard_size else '.npz' if npz else '.json')
+    
+    output_path = Path(output_file)
+    
+    try:
+        if shard_size:
+            from claude_log_shards import write_json_shards
+            
+            message_count, file_operation_count, stats = write_json_shards(
+                input_path, output_path, include_content, redactor, shard_size)
+        elif npz:
+            from claude_log_columns import write_columns
+            
+            message_count, file_operation_count, stats = write_columns(
+                input_path, output_path, include_content, redactor)
+        elif compact:
+            from claude_log_compact import write_compact_json
+            
+            message_count, file_operation_count, stats = write_compact_json(
+                input_path, output_path, include_content, redactor, write_deltas)
+        elif workers and workers > 1:
+            from claude_log_parallel import write_json_parallel
+            
+            message_count, file_operation_count, stats = write_json_parallel(
+                input_path, output_path, include_content, redactor, workers)
+        elif streaming:
+            message_count, file_operation_count, stats = write_json_stream(
+                input_path, output_path, include_content, redactor, write_deltas)
+        else:
+            with open(input_path, 'rb') as f:
+                lines = f.readlines()
+            
+            records = list(iter_records(lines))
+            
+            # Calculate session statistics
+            stats = calculate_session_stats(records)
+            if redactor:
+                stats = apply_secret_replacements_to_dict(stats, redactor)
+            
+            result = build_json_document(input_path, records, len(lines), stats, include_content, redactor, write_deltas)
+            
+            # Write JSON output
+            with open_output(output_path) as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            
+            message_count = len(result['messages'])
+            file_operation_count = len(result['file_operations'])
         
-        print(f"Successfully converted {len(messages)} messages to {output_path}")
-        print(f"- {len(file_operations)} file operations")
+        print(f"Successfully converted {message_count} messages to {output_path}")
+        print(f"- {file_operation_count} file operations")
         print(f"- {len(stats['files_modified'])} unique files modified")
         print(f"- {stats['session_duration_seconds']} seconds duration")
         
@@ -375,20 +577,95 @@ def format_duration(seconds):
 
 def main():
     parser = argparse.ArgumentParser(description='Convert Claude JSONL logs to JSON for visualization')
-    parser.add_argument('input_file', help='Path to the JSONL log file')
+    parser.add_argument('input_file', nargs='+', help='Path to the JSONL log file (or several files, directories or globs for batch mode)')
     parser.add_argument('-o', '--output', help='Output JSON file (default: input_file.json)')
     parser.add_argument('--no-content', action='store_true', help='Exclude full message content (only include previews)')
+    parser.add_argument('--stream', action='store_true', help='Constant-memory streaming mode for very large logs (timeline kept in log order)')
+    parser.add_argument('--shards', nargs='?', type=int, const=500, metavar='SIZE',
+                        help='Write a directory with a manifest and shards of SIZE messages (default: 500) that the viewer loads lazily')
+    parser.add_argument('--npz', action='store_true', help='Export per-message metadata as NumPy columns (.npz) for fleet analysis; requires numpy')
+    parser.add_argument('--gzip', action='store_true', help='Write gzip-compressed output (.json.gz); also implied by an -o path ending in .gz')
+    parser.add_argument('--compact', action='store_true', help='Write the compact format: no duplicated content, shared string table, no whitespace (streams)')
+    parser.add_argument('--write-deltas', action='store_true', help='Store repeated Writes of a file as deltas against its previous Write')
+    add_secrets_argument(parser)
+    parser.add_argument('-j', '--workers', type=int,
+                        help='Number of worker processes: batch mode converts files in parallel (default: CPU count); '
+                             'a single file is split into byte ranges converted in parallel (default: 1)')
+    parser.add_argument('--output-dir', help='Batch mode: write outputs under this directory instead of next to the inputs')
+    add_cache_arguments(parser)
+    parser.add_argument('--follow', action='store_true', help='Keep converting lines appended to live logs (files or directories)')
+    parser.add_argument('--interval', type=float, default=2.0, help='Follow mode: seconds between polls (default: 2)')
+    parser.add_argument('--once', action='store_true', help='Follow mode: process new lines once and exit')
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
+    cache = cache_config_from_args(args)
+    redactor = redactor_from_args(args)
+    profile = profiling_requested(args)
+    
+    if args.shards is not None and args.shards < 1:
+        parser.error('--shards SIZE must be at least 1')
+    if args.shards and (cache or args.follow):
+        parser.error('--shards cannot be combined with --cache or --follow')
+    if args.compact and (args.shards or args.follow):
+        parser.error('--compact cannot be combined with --shards or --follow')
+    if args.gzip and args.shards:
+        parser.error('--gzip cannot be combined with --shards')
+    if args.npz and (args.shards or args.compact or args.gzip or args.follow):
+        parser.error('--npz cannot be combined with --shards, --compact, --gzip or --follow')
+    if args.write_deltas and (args.shards or args.npz or args.follow):
+        parser.error('--write-deltas cannot be combined with --shards, --npz or --follow')
+    parallel = bool(args.workers and args.workers > 1 and not is_batch_request(args.input_file))
+    if parallel and (args.stream or args.shards or args.npz or args.compact or args.write_deltas or args.follow):
+        parser.error('-j on a single file cannot be combined with --stream, --shards, --npz, --compact, '
+                     '--write-deltas or --follow')
+    if profile and (cache or args.follow or parallel or is_batch_request(args.input_file)):
+        parser.error('--profile only applies to a single input file without --cache, --follow or -j')
     
     include_content = not args.no_content
-    success = convert_log_to_json(args.input_file, args.output, include_content)
+    if args.follow:
+        from claude_log_follow import follow_logs
+        
+        if args.output and is_batch_request(args.input_file):
+            parser.error('-o/--output only applies to a single input file; use --output-dir with directories')
+        success = follow_logs(args.input_file, args.output, args.output_dir, include_content,
+                              args.interval, args.once, redactor, args.gzip)
+        sys.exit(0 if success else 1)
+    
+    options = {'include_content': include_content, 'streaming': args.stream, 'redactor': redactor,
+               'shard_size': args.shards, 'compact': args.compact, 'npz': args.npz,
+               'write_deltas': args.write_deltas}
+    if parallel:
+        options['workers'] = args.workers
+    if args.shards:
+        suffix = '.shards'
+    elif args.npz:
+        suffix = '.npz'
+    else:
+        suffix = gzip_suffix('.json', args.gzip)
+    if profile:
+        output_file = args.output or Path(args.input_file[0]).with_suffix(suffix)
+        success = run_profiled(convert_log_to_json, args.input_file[0], output_file, args, **options)
+    elif is_batch_request(args.input_file):
+        if args.output:
+            parser.error('-o/--output only applies to a single input file; use --output-dir in batch mode')
+        jobs = plan_batch(args.input_file, suffix, args.output_dir)
+        success = run_batch(convert_log_to_json, jobs, args.workers, cache, **options)
+    elif cache:
+        output_file = args.output or Path(args.input_file[0]).with_suffix(suffix)
+        success = cached_convert(convert_log_to_json, args.input_file[0], output_file, options, cache)
+    else:
+        output_file = args.output or Path(args.input_file[0]).with_suffix(suffix)
+        success = convert_log_to_json(args.input_file[0], output_file, **options)
+        if success and not parallel:
+            # Workers of a parallel conversion count their detections in their own processes
+            print_detection_report(redactor)
     
-    if success:
-        print("\nTip: Use process_json_with_secrets.py to apply secret replacements for safe sharing")
+    if success and not redactor:
+        print("\nTip: Use --secrets to apply secret replacements for safe sharing")
     
     sys.exit(0 if success else 1)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Claude Log Conversation Tree
+Indexes the uuid/parentUuid links of a log into threads: main session, sidechains and forks.
+"""
+
+# Thread kinds
+MAIN = 'main'
+SIDECHAIN = 'sidechain'
+FORK = 'fork'
+
+# Positions in a thread entry: [kind, is_sidechain, origin thread, message count]
+THREAD_KIND, THREAD_SIDECHAIN, THREAD_ORIGIN, THREAD_MESSAGES = range(4)
+# Positions in a node entry: [thread, child count, depth, roles of its children as a bit mask]
+NODE_THREAD, NODE_CHILDREN, NODE_DEPTH, NODE_CHILD_ROLES = range(4)
+# Children that carry tool results stay in their parent's thread; they are never a retry
+TOOL_RESULT = 'tool_result'
+ROLE_BITS = {'user': 1, 'assistant': 2}
+OTHER_ROLE_BIT = 4
+# Uuids a parent is looked up in; a parent further back is relinked like an unknown one.
+# Two generations of this size are kept, so memory does not grow with the session.
+NODE_WINDOW = 10000
+
+
+def new_tree_stats(partial=False):
+    """Create an empty conversation tree accumulator.
+
+    `nodes` maps the uuids of recent messages to their thread, child count,
+    depth and children's roles; when it holds NODE_WINDOW of them it becomes
+    `old_nodes` and a new generation starts. `threads` lists the threads in the
+    order they start. Everything is a JSON type so follow-mode checkpoints can
+    store it. Threads depend on every earlier message, so a partial
+    accumulator, for one range of a log, only collects the range's links;
+    merge_tree_stats places them in order and returns each line's thread.
+    """
+    tree = {
+        'nodes': {},
+        'old_nodes': {},
+        'threads': [],
+        'last': None,
+        'max_depth': 0,
+        'orphans': 0,
+        'without_uuid': 0
+    }
+    if partial:
+        tree['links'] = []
+    return tree
+
+
+def start_thread(tree, kind, is_sidechain, origin=None):
+    tree['threads'].append([kind, is_sidechain, origin, 0])
+    return len(tree['threads']) - 1
+
+
+def tree_role(record):
+    """Return the role a record is placed in the tree with; user lines carrying tool results are TOOL_RESULT."""
+    if record.role == 'user' and record.tool_results:
+        return TOOL_RESULT
+    return record.role
+
+
+def update_tree_stats(tree, record):
+    """Place one record in the tree and return its thread (None in a partial accumulator).
+
+    A record continues its parent's thread unless the parent already has a
+    child with the same role (a fork: a retry or an edited prompt; parallel
+    tool calls and their results are not forks) or it crosses between
+    the main session and a sidechain. A main-session record following a
+    sidechain rejoins the thread the sidechain branched from. Records without
+    a uuid, from older logs, are chained to the previous record as a flat list.
+    A parent the tree does not know is usually a meta line the parser skips,
+    whose own parent is the record before it, so the record is linked to that one.
+    """
+    links = tree.get('links')
+    if links is not None:
+        links.append([record.uuid, record.parent_uuid, bool(record.is_sidechain), record.line_number,
+                      tree_role(record)])
+        return None
+    return add_tree_node(tree, record.uuid, record.parent_uuid, record.is_sidechain, record.line_number,
+                         tree_role(record))
+
+
+def find_node(tree, key):
+    node = tree['nodes'].get(key)
+    return tree['old_nodes'].get(key) if node is None else node
+
+
+def add_tree_node(tree, key, parent, is_sidechain, line_number, role=None):
+    """Place one message, given by its links, in the tree and return its thread; see update_tree_stats."""
+    previous = tree['last']
+    if not key:
+        tree['without_uuid'] += 1
+        key = f'line:{line_number}'
+        parent = previous
+    tree['last'] = key
+    node = find_node(tree, key)
+    if node is not None:
+        # A line repeated in the log (e.g. by a resumed session) is the same node
+        return node[NODE_THREAD]
+
+    is_sidechain = bool(is_sidechain)
+    nodes = tree['nodes']
+    threads = tree['threads']
+    parent_node = find_node(tree, parent) if parent else None
+    if parent and parent_node is None:
+        tree['orphans'] += 1
+        parent = previous
+        parent_node = find_node(tree, parent) if parent else None
+    role_bit = 0 if role == TOOL_RESULT else ROLE_BITS.get(role, OTHER_ROLE_BIT)
+
+    if parent_node is None:
+        thread = start_thread(tree, SIDECHAIN if is_sidechain else MAIN, is_sidechain)
+        depth = 0
+    else:
+        parent_thread = parent_node[NODE_THREAD]
+        parent_sidechain = threads[parent_thread][THREAD_SIDECHAIN]
+        if is_sidechain and not parent_sidechain:
+            thread = start_thread(tree, SIDECHAIN, True, parent_thread)
+        elif parent_sidechain and not is_sidechain:
+            origin = threads[parent_thread][THREAD_ORIGIN]
+            if origin is not None and not threads[origin][THREAD_SIDECHAIN]:
+                thread = origin
+            else:
+                thread = start_thread(tree, MAIN, False, parent_thread)
+        elif parent_node[NODE_CHILD_ROLES] & role_bit:
+            thread = start_thread(tree, FORK, is_sidechain, parent_thread)
+        else:
+            thread = parent_thread
+        parent_node[NODE_CHILDREN] += 1
+        parent_node[NODE_CHILD_ROLES] |= role_bit
+        depth = parent_node[NODE_DEPTH] + 1
+
+    threads[thread][THREAD_MESSAGES] += 1
+    if len(nodes) >= NODE_WINDOW:
+        tree['old_nodes'] = nodes
+        nodes = tree['nodes'] = {}
+    nodes[key] = [thread, 0, depth, 0]
+    tree['max_depth'] = max(tree['max_depth'], depth)
+    return thread
+
+
+def merge_tree_stats(tree, partial, line_offset=0):
+    """Place the links of the next range of a log in tree, in place, or queue them if tree is partial.
+
+    Returns {line number in the range: thread} for the placed links (empty when
+    they are queued), so accumulators that depend on threads can be merged too.
+    """
+    links = tree.get('links')
+    threads = {}
+    for key, parent, is_sidechain, line_number, role in partial['links']:
+        if links is not None:
+            links.append([key, parent, is_sidechain, line_number + line_offset, role])
+        else:
+            threads[line_number] = add_tree_node(tree, key, parent, is_sidechain, line_number + line_offset, role)
+    return threads
+
+
+def summarize_tree_stats(tree):
+    """Return JSON-ready conversation structure metrics from a running accumulator."""
+    kinds = [thread[THREAD_KIND] for thread in tree['threads']]
+    return {
+        'threads': len(kinds),
+        'main_threads': kinds.count(MAIN),
+        'sidechains': kinds.count(SIDECHAIN),
+        'forks': kinds.count(FORK),
+        'max_depth': tree['max_depth'],
+        'relinked_messages': tree['orphans'],
+        'messages_without_uuid': tree['without_uuid']
+    }
+
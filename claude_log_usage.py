@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Claude Log Model Usage
+Builds token, response latency, throughput and prompt-cache metrics from message.usage.
+"""
+
+import math
+from datetime import datetime, timezone
+from itertools import chain as chain_iterables
+
+from claude_log_latency import duration_distribution, parse_timestamp, percentile, seconds_between
+
+USAGE_FIELDS = ('input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens')
+CACHE_WINDOWS = 12
+# Time buckets per cache window; responses are counted in buckets as they close and the
+# buckets are regrouped into CACHE_WINDOWS equal windows at the end
+BUCKETS_PER_WINDOW = 64
+# Responses kept open for later lines of the same API message, in two generations of this
+# size; a line of an older response counts as a new response
+RESPONSE_WINDOW = 1000
+
+
+def new_time_buckets():
+    """Create empty cache counts per time bucket.
+
+    Buckets are `width` seconds wide, a power of two, and aligned on multiples
+    of it; `offset` is the index (time // width) of the first one. The width
+    doubles whenever the buckets would not fit CACHE_WINDOWS * BUCKETS_PER_WINDOW,
+    so the result does not depend on the order responses are added in.
+    """
+    return {'width': 1, 'offset': None, 'buckets': [], 'first': None, 'last': None}
+
+
+def coarsen_buckets(grid):
+    offset = grid['offset'] // 2
+    buckets = [[0, 0, 0, 0] for _ in range((grid['offset'] + len(grid['buckets']) - 1) // 2 - offset + 1)]
+    for i, bucket in enumerate(grid['buckets']):
+        merged = buckets[(grid['offset'] + i) // 2 - offset]
+        for field, value in enumerate(bucket):
+            merged[field] += value
+    grid['width'] *= 2
+    grid['offset'] = offset
+    grid['buckets'] = buckets
+
+
+def add_to_buckets(grid, second, values):
+    """Add [responses, input, cache read, cache creation] counts at a whole second."""
+    limit = CACHE_WINDOWS * BUCKETS_PER_WINDOW
+    if grid['offset'] is not None:
+        while (max(grid['offset'] + len(grid['buckets']) - 1, second // grid['width'])
+               - min(grid['offset'], second // grid['width'])) >= limit:
+            coarsen_buckets(grid)
+    index = second // grid['width']
+    if grid['offset'] is None:
+        grid['offset'] = index
+    if index < grid['offset']:
+        grid['buckets'][:0] = [[0, 0, 0, 0] for _ in range(grid['offset'] - index)]
+        grid['offset'] = index
+    position = index - grid['offset']
+    grid['buckets'].extend([0, 0, 0, 0] for _ in range(position + 1 - len(grid['buckets'])))
+    bucket = grid['buckets'][position]
+    for field, value in enumerate(values):
+        bucket[field] += value
+
+
+def copy_buckets(grid):
+    return dict(grid, buckets=[list(bucket) for bucket in grid['buckets']])
+
+
+def new_usage_stats(partial=False):
+    """Create an empty model usage accumulator.
+
+    Totals, latencies, output rates and cache buckets are updated as
+    responses arrive. Prompts are paired with responses per conversation
+    thread, so parallel sub-agents do not answer each other's prompts. Only
+    recent responses are kept, in `responses` and `old_responses`, as their
+    usage counts followed by the timestamps of their first and last lines; a
+    response is closed into the rates and cache buckets when its generation is
+    dropped. Everything is a JSON type so follow-mode checkpoints can store it.
+    Threads depend on every earlier message, so a partial accumulator, for one
+    range of a log, only collects the range's user and assistant lines;
+    merge_usage_stats adds them in order, with the threads merge_tree_stats
+    placed them in.
+    """
+    usage = {
+        'api_messages': 0,
+        'totals': [0, 0, 0, 0],
+        'responses': {},
+        'old_responses': {},
+        'pending_prompts': {},
+        'response_latencies': [],
+        'first_token_latencies': [],
+        'output_rates': [],
+        'generated_tokens': 0,
+        'generation_seconds': 0.0,
+        'cache_buckets': new_time_buckets()
+    }
+    if partial:
+        usage['lines'] = []
+    return usage
+
+
+def close_response(usage, entry):
+    """Add a finished response's output rate and cache counts.
+
+    The rate covers the time from the response's first line to its last, so
+    the wait for the first token is not counted as generation time.
+    """
+    seconds = seconds_between(entry[4], entry[5]) if entry[4] else None
+    if seconds and entry[1]:
+        usage['output_rates'].append(entry[1] / seconds)
+        usage['generation_seconds'] += seconds
+        usage['generated_tokens'] += entry[1]
+    when = parse_timestamp(entry[5]) if entry[5] else None
+    if when is not None:
+        second = when.timestamp()
+        grid = usage['cache_buckets']
+        grid['first'] = second if grid['first'] is None else min(grid['first'], second)
+        grid['last'] = second if grid['last'] is None else max(grid['last'], second)
+        add_to_buckets(grid, math.floor(second), [1, entry[0], entry[2], entry[3]])
+
+
+def add_response(usage, key, entry):
+    """Count a new response and keep it open, closing the oldest generation when the window is full."""
+    usage['api_messages'] += 1
+    for i in range(len(USAGE_FIELDS)):
+        usage['totals'][i] += entry[i]
+    responses = usage['responses']
+    if len(responses) >= RESPONSE_WINDOW:
+        for old in usage['old_responses'].values():
+            close_response(usage, old)
+        usage['old_responses'] = responses
+        responses = usage['responses'] = {}
+    responses[key] = entry
+
+
+def continue_response(usage, entry, counts, timestamp):
+    """Update a response with a later line; its usage repeats, so the largest counts are kept."""
+    for i, count in enumerate(counts):
+        if count > entry[i]:
+            usage['totals'][i] += count - entry[i]
+            entry[i] = count
+    if timestamp:
+        entry[5] = timestamp
+
+
+def note_latency(usage, prompt, timestamp):
+    """Time the first line of a response from the line that prompted it.
+
+    Every prompt, tool results included, counts towards the time to first
+    token; only user prompts count towards the response latency the user waits.
+    """
+    latency = seconds_between(prompt[0], timestamp) if timestamp else None
+    if latency is not None:
+        usage['first_token_latencies'].append(latency)
+        if prompt[1]:
+            usage['response_latencies'].append(latency)
+
+
+def add_usage_line(usage, chain, line_number, role, tool_results, timestamp, message_id, counts):
+    """Add one user or assistant line to a complete accumulator; see update_usage_stats."""
+    if role == 'user':
+        if timestamp:
+            usage['pending_prompts'][chain] = [timestamp, not tool_results]
+        return
+
+    key = message_id or f'line:{line_number}'
+    responses = usage['responses']
+    entry = responses.get(key)
+    if entry is None:
+        entry = usage['old_responses'].get(key)
+    if entry is not None:
+        continue_response(usage, entry, counts, timestamp)
+        return
+
+    # The first line of a response ends the wait for the model
+    prompt = usage['pending_prompts'].pop(chain, None)
+    if prompt is not None:
+        note_latency(usage, prompt, timestamp)
+    add_response(usage, key, counts + [timestamp, timestamp])
+
+
+def update_usage_stats(usage, record, thread=None):
+    """Add one record's usage, de-duplicated by API message id, and time model responses.
+
+    thread is the record's conversation thread (see update_tree_stats); without
+    it the main session and the sidechains are one chain each.
+    """
+    if record.role not in ('user', 'assistant'):
+        return
+    counts = [0, 0, 0, 0]
+    if record.role == 'assistant' and isinstance(record.usage, dict):
+        counts = [record.usage.get(field) or 0 for field in USAGE_FIELDS]
+    line = [record.line_number, record.role, bool(record.tool_results), record.timestamp,
+            record.api_message_id, counts]
+
+    lines = usage.get('lines')
+    if lines is not None:
+        lines.append(line)
+        return
+    chain = str(thread) if thread is not None else ('sidechain' if record.is_sidechain else 'main')
+    add_usage_line(usage, chain, *line)
+
+
+def merge_usage_stats(usage, partial, line_offset=0, threads=None):
+    """Add the lines of the next range of a log to usage, in place, or queue them if usage is partial.
+
+    threads maps the range's line numbers to their threads, as merge_tree_stats returns it.
+    """
+    lines = usage.get('lines')
+    for line_number, *line in partial['lines']:
+        if lines is not None:
+            lines.append([line_number + line_offset, *line])
+            continue
+        thread = threads.get(line_number) if threads else None
+        # Threads are keyed as strings, like they are once a checkpoint is stored as JSON
+        chain = str(thread) if thread is not None else 'main'
+        add_usage_line(usage, chain, line_number + line_offset, *line)
+    return usage
+
+
+def cache_hit_ratio(input_tokens, cache_read, cache_creation):
+    """Share of prompt tokens served from the prompt cache."""
+    prompt_tokens = input_tokens + cache_read + cache_creation
+    return round(cache_read / prompt_tokens, 4) if prompt_tokens else None
+
+
+def cache_ratio_over_time(grid, windows=CACHE_WINDOWS):
+    """Split the session into equal time windows and report the cache hit ratio of each."""
+    if grid['first'] is None:
+        return []
+
+    start = grid['first']
+    span = grid['last'] - start
+    width = span / windows if span > 0 else 1
+    totals = {}
+    for i, bucket in enumerate(grid['buckets']):
+        if not bucket[0]:
+            continue
+        # A bucket falls in the window holding its middle
+        middle = min(max((grid['offset'] + i + 0.5) * grid['width'], start), grid['last'])
+        index = min(int((middle - start) / width), windows - 1)
+        window = totals.setdefault(index, [0, 0, 0, 0])
+        for field, value in enumerate(bucket):
+            window[field] += value
+
+    series = []
+    for index in sorted(totals):
+        count, input_tokens, cache_read, cache_creation = totals[index]
+        window_start = datetime.fromtimestamp(start + index * width, timezone.utc)
+        series.append({
+            'window_start': window_start.isoformat().replace('+00:00', 'Z'),
+            'api_messages': count,
+            'cache_hit_ratio': cache_hit_ratio(input_tokens, cache_read, cache_creation)
+        })
+    return series
+
+
+def summarize_usage_stats(usage):
+    """Return JSON-ready model usage metrics from a running accumulator."""
+    # Responses still open are closed on a copy, so the accumulator can keep running
+    closed = {
+        'output_rates': list(usage['output_rates']),
+        'generated_tokens': usage['generated_tokens'],
+        'generation_seconds': usage['generation_seconds'],
+        'cache_buckets': copy_buckets(usage['cache_buckets'])
+    }
+    for entry in chain_iterables(usage['old_responses'].values(), usage['responses'].values()):
+        close_response(closed, entry)
+
+    input_tokens, output_tokens, cache_read, cache_creation = usage['totals']
+    # Throughput: output tokens over the time from each response's first line to its last
+    rates = sorted(closed['output_rates'])
+
+    return {
+        'api_messages': usage['api_messages'],
+        'input_tokens': input_tokens,
+        'output_tokens': output_tokens,
+        'cache_read_input_tokens': cache_read,
+        'cache_creation_input_tokens': cache_creation,
+        'total_tokens': sum(usage['totals']),
+        'cache_hit_ratio': cache_hit_ratio(input_tokens, cache_read, cache_creation),
+        'response_latency': duration_distribution(usage['response_latencies']) if usage['response_latencies'] else None,
+        'time_to_first_token': (duration_distribution(usage['first_token_latencies'])
+                                if usage['first_token_latencies'] else None),
+        'output_tokens_per_second': {
+            'overall': round(closed['generated_tokens'] / closed['generation_seconds'], 2),
+            'p50': round(percentile(rates, 0.5), 2),
+            'p95': round(percentile(rates, 0.95), 2)
+        } if rates else None,
+        'cache_hit_ratio_over_time': cache_ratio_over_time(closed['cache_buckets'])
+    }
@@ -0,0 +1,47 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from claude_log_cache import cached_convert, make_cache_config
+from claude_log_converter import convert_log_to_markdown
+from claude_log_to_json import convert_log_to_json
+
+LOG_LINES = [
+    {'type': 'user', 'uuid': 'u1', 'parentUuid': None, 'timestamp': '2025-07-20T10:00:00.000Z',
+     'message': {'role': 'user', 'content': 'Hello'}},
+    {'type': 'assistant', 'uuid': 'a1', 'parentUuid': 'u1', 'timestamp': '2025-07-20T10:00:02.000Z',
+     'message': {'id': 'msg_1', 'role': 'assistant', 'content': [{'type': 'text', 'text': 'Hi there'}]}},
+]
+
+
+def write_log(tmp_path):
+    log_path = tmp_path / 's.jsonl'
+    log_path.write_text(''.join(json.dumps(line) + '\n' for line in LOG_LINES), encoding='utf-8')
+    return log_path
+
+
+def test_json_plain_then_gzip(tmp_path):
+    log_path = write_log(tmp_path)
+    cache = make_cache_config(tmp_path / 'cache')
+
+    assert cached_convert(convert_log_to_json, str(log_path), tmp_path / 'c1.json', {}, cache)
+    assert cached_convert(convert_log_to_json, str(log_path), tmp_path / 'c2.json.gz', {}, cache)
+
+    with gzip.open(tmp_path / 'c2.json.gz', 'rt', encoding='utf-8') as f:
+        restored = json.load(f)
+    plain = json.loads((tmp_path / 'c1.json').read_text(encoding='utf-8'))
+    assert restored['messages'] == plain['messages']
+
+
+def test_markdown_plain_then_gzip(tmp_path):
+    log_path = write_log(tmp_path)
+    cache = make_cache_config(tmp_path / 'cache')
+
+    assert cached_convert(convert_log_to_markdown, str(log_path), tmp_path / 's.md', {}, cache)
+    assert cached_convert(convert_log_to_markdown, str(log_path), tmp_path / 's.md.gz', {}, cache)
+
+    with gzip.open(tmp_path / 's.md.gz', 'rt', encoding='utf-8') as f:
+        assert 'Hi there' in f.read()
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from claude_log_detect import SecretDetector
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('DB_PASSWORD=hunter2abc', 'DB_PASSWORD=[PASSWORD_ASSIGNMENT]'),
+    ('OPENAI_API_KEY=abc123def456ghi789', 'OPENAI_API_KEY=[PASSWORD_ASSIGNMENT]'),
+    ('export GITHUB_TOKEN=ab12cd34ef56gh78', 'export GITHUB_TOKEN=[PASSWORD_ASSIGNMENT]'),
+    ('client_secret: "q8w7e6r5t4y3u2i1"', 'client_secret: "[PASSWORD_ASSIGNMENT]"'),
+    ('secret_key=aB3dE5gH7jK9mN1pQ', 'secret_key=[PASSWORD_ASSIGNMENT]'),
+    ('AWS_SECRET_ACCESS_KEY=wJalrXUtnFEMI/K7MDENG/bPxRfiCYEXAMPLEKEY', 'AWS_SECRET_ACCESS_KEY=[PASSWORD_ASSIGNMENT]'),
+    ('key wJalrXUtnFEMI/K7MDENG/bPxRfiCYEXAMPLEKEY here', 'key [HIGH_ENTROPY] here'),
+    ('token aB3dE5gH7jK9mN1pQ3sT5vX7zA9cE1gI3kM5', 'token [HIGH_ENTROPY]'),
+])
+def test_redacts_secrets(text, expected):
+    assert SecretDetector().redact(text) == expected
+
+
+@pytest.mark.parametrize('text', [
+    'pwd=/home/user/project1',
+    'apiKey=settings.apiKey2',
+    'max_tokens=4096',
+    'see /Users/JohnDoe/Projects/webApp2/src/components/LoginButton2',
+    'src/components/Dashboard/Widgets2/RevenueChartContainer.tsx',
+    'handleUserAuthentication2FactorVerificationCallback',
+    'testCase1ShouldHandleEmptyInputCorrectlyAndReturnNull2',
+    'getElementById2AndReturnTheFirstMatchingNode',
+    'sha 3f786850e387550fdab836ed7e6dc881de23001b uuid 123e4567-e89b-12d3-a456-426614174000',
+])
+def test_keeps_code_and_paths(text):
+    assert SecretDetector().redact(text) == text
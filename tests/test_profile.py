@@ -0,0 +1,48 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import claude_log_profile
+from claude_log_converter import convert_log_to_markdown
+from claude_log_profile import STAGE_FUNCTIONS, check_stage_functions, profile_conversion
+from claude_log_to_json import convert_log_to_json
+
+LOG_LINES = [
+    {'type': 'user', 'uuid': 'u1', 'parentUuid': None, 'timestamp': '2025-07-20T10:00:00.000Z',
+     'message': {'role': 'user', 'content': 'Hello'}},
+    {'type': 'assistant', 'uuid': 'a1', 'parentUuid': 'u1', 'timestamp': '2025-07-20T10:00:02.000Z',
+     'message': {'id': 'msg_1', 'role': 'assistant', 'content': [{'type': 'text', 'text': 'Hi there'}]}},
+]
+
+
+def test_stage_functions_exist():
+    check_stage_functions()
+
+
+def test_missing_stage_function_is_an_error(monkeypatch):
+    monkeypatch.setattr(claude_log_profile, 'STAGE_FUNCTIONS',
+                        STAGE_FUNCTIONS + (('claude_log_parser', 'no_such_function', 'decode'),))
+    with pytest.raises(AttributeError, match='claude_log_parser.no_such_function'):
+        check_stage_functions()
+
+
+@pytest.mark.parametrize('convert_func, output_name', [
+    (convert_log_to_markdown, 's.md'),
+    (convert_log_to_json, 's.json'),
+])
+def test_every_stage_is_timed(tmp_path, convert_func, output_name):
+    log_path = tmp_path / 's.jsonl'
+    log_path.write_text(''.join(json.dumps(line) + '\n' for line in LOG_LINES), encoding='utf-8')
+
+    success, report = profile_conversion(convert_func, str(log_path), str(tmp_path / output_name),
+                                         trace_memory=False)
+    assert success
+    # The input is read through the instrumented open, and each stage of the conversion is entered
+    assert report['bytes'] == log_path.stat().st_size
+    calls = {stage['stage']: stage['calls'] for stage in report['stages']}
+    for stage in ('read', 'decode', 'session_stats', 'format', 'write'):
+        assert calls[stage], stage
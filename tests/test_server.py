@@ -0,0 +1,41 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from claude_log_server import ConversionPending, SessionStore
+
+LOG_LINES = [
+    {'type': 'user', 'uuid': 'u1', 'parentUuid': None, 'timestamp': '2025-07-20T10:00:00.000Z',
+     'message': {'role': 'user', 'content': 'Hello'}},
+    {'type': 'assistant', 'uuid': 'a1', 'parentUuid': 'u1', 'timestamp': '2025-07-20T10:00:02.000Z',
+     'message': {'id': 'msg_1', 'role': 'assistant', 'content': [{'type': 'text', 'text': 'Hi there'}]}},
+]
+
+
+def wait_for_conversions(store):
+    for _ in range(100):
+        with store.lock:
+            if not store.converting:
+                return
+        time.sleep(0.05)
+    raise TimeoutError
+
+
+def test_first_request_does_not_wait_for_conversion(tmp_path):
+    log_path = tmp_path / 'logs' / 's.jsonl'
+    log_path.parent.mkdir()
+    log_path.write_text(''.join(json.dumps(line) + '\n' for line in LOG_LINES), encoding='utf-8')
+    store = SessionStore([str(log_path.parent)], tmp_path / 'cache')
+    session_id, = store.scan()
+
+    with pytest.raises(ConversionPending):
+        store.manifest(session_id)
+    wait_for_conversions(store)
+
+    _, manifest = store.manifest(session_id)
+    assert sum(page['counts']['all'] for page in manifest['pages']) == 2
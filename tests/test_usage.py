@@ -0,0 +1,48 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from claude_log_parser import iter_records
+from claude_log_to_json import finalize_session_stats, new_session_stats, update_session_stats
+
+
+def line(uuid, parent, role, second, is_sidechain=False, message_id=None, output_tokens=0, content='text'):
+    message = {'role': role, 'content': content}
+    if role == 'assistant':
+        message.update(id=message_id, content=[{'type': 'text', 'text': content}],
+                       usage={'input_tokens': 1, 'output_tokens': output_tokens})
+    return json.dumps({'type': role, 'uuid': uuid, 'parentUuid': parent, 'isSidechain': is_sidechain,
+                       'timestamp': f'2025-01-01T00:00:{second:02d}Z', 'message': message}).encode()
+
+
+def usage_of(lines):
+    stats = new_session_stats()
+    for record in iter_records(lines):
+        update_session_stats(stats, record)
+    return finalize_session_stats(stats)['usage']
+
+
+def test_parallel_sidechains_pair_their_own_prompts():
+    usage = usage_of([
+        line('u1', None, 'user', 0),
+        line('a1', 'u1', 'assistant', 1, message_id='m1'),
+        # Two sub-agents start from the same tool call and interleave
+        line('s1', 'a1', 'user', 2, is_sidechain=True),
+        line('s2', 'a1', 'user', 3, is_sidechain=True),
+        line('r2', 's2', 'assistant', 4, is_sidechain=True, message_id='m2'),
+        line('r1', 's1', 'assistant', 10, is_sidechain=True, message_id='m3'),
+    ])
+    assert usage['response_latency']['count'] == 3
+    assert usage['response_latency']['max_seconds'] == 8.0
+
+
+def test_output_rate_excludes_time_to_first_token():
+    usage = usage_of([
+        line('u1', None, 'user', 0),
+        line('a1', 'u1', 'assistant', 2, message_id='m1', output_tokens=10),
+        line('a2', 'a1', 'assistant', 4, message_id='m1', output_tokens=100),
+    ])
+    assert usage['time_to_first_token']['p50_seconds'] == 2.0
+    assert usage['output_tokens_per_second']['overall'] == 50.0